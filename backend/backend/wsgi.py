@@ -14,3 +14,10 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
 
 application = get_wsgi_application()
+
+# Load shared models before a preforking server forks its workers
+from roadmap.model_registry import preload_models  # noqa: E402
+from roadmap.prewarm import start_prewarm  # noqa: E402
+
+preload_models()
+start_prewarm()
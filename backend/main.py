@@ -18,13 +18,17 @@ app.add_middleware(
 # Initialize resource fetcher
 resource_fetcher = ResourceFetcher()
 
+@app.on_event("shutdown")
+async def close_resource_fetcher():
+    await resource_fetcher.aclose()
+
 class ResourceRequest(BaseModel):
     topic: str
 
 @app.post("/api/resources/")
 async def get_resources(request: ResourceRequest):
     try:
-        resources = resource_fetcher.fetch_all_resources(request.topic)
+        resources = await resource_fetcher.fetch_all_resources(request.topic)
         return {
             "success": True,
             "resources": resources
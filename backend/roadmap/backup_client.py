@@ -0,0 +1,223 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+
+class BackupProviderError(Exception):
+    """The backup provider could not produce a response"""
+
+
+class CircuitOpenError(BackupProviderError):
+    """The circuit breaker is open, so the call was not attempted"""
+
+
+class GeminiTransport:
+    """Transport for the hosted Gemini model, configured once per process"""
+
+    def __init__(self, api_key=None, model_name='gemini-1.5-flash'):
+        import google.generativeai as ai_service
+
+        api_key = api_key or os.getenv('MODEL_API_KEY')
+        if not api_key:
+            raise ValueError("API key not found in environment variables")
+        ai_service.configure(api_key=api_key)
+        self.model = ai_service.GenerativeModel(model_name)
+
+    def generate(self, prompt, timeout):
+        """Return the response text for prompt, or None if the provider sent nothing"""
+        response = self.model.generate_content(prompt, request_options={"timeout": timeout})
+        if not response or not response.text:
+            return None
+        return response.text
+
+
+class StubTransport:
+    """Deterministic local stand-in for the provider, for tests and benchmarks"""
+
+    def __init__(self, latency=None, failure_rate=None):
+        self.latency = latency if latency is not None else float(os.getenv('ROADMAP_BACKUP_STUB_LATENCY', '0'))
+        self.failure_rate = failure_rate if failure_rate is not None else float(os.getenv('ROADMAP_BACKUP_STUB_FAILURE_RATE', '0'))
+
+    def generate(self, prompt, timeout):
+        """Answer with a fixed-shape roadmap for the topic named in the prompt"""
+        if self.latency:
+            time.sleep(min(self.latency, timeout))
+            if self.latency > timeout:
+                raise TimeoutError("Stub provider timed out")
+
+        digest = int(hashlib.sha256(prompt.encode('utf-8')).hexdigest(), 16)
+        # Fail deterministically for the same share of prompts on every run
+        if self.failure_rate and (digest % 1000) / 1000 < self.failure_rate:
+            raise BackupProviderError("Stub provider failure")
+
+        match = re.search(r'learning roadmap for (.+?)\.\s*\n', prompt)
+        topic = match.group(1).strip() if match else 'Roadmap'
+        roadmap = {
+            "name": topic,
+            "children": [
+                {
+                    "name": f"{topic} Module {main}",
+                    "children": [
+                        {
+                            "name": f"Subtopic {main}.{sub}",
+                            "children": [{"name": f"Point {main}.{sub}.{point}"} for point in range(1, 3)]
+                        }
+                        for sub in range(1, 4)
+                    ]
+                }
+                for main in range(1, 6)
+            ]
+        }
+        return f"```json\n{json.dumps(roadmap)}\n```"
+
+
+TRANSPORTS = {
+    'gemini': GeminiTransport,
+    'stub': StubTransport,
+}
+
+
+class CircuitBreaker:
+    """Fail fast after repeated provider failures, probing again after a cool-down.
+
+    Closed: calls go through. After ``failure_threshold`` consecutive failures the
+    breaker opens and rejects calls for ``reset_timeout`` seconds, then lets a
+    single trial call through (half-open); its outcome closes or re-opens it.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """Whether a call may be attempted now"""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN:
+                if time.monotonic() - self._opened_at < self.reset_timeout:
+                    return False
+                self.state = self.HALF_OPEN
+                self._trial_in_flight = False
+            if self._trial_in_flight:
+                return False
+            self._trial_in_flight = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self._failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self.state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    logger.warning(f"Backup provider circuit opened after {self._failures} failure(s)")
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+                self._trial_in_flight = False
+
+
+class BackupProviderClient:
+    """One long-lived, bounded client for the backup provider.
+
+    Calls share a single transport (configured once), at most ``max_concurrency``
+    run at a time, every call has a deadline covering queueing, retries and the
+    provider round trip, and a circuit breaker rejects calls while the provider
+    keeps failing.
+    """
+
+    def __init__(self, transport_factory=None, max_concurrency=None, timeout=None, max_retries=None,
+                 retry_backoff=0.5, breaker=None):
+        if transport_factory is None:
+            transport_name = os.getenv('ROADMAP_BACKUP_TRANSPORT', 'gemini')
+            if transport_name not in TRANSPORTS:
+                raise ValueError(f"Unknown backup transport '{transport_name}'")
+            transport_factory = TRANSPORTS[transport_name]
+        self.transport_factory = transport_factory
+        self.max_concurrency = max_concurrency or int(os.getenv('ROADMAP_BACKUP_MAX_CONCURRENCY', '4'))
+        self.timeout = timeout or float(os.getenv('ROADMAP_BACKUP_TIMEOUT', '20'))
+        self.max_retries = max_retries if max_retries is not None else int(os.getenv('ROADMAP_BACKUP_MAX_RETRIES', '1'))
+        self.retry_backoff = retry_backoff
+        self.breaker = breaker or CircuitBreaker(
+            failure_threshold=int(os.getenv('ROADMAP_BACKUP_BREAKER_THRESHOLD', '5')),
+            reset_timeout=float(os.getenv('ROADMAP_BACKUP_BREAKER_RESET', '30'))
+        )
+        self._transport = None
+        self._transport_lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(self.max_concurrency)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix='backup-provider')
+
+    def _get_transport(self):
+        if self._transport is None:
+            with self._transport_lock:
+                if self._transport is None:
+                    self._transport = self.transport_factory()
+        return self._transport
+
+    def generate_text(self, prompt, timeout=None):
+        """Return the provider's text for prompt within timeout seconds, or raise BackupProviderError"""
+        budget = timeout or self.timeout
+        deadline = time.monotonic() + budget
+        transport = self._get_transport()
+
+        if not self._slots.acquire(timeout=budget):
+            # Waiting for a slot is not the provider's fault, so the breaker is not told
+            raise BackupProviderError("Backup provider is at its concurrency limit")
+
+        if not self.breaker.allow():
+            self._slots.release()
+            raise CircuitOpenError("Backup provider is unavailable, failing fast")
+
+        try:
+            last_error = None
+            for attempt in range(self.max_retries + 1):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                future = self._executor.submit(transport.generate, prompt, remaining)
+                try:
+                    text = future.result(timeout=remaining)
+                    self.breaker.record_success()
+                    return text
+                except FutureTimeoutError:
+                    future.cancel()
+                    last_error = BackupProviderError(f"Backup provider timed out after {budget:.1f}s")
+                    self.breaker.record_failure()
+                    break
+                except Exception as e:
+                    last_error = e
+                    self.breaker.record_failure()
+                    logger.warning(f"Backup provider attempt {attempt + 1} failed: {str(e)}")
+                    if not self.breaker.allow():
+                        break
+                    time.sleep(min(self.retry_backoff * (2 ** attempt), max(0.0, deadline - time.monotonic())))
+
+            if isinstance(last_error, BackupProviderError):
+                raise last_error
+            raise BackupProviderError(str(last_error) if last_error else "Backup provider deadline exceeded")
+        finally:
+            self._slots.release()
@@ -0,0 +1,229 @@
+import asyncio
+import hashlib
+import json
+import logging
+import math
+import os
+import resource
+import tempfile
+import time
+
+from .inference_scheduler import BatchScheduler
+from .tech_classifier import tech_classifier
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TRACE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'benchmark_trace.jsonl')
+
+
+class FakeRoadmapGenerator:
+    """Deterministic stand-in for RoadmapGenerator that costs time but no model.
+
+    Each batch sleeps as long as the real model would take to produce
+    ``tokens`` tokens at ``tokens_per_second`` and requests are batched by the
+    same BatchScheduler, so queueing behaves like the real thing. The roadmap
+    depends only on the prompt; ``failure_rate`` of the prompts (chosen by
+    hash, so the same ones on every run) produce invalid output and go to the
+    backup generator.
+    """
+
+    def __init__(self, tokens_per_second=40.0, tokens=300, failure_rate=0.0, max_batch_size=None):
+        self.tokens_per_second = tokens_per_second
+        self.tokens = tokens
+        self.failure_rate = failure_rate
+        self.scheduler = BatchScheduler(
+            self._generate_batch,
+            max_batch_size=max_batch_size or int(os.getenv('ROADMAP_BATCH_MAX_SIZE', '4')),
+            max_wait_ms=float(os.getenv('ROADMAP_BATCH_MAX_WAIT_MS', '25')),
+            name='fake-inference'
+        )
+        # Read by the metrics collector and the prewarmer
+        self.speculative = None
+        self.hedger = None
+
+    def _digest(self, prompt):
+        return int(hashlib.sha256(prompt.encode('utf-8')).hexdigest(), 16)
+
+    def _generate_batch(self, prompts):
+        time.sleep(self.tokens / self.tokens_per_second)
+        return [self._roadmap_text(prompt) for prompt in prompts]
+
+    def _roadmap_text(self, prompt):
+        digest = self._digest(prompt)
+        if self.failure_rate and (digest % 1000) / 1000 < self.failure_rate:
+            return '{"name": "' + prompt
+        main_topics = 3 + digest % 3
+        return json.dumps({
+            "name": prompt,
+            "children": [
+                {
+                    "name": f"{prompt} Topic {main}",
+                    "children": [{"name": f"Subtopic {main}.{sub}"} for sub in range(1, 4)]
+                }
+                for main in range(1, main_topics + 1)
+            ]
+        })
+
+    def generate_roadmap(self, prompt):
+        """Same contract as RoadmapGenerator.generate_roadmap"""
+        from .model_registry import get_backup_generator
+
+        if not tech_classifier.is_tech_related(prompt):
+            return {
+                "success": False,
+                "error": "Currently, we only support technology-related learning roadmaps."
+            }
+
+        text = self.scheduler.run(prompt)
+        try:
+            roadmap = json.loads(text)
+        except json.JSONDecodeError:
+            backup_roadmap = get_backup_generator().generate_roadmap(prompt)
+            if backup_roadmap and backup_roadmap.get("success"):
+                return {
+                    "success": True,
+                    "roadmap": backup_roadmap["roadmap"],
+                    "format": "json",
+                    "source": "backup_model"
+                }
+            return {"success": False, "error": "Failed to generate roadmap with local model"}
+        return {"success": True, "roadmap": roadmap, "format": "json", "source": "local_model"}
+
+
+class StubWikipedia:
+    """Local stand-in for the Wikipedia lookup behind the description cache"""
+
+    def __init__(self, latency=0.15):
+        self.latency = latency
+
+    def __call__(self, topic, timeout=None):
+        time.sleep(self.latency)
+        return (f"{topic} is a subject in software development. This stand-in description is long "
+                f"enough to be shown instead of the backup text.")
+
+
+def install_stubs(fake_model=True, model_options=None, wiki_latency=0.15, backup_latency=0.5):
+    """Swap the model (optionally), Wikipedia and the backup provider for local stand-ins.
+
+    The caches use throwaway files so a run neither reads nor pollutes the
+    real ones.
+    """
+    from .backup_client import BackupProviderClient, StubTransport
+    from .description_cache import DescriptionCache
+    from .model_registry import registry
+    from .roadmap_service import RoadmapService
+    from .semantic_cache import SemanticRoadmapCache
+
+    workdir = tempfile.mkdtemp(prefix='roadmap-benchmark-')
+    if fake_model:
+        registry.set('roadmap_generator', FakeRoadmapGenerator(**(model_options or {})))
+    registry.set('backup_client', BackupProviderClient(transport_factory=lambda: StubTransport(latency=backup_latency)))
+    registry.set('description_cache', DescriptionCache(
+        fetch_fn=StubWikipedia(wiki_latency),
+        path=os.path.join(workdir, 'descriptions.sqlite3')
+    ))
+    registry.set('roadmap_service', RoadmapService(
+        semantic_cache=SemanticRoadmapCache(path=os.path.join(workdir, 'semantic_cache.npz'))
+    ))
+    return workdir
+
+
+def load_trace(path):
+    """Requests to replay, one {"path": ..., "body": {...}} object per line"""
+    trace = []
+    with open(path, encoding='utf-8') as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            item = json.loads(line)
+            if 'path' not in item:
+                raise ValueError(f"{path}:{line_number}: every request needs a path")
+            item.setdefault('body', {})
+            trace.append(item)
+    return trace
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    rank = max(0, min(len(sorted_values) - 1, math.ceil(fraction * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+def current_rss_mb():
+    """Resident set size of this process right now, or None where /proc is unavailable"""
+    try:
+        with open('/proc/self/statm') as f:
+            return round(int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2 ** 20, 1)
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+async def replay(trace, send, concurrency):
+    """Send every request with at most concurrency in flight; returns [(path, status, seconds)]"""
+    items = iter(trace)
+    samples = []
+
+    async def worker():
+        # The shared iterator hands each request to exactly one worker
+        for item in items:
+            started = time.perf_counter()
+            try:
+                status = await send(item)
+            except Exception as e:
+                logger.warning(f"Request to {item['path']} failed: {str(e)}")
+                status = 'error'
+            samples.append((item['path'], status, time.perf_counter() - started))
+
+    await asyncio.gather(*(worker() for _ in range(max(1, concurrency))))
+    return samples
+
+
+def summarize(samples, seconds):
+    """Throughput, status counts and latency percentiles per path and overall"""
+    def summary(group):
+        latencies = sorted(latency for _, _, latency in group)
+        statuses = {}
+        for _, status, _ in group:
+            statuses[str(status)] = statuses.get(str(status), 0) + 1
+        errors = sum(count for status, count in statuses.items() if not status.startswith('2'))
+        return {
+            "requests": len(group),
+            "errors": errors,
+            "statuses": statuses,
+            "throughput_rps": round(len(group) / seconds, 2) if seconds else 0.0,
+            "latency_ms": {
+                name: round(percentile(latencies, fraction) * 1000, 1) if latencies else None
+                for name, fraction in (('p50', 0.5), ('p90', 0.9), ('p99', 0.99), ('max', 1.0))
+            },
+            "mean_latency_ms": round(sum(latencies) / len(latencies) * 1000, 1) if latencies else None
+        }
+
+    paths = {}
+    for sample in samples:
+        paths.setdefault(sample[0], []).append(sample)
+    return {
+        "overall": summary(samples),
+        "endpoints": {path: summary(group) for path, group in sorted(paths.items())}
+    }
+
+
+async def run_benchmark(trace, send, concurrency, warmup=0, repeat=1):
+    """Replay the trace and return a JSON-serializable report"""
+    if warmup:
+        await replay(trace[:warmup], send, concurrency)
+
+    started = time.perf_counter()
+    samples = await replay(trace * repeat, send, concurrency)
+    elapsed = time.perf_counter() - started
+
+    report = summarize(samples, elapsed)
+    report.update({
+        "seconds": round(elapsed, 2),
+        # ru_maxrss is reported in kilobytes on Linux
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "rss_mb": current_rss_mb()
+    })
+    return report
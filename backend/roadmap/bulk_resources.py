@@ -0,0 +1,98 @@
+import asyncio
+import logging
+import os
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from .topic_resources import clean_topic_name
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_pid = None
+_executor_lock = threading.Lock()
+
+
+def max_workers():
+    return int(os.getenv('ROADMAP_RESOURCE_BULK_WORKERS', '8'))
+
+
+def get_executor():
+    """The pool every bulk request resolves topics on, so parallelism is bounded per process"""
+    global _executor, _executor_pid
+    with _executor_lock:
+        # Threads do not survive fork, so each worker process gets its own pool
+        if _executor is None or _executor_pid != os.getpid():
+            _executor = ThreadPoolExecutor(max_workers=max_workers(), thread_name_prefix='bulk-resources')
+            _executor_pid = os.getpid()
+        return _executor
+
+
+def group_topics(names):
+    """Map each normalized topic to the node names that resolve to it, in first-seen order"""
+    groups = {}
+    for name in names:
+        if not isinstance(name, str):
+            continue
+        topic = clean_topic_name(name)
+        if topic:
+            groups.setdefault(topic.lower(), (topic, []))[1].append(name)
+    return groups
+
+
+def _result(future, node_names):
+    try:
+        return future.result()
+    except Exception as e:
+        logger.error(f"Error resolving resources for {node_names[0]}: {str(e)}")
+        return None
+
+
+def iter_resources(names, resolve_fn):
+    """Resolve every distinct topic concurrently, yielding (node names, resources) as each completes.
+
+    Node names that normalize to the same topic are resolved once. Topics run on
+    the shared pool, and one request keeps at most ``ROADMAP_RESOURCE_BULK_WORKERS``
+    of them in flight so concurrent requests take turns.
+    """
+    pending_topics = iter(group_topics(names).values())
+    executor = get_executor()
+    in_flight = {}
+    try:
+        while True:
+            for topic, node_names in pending_topics:
+                in_flight[executor.submit(resolve_fn, topic)] = node_names
+                if len(in_flight) >= max_workers():
+                    break
+            if not in_flight:
+                return
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                node_names = in_flight.pop(future)
+                yield node_names, _result(future, node_names)
+    finally:
+        # The caller stopped early, e.g. the client went away mid-stream
+        for future in in_flight:
+            future.cancel()
+
+
+async def aiter_resources(names, resolve_fn):
+    """iter_resources() for async callers, awaiting topics instead of blocking a thread"""
+    pending_topics = iter(group_topics(names).values())
+    executor = get_executor()
+    in_flight = {}
+    try:
+        while True:
+            for topic, node_names in pending_topics:
+                in_flight[asyncio.wrap_future(executor.submit(resolve_fn, topic))] = node_names
+                if len(in_flight) >= max_workers():
+                    break
+            if not in_flight:
+                return
+            done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+            for future in done:
+                node_names = in_flight.pop(future)
+                yield node_names, _result(future, node_names)
+    finally:
+        for future in in_flight:
+            future.cancel()
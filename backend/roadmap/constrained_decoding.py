@@ -0,0 +1,309 @@
+import logging
+import threading
+
+import torch
+from transformers import LogitsProcessor
+
+from .json_tracker import NODE_LIMITS
+
+logger = logging.getLogger(__name__)
+
+# Depth of the deepest node: root -> main topic -> subtopic -> point
+MAX_DEPTH = len(NODE_LIMITS)
+
+WHITESPACE = ' \n\t'
+ESCAPABLE = '"\\/bfnrt'
+HEX_DIGITS = '0123456789abcdefABCDEF'
+
+# Grammar phases. A state is (phase, literal_position, child_counts) where
+# child_counts holds the number of nodes started in each open "children" array,
+# so len(child_counts) is also the depth of the node currently being written.
+NODE_OPEN = 'node_open'
+KEY_NAME = 'key_name'
+COLON_NAME = 'colon_name'
+NAME_START = 'name_start'
+NAME_STRING = 'name_string'
+NAME_ESCAPE = 'name_escape'
+NAME_UNICODE = 'name_unicode'
+AFTER_NAME = 'after_name'
+KEY_CHILDREN = 'key_children'
+COLON_CHILDREN = 'colon_children'
+ARRAY_OPEN = 'array_open'
+AFTER_CHILD = 'after_child'
+AFTER_CHILDREN = 'after_children'
+DONE = 'done'
+
+INITIAL_STATE = (NODE_OPEN, 0, ())
+
+LITERALS = {
+    KEY_NAME: ('"name"', COLON_NAME),
+    KEY_CHILDREN: ('"children"', COLON_CHILDREN),
+}
+
+
+def _close_node(counts):
+    """State after the '}' of a node at depth len(counts)"""
+    if not counts:
+        return (DONE, 0, ())
+    return (AFTER_CHILD, 0, counts)
+
+
+def step(state, char):
+    """Advance the roadmap grammar by one character; returns None if char is not allowed.
+
+    Every node is ``{"name": "...", "children": [...]}``. The root must have at
+    least one child, nodes below it may omit ``children`` or leave it empty, and
+    points at the deepest level can only have an empty list. Each children array holds at
+    most the NODE_LIMITS entry for its level.
+    """
+    phase, position, counts = state
+
+    if phase == NAME_STRING:
+        if char == '"':
+            return (AFTER_NAME, 0, counts)
+        if char == '\\':
+            return (NAME_ESCAPE, 0, counts)
+        if ord(char) < 0x20:
+            return None
+        return state
+
+    if phase == NAME_ESCAPE:
+        if char == 'u':
+            return (NAME_UNICODE, 0, counts)
+        return (NAME_STRING, 0, counts) if char in ESCAPABLE else None
+
+    if phase == NAME_UNICODE:
+        if char not in HEX_DIGITS:
+            return None
+        return (NAME_STRING, 0, counts) if position == 3 else (NAME_UNICODE, position + 1, counts)
+
+    if phase in LITERALS:
+        literal, next_phase = LITERALS[phase]
+        if position == 0 and char in WHITESPACE:
+            return state
+        if char != literal[position]:
+            return None
+        if position + 1 == len(literal):
+            return (next_phase, 0, counts)
+        return (phase, position + 1, counts)
+
+    if phase == DONE:
+        return None
+
+    if char in WHITESPACE:
+        return state
+
+    if phase == NODE_OPEN:
+        if char == ']' and len(counts) > 1 and counts[-1] == 0:
+            # Empty children list below the root
+            return (AFTER_CHILDREN, 0, counts[:-1])
+        if char != '{' or len(counts) > MAX_DEPTH:
+            return None
+        if counts:
+            counts = counts[:-1] + (counts[-1] + 1,)
+        return (KEY_NAME, 0, counts)
+
+    if phase == COLON_NAME:
+        return (NAME_START, 0, counts) if char == ':' else None
+
+    if phase == NAME_START:
+        return (NAME_STRING, 0, counts) if char == '"' else None
+
+    if phase == AFTER_NAME:
+        if char == ',':
+            return (KEY_CHILDREN, 0, counts)
+        if char == '}' and counts:
+            # Only the root must have children
+            return _close_node(counts)
+        return None
+
+    if phase == COLON_CHILDREN:
+        return (ARRAY_OPEN, 0, counts) if char == ':' else None
+
+    if phase == ARRAY_OPEN:
+        return (NODE_OPEN, 0, counts + (0,)) if char == '[' else None
+
+    if phase == AFTER_CHILD:
+        if char == ',' and counts[-1] < NODE_LIMITS[len(counts) - 1]:
+            return (NODE_OPEN, 0, counts)
+        if char == ']':
+            return (AFTER_CHILDREN, 0, counts[:-1])
+        return None
+
+    if phase == AFTER_CHILDREN:
+        return _close_node(counts) if char == '}' else None
+
+    return None
+
+
+def advance(state, text):
+    """Advance the grammar over a whole string; returns None on the first disallowed character"""
+    for char in text:
+        state = step(state, char)
+        if state is None:
+            return None
+    return state
+
+
+def _token_text(token):
+    """Surface text of a SentencePiece token, or None if it cannot appear in the output"""
+    if token.startswith('<0x') and token.endswith('>') and len(token) == 6:
+        value = int(token[3:5], 16)
+        # Partial UTF-8 bytes cannot be checked character by character
+        return chr(value) if value < 0x80 else None
+    return token.replace('▁', ' ')
+
+
+class RoadmapSchema:
+    """Token-level view of the roadmap grammar for one tokenizer.
+
+    Allowed-token masks are computed once per grammar state and cached, so after
+    the first few requests constrained decoding costs one dictionary lookup and a
+    masked_fill per generated token.
+    """
+
+    def __init__(self, tokenizer):
+        self.eos_token_id = tokenizer.eos_token_id
+        self.vocab_size = len(tokenizer)
+        special_ids = set(tokenizer.all_special_ids)
+
+        self.texts = {}
+        self.plain_string_ids = []
+        self.whitespace_ids = []
+        self.by_first_char = {}
+        self.by_first_non_whitespace = {}
+
+        for token_id, token in enumerate(tokenizer.convert_ids_to_tokens(list(range(self.vocab_size)))):
+            if token_id in special_ids or token is None:
+                continue
+            text = _token_text(token)
+            if not text:
+                continue
+            self.texts[token_id] = text
+
+            if '"' not in text and '\\' not in text and all(ord(char) >= 0x20 for char in text):
+                self.plain_string_ids.append(token_id)
+            self.by_first_char.setdefault(text[0], []).append(token_id)
+            stripped = text.lstrip(WHITESPACE)
+            if stripped:
+                self.by_first_non_whitespace.setdefault(stripped[0], []).append(token_id)
+            else:
+                self.whitespace_ids.append(token_id)
+
+        plain_string_set = set(self.plain_string_ids)
+        self.special_string_ids = [token_id for token_id in self.texts if token_id not in plain_string_set]
+        self._masks = {}
+        self._transitions = {}
+        self._lock = threading.Lock()
+
+    def advance_token(self, state, token_id):
+        """Grammar state after emitting token_id, or None if it left the grammar"""
+        if state is None:
+            return None
+        key = (state, token_id)
+        if key not in self._transitions:
+            text = self.texts.get(token_id)
+            self._transitions[key] = advance(state, text) if text is not None else None
+        return self._transitions[key]
+
+    def mask(self, state):
+        """Boolean tensor of the token ids allowed in state"""
+        mask = self._masks.get(state)
+        if mask is None:
+            mask = self._build_mask(state)
+            with self._lock:
+                self._masks[state] = mask
+        return mask
+
+    def _candidates(self, state):
+        """Token ids that may be allowed in state, before checking them in full"""
+        phase = state[0]
+        if phase == NAME_STRING:
+            # Tokens without quotes, backslashes or control characters stay inside
+            # the string whatever the state, so only the rest needs checking
+            return self.special_string_ids, self.plain_string_ids
+
+        if step(state, ' ') == state:
+            # Leading whitespace never changes these states, so index tokens by
+            # their first non-whitespace character
+            candidates = []
+            for char, token_ids in self.by_first_non_whitespace.items():
+                if step(state, char) is not None:
+                    candidates.extend(token_ids)
+            return candidates, self.whitespace_ids
+
+        candidates = []
+        for char, token_ids in self.by_first_char.items():
+            if step(state, char) is not None:
+                candidates.extend(token_ids)
+        return candidates, []
+
+    def _build_mask(self, state):
+        mask = torch.zeros(self.vocab_size, dtype=torch.bool)
+        if state[0] == DONE:
+            mask[self.eos_token_id] = True
+            return mask
+
+        candidates, always_allowed = self._candidates(state)
+        allowed = [token_id for token_id in candidates if self.advance_token(state, token_id) is not None]
+        allowed.extend(always_allowed)
+        if allowed:
+            mask[torch.tensor(allowed, dtype=torch.long)] = True
+        else:
+            # Never leave a row without any valid token to sample
+            mask[self.eos_token_id] = True
+        return mask
+
+
+class RoadmapSchemaLogitsProcessor(LogitsProcessor):
+    """Mask out every token that would stop the output being a valid roadmap prefix"""
+
+    def __init__(self, schema, prompt_length):
+        self.schema = schema
+        self.prompt_length = prompt_length
+        # Per row: generated token ids seen so far and the grammar state after each
+        self._tokens = {}
+        self._states = {}
+
+    def _advance(self, tokens, states, token_id):
+        tokens.append(token_id)
+        if token_id == self.schema.eos_token_id:
+            states.append(None)
+        else:
+            states.append(self.schema.advance_token(states[-1], token_id))
+
+    def _state_for(self, row, generated):
+        tokens = self._tokens.setdefault(row, [])
+        states = self._states.setdefault(row, [INITIAL_STATE])
+
+        # Decoding appends one token per step, so only that token needs following
+        if generated.shape[0] == len(tokens) + 1:
+            self._advance(tokens, states, int(generated[-1]))
+            return states[-1]
+
+        # Otherwise roll back to the longest prefix we have already followed, so
+        # callers may re-score shorter sequences (e.g. after rejecting speculative tokens)
+        generated = generated.tolist()
+        common = 0
+        limit = min(len(tokens), len(generated))
+        while common < limit and tokens[common] == generated[common]:
+            common += 1
+        del tokens[common:]
+        del states[common + 1:]
+
+        for token_id in generated[common:]:
+            self._advance(tokens, states, token_id)
+        return states[-1]
+
+    def __call__(self, input_ids, scores):
+        for row in range(input_ids.shape[0]):
+            state = self._state_for(row, input_ids[row, self.prompt_length:])
+            if state is None:
+                # The row has finished (or was forced off the grammar); leave it alone
+                continue
+            allowed = self.schema.mask(state)
+            if allowed.shape[0] < scores.shape[-1]:
+                padding = torch.zeros(scores.shape[-1] - allowed.shape[0], dtype=torch.bool)
+                allowed = torch.cat([allowed, padding])
+            scores[row] = scores[row].masked_fill(~allowed[:scores.shape[-1]], float('-inf'))
+        return scores
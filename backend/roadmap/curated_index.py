@@ -0,0 +1,88 @@
+import copy
+import json
+import logging
+import os
+
+from .json_tracker import limit_node_count
+from .result_cache import normalize_prompt
+from .semantic_cache import ABBREVIATIONS, FILLER_WORDS, LEADING_FILLER_WORDS
+
+logger = logging.getLogger(__name__)
+
+DATA_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+CURATED_DATASETS = (
+    # (file name, topic field, roadmap field); earlier files win on duplicate topics
+    ('dataset.json', 'topic', 'roadmap'),
+    ('200+roadmapdatasetforLLAMATraining.json', 'input', 'output'),
+)
+
+
+def topic_key(prompt):
+    """The topic of a prompt with the request phrasing around it removed.
+
+    "i want to learn git and github from scratch" becomes "git and github";
+    unlike topic_text, filler words inside the topic are kept, so distinct
+    topics do not collapse onto the same key.
+    """
+    words = []
+    for word in normalize_prompt(prompt).split():
+        words.extend(ABBREVIATIONS.get(word, word).split())
+    start, end = 0, len(words)
+    while start < end and (words[start] in FILLER_WORDS or words[start] in LEADING_FILLER_WORDS):
+        start += 1
+    while end > start and words[end - 1] in FILLER_WORDS:
+        end -= 1
+    return ' '.join(words[start:end] or words)
+
+
+class CuratedRoadmapIndex:
+    """Topic index over the roadmaps bundled with the repository.
+
+    Curated topics and prompts are both reduced with topic_key, so "roadmap for
+    data science" and "i want to learn data science" both resolve to the
+    curated "data science" roadmap with a single dictionary lookup.
+    """
+
+    def __init__(self, data_dir=DATA_DIR, datasets=CURATED_DATASETS):
+        self._roadmaps = {}
+        for file_name, topic_field, roadmap_field in datasets:
+            self._load(os.path.join(data_dir, file_name), topic_field, roadmap_field)
+        logger.info(f"Curated roadmap index covers {len(self._roadmaps)} topics")
+
+    def _load(self, path, topic_field, roadmap_field):
+        try:
+            with open(path, encoding='utf-8') as f:
+                entries = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Could not load curated roadmaps from {path}: {str(e)}")
+            return
+
+        for entry in entries:
+            topic = entry.get(topic_field)
+            roadmap = entry.get(roadmap_field)
+            if not topic or not isinstance(roadmap, dict) or 'name' not in roadmap or 'children' not in roadmap:
+                continue
+            self._roadmaps.setdefault(topic_key(topic), limit_node_count(roadmap))
+
+    def __len__(self):
+        return len(self._roadmaps)
+
+    def topics(self):
+        """Topic keys covered by the curated data"""
+        return list(self._roadmaps)
+
+    def roadmaps(self):
+        """Every curated roadmap, node limits applied"""
+        return list(self._roadmaps.values())
+
+    def lookup(self, prompt):
+        """Return a curated roadmap result for prompt, or None if the topic is not covered"""
+        roadmap = self._roadmaps.get(topic_key(prompt))
+        if roadmap is None:
+            return None
+        return {
+            "success": True,
+            "roadmap": copy.deepcopy(roadmap),
+            "format": "json",
+            "source": "curated"
+        }
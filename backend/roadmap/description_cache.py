@@ -0,0 +1,193 @@
+import asyncio
+import logging
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+import requests
+
+from .metrics import STAGE_SECONDS
+from .topic_resources import (
+    WIKIPEDIA_API_URL,
+    clean_topic_name,
+    is_useful_description,
+    shorten_description,
+    wiki_extract_params,
+    wiki_page_id,
+    wiki_search_params
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'description_cache.sqlite3')
+
+_session = requests.Session()
+
+
+def fetch_wiki_description(topic, timeout=None):
+    """Fetch a short description of the topic from Wikipedia; None if it has nothing useful"""
+    timeout = timeout or float(os.getenv('ROADMAP_WIKI_TIMEOUT', '3'))
+
+    # First, search for the most relevant page
+    with STAGE_SECONDS.time(stage='wiki_search'):
+        search_response = _session.get(WIKIPEDIA_API_URL, params=wiki_search_params(topic), timeout=timeout)
+    search_response.raise_for_status()
+    page_id = wiki_page_id(search_response.json())
+    if page_id is None:
+        return None
+
+    # Then, get the extract for that page
+    with STAGE_SECONDS.time(stage='wiki_extract'):
+        extract_response = _session.get(WIKIPEDIA_API_URL, params=wiki_extract_params(page_id), timeout=timeout)
+    extract_response.raise_for_status()
+    description = shorten_description(extract_response.json(), page_id)
+    return description if is_useful_description(description) else None
+
+
+def description_key(topic):
+    return clean_topic_name(topic).lower()
+
+
+class DescriptionCache:
+    """On-disk SQLite cache of topic descriptions with stale-while-revalidate refresh.
+
+    Entries are fresh for ``ttl`` seconds (``negative_ttl`` for topics Wikipedia
+    had nothing for) and are then served stale for up to ``stale_ttl`` more
+    while a background worker refetches them. A cold miss waits at most
+    ``wait_timeout`` for the fetch; if upstream is slower the caller gets None
+    and the worker still fills the cache for the next request. Fetch errors are
+    not cached.
+    """
+
+    def __init__(self, fetch_fn=fetch_wiki_description, path=None, ttl=None, negative_ttl=None, stale_ttl=None,
+                 wait_timeout=None, max_workers=2):
+        self.fetch_fn = fetch_fn
+        self.path = path or os.getenv('ROADMAP_DESCRIPTION_CACHE_PATH', DEFAULT_CACHE_PATH)
+        self.ttl = ttl if ttl is not None else int(os.getenv('ROADMAP_DESCRIPTION_TTL', str(30 * 24 * 3600)))
+        self.negative_ttl = negative_ttl if negative_ttl is not None else int(os.getenv('ROADMAP_DESCRIPTION_NEGATIVE_TTL', str(24 * 3600)))
+        self.stale_ttl = stale_ttl if stale_ttl is not None else int(os.getenv('ROADMAP_DESCRIPTION_STALE_TTL', str(7 * 24 * 3600)))
+        self.wait_timeout = wait_timeout if wait_timeout is not None else float(os.getenv('ROADMAP_DESCRIPTION_WAIT_TIMEOUT', '2'))
+        self._local = threading.local()
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='description-refresh')
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self._connection().execute(
+            "CREATE TABLE IF NOT EXISTS descriptions ("
+            "key TEXT PRIMARY KEY, description TEXT, fetched_at REAL NOT NULL)"
+        )
+
+    def _connection(self):
+        # sqlite3 connections may not be shared across threads, so keep one per thread
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def _read(self, key):
+        return self._connection().execute(
+            "SELECT description, fetched_at FROM descriptions WHERE key = ?", (key,)
+        ).fetchone()
+
+    def _write(self, key, description):
+        self._connection().execute(
+            "INSERT OR REPLACE INTO descriptions (key, description, fetched_at) VALUES (?, ?, ?)",
+            (key, description, time.time())
+        )
+
+    def _refresh(self, key, topic):
+        try:
+            description = self.fetch_fn(topic)
+            self._write(key, description)
+            return description
+        except Exception as e:
+            logger.warning(f"Could not refresh description for '{topic}': {str(e)}")
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def _schedule_refresh(self, key, topic):
+        """Start one background fetch per key and return its future"""
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is None:
+                future = self._executor.submit(self._refresh, key, topic)
+                self._inflight[key] = future
+            return future
+
+    def get(self, topic):
+        """Return the cached description for topic, or None if there is none (yet)"""
+        result = self._lookup(topic)
+        if result is None or isinstance(result, str):
+            return result
+        try:
+            return result.result(timeout=self.wait_timeout)
+        except FutureTimeoutError:
+            logger.info(f"Description for '{topic}' still loading after {self.wait_timeout:.1f}s")
+        except Exception:
+            pass
+        return None
+
+    async def aget(self, topic):
+        """Like get(), but waits for an upstream fetch on the event loop instead of blocking a thread"""
+        result = self._lookup(topic)
+        if result is None or isinstance(result, str):
+            return result
+        try:
+            # Shielded so a caller giving up does not cancel the fetch that fills the cache
+            return await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(result)), timeout=self.wait_timeout)
+        except asyncio.TimeoutError:
+            logger.info(f"Description for '{topic}' still loading after {self.wait_timeout:.1f}s")
+        except Exception:
+            pass
+        return None
+
+    def _lookup(self, topic):
+        """The cached description, or the Future of the fetch to wait on for a cold miss"""
+        key = description_key(topic)
+        if not key:
+            return None
+
+        try:
+            row = self._read(key)
+        except sqlite3.Error as e:
+            logger.warning(f"Description cache read failed: {str(e)}")
+            row = None
+
+        if row is not None:
+            description, fetched_at = row
+            age = time.time() - fetched_at
+            fresh_for = self.ttl if description is not None else self.negative_ttl
+            if age < fresh_for:
+                with self._lock:
+                    self.hits += 1
+                return description
+            if age < fresh_for + self.stale_ttl:
+                with self._lock:
+                    self.stale_hits += 1
+                self._schedule_refresh(key, topic)
+                return description
+
+        with self._lock:
+            self.misses += 1
+        return self._schedule_refresh(key, topic)
+
+    def stats(self):
+        """Hit/miss counters for this process"""
+        with self._lock:
+            lookups = self.hits + self.stale_hits + self.misses
+            return {
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+                "hit_ratio": (self.hits + self.stale_hits) / lookups if lookups else 0.0,
+                "refreshing": len(self._inflight)
+            }
@@ -0,0 +1,170 @@
+import logging
+import os
+import threading
+import time
+import traceback
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from .semantic_cache import topic_text
+
+logger = logging.getLogger(__name__)
+
+HEDGE_MODES = ('off', 'always', 'adaptive')
+
+
+class HedgeStats:
+    """Per-topic record of which source produced each roadmap.
+
+    Topics are keyed by ``topic_text`` so rephrasings of the same request share
+    counters. Only requests where the local model actually finished count
+    towards its failure rate, so runs cancelled because the backup won first do
+    not dilute it.
+    """
+
+    def __init__(self, min_samples=None, failure_rate=None, max_topics=1000):
+        self.min_samples = min_samples if min_samples is not None else int(os.getenv('ROADMAP_HEDGE_MIN_SAMPLES', '3'))
+        self.failure_rate = failure_rate if failure_rate is not None else float(os.getenv('ROADMAP_HEDGE_FAILURE_RATE', '0.3'))
+        self.max_topics = max_topics
+        self._topics = OrderedDict()
+        self._lock = threading.Lock()
+
+    def record(self, prompt, winner, local_failed=None):
+        """Count a finished request; local_failed is None when the local run was cancelled"""
+        key = topic_text(prompt)
+        with self._lock:
+            entry = self._topics.pop(key, None) or {
+                "requests": 0, "local_wins": 0, "backup_wins": 0, "local_finished": 0, "local_failures": 0
+            }
+            entry["requests"] += 1
+            if winner == 'local':
+                entry["local_wins"] += 1
+            elif winner == 'backup':
+                entry["backup_wins"] += 1
+            if local_failed is not None:
+                entry["local_finished"] += 1
+                entry["local_failures"] += int(local_failed)
+            self._topics[key] = entry
+            while len(self._topics) > self.max_topics:
+                self._topics.popitem(last=False)
+
+    def should_hedge(self, prompt):
+        """Whether the local model fails often enough on this topic to race the backup"""
+        with self._lock:
+            entry = self._topics.get(topic_text(prompt))
+            if entry is None or entry["local_finished"] < self.min_samples:
+                return False
+            return entry["local_failures"] / entry["local_finished"] >= self.failure_rate
+
+    def stats(self):
+        """Counters for every tracked topic, most recently used last"""
+        with self._lock:
+            return {key: dict(entry) for key, entry in self._topics.items()}
+
+
+class RoadmapHedger:
+    """Race the local model against the backup provider and keep the first valid roadmap.
+
+    ``local_fn(prompt, cancel_event, on_tokens)`` returns ``(result, error)`` and
+    stops early once ``cancel_event`` is set; ``backup_fn(prompt)`` returns a
+    result dict. The backup starts immediately, or once ``delay_ms`` has passed
+    or the local model has produced ``after_tokens`` tokens, whichever comes
+    first. A local failure starts the backup at once. ``on_backup_win(prompt,
+    local_error)`` is called when the backup's roadmap is the one returned;
+    local_error is None if the local run had not finished.
+    """
+
+    def __init__(self, local_fn, backup_fn, mode=None, delay_ms=None, after_tokens=None, stats=None, max_workers=None,
+                 on_backup_win=None):
+        self.local_fn = local_fn
+        self.backup_fn = backup_fn
+        self.on_backup_win = on_backup_win
+        self.mode = mode or os.getenv('ROADMAP_HEDGE_MODE', 'off').lower()
+        if self.mode not in HEDGE_MODES:
+            raise ValueError(f"Unknown hedge mode '{self.mode}'")
+        self.delay = (delay_ms if delay_ms is not None else float(os.getenv('ROADMAP_HEDGE_DELAY_MS', '0'))) / 1000.0
+        self.after_tokens = after_tokens if after_tokens is not None else int(os.getenv('ROADMAP_HEDGE_AFTER_TOKENS', '0'))
+        self.stats = stats or HedgeStats()
+        max_workers = max_workers or int(os.getenv('ROADMAP_HEDGE_MAX_WORKERS', '8'))
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='roadmap-hedge')
+
+    def should_hedge(self, prompt):
+        if self.mode == 'always':
+            return True
+        if self.mode == 'adaptive':
+            return self.stats.should_hedge(prompt)
+        return False
+
+    def _run_local(self, prompt, cancel_event, on_tokens):
+        try:
+            return self.local_fn(prompt, cancel_event, on_tokens)
+        except Exception as e:
+            logger.error(f"Local generation failed while hedging: {str(e)}")
+            logger.error(traceback.format_exc())
+            return None, "Failed to generate roadmap with local model"
+
+    def _run_backup(self, prompt):
+        try:
+            return self.backup_fn(prompt)
+        except Exception as e:
+            logger.error(f"Backup generation failed while hedging: {str(e)}")
+            return {"success": False, "error": str(e)}
+
+    def _backup_due(self, started_at, token_trigger):
+        if not self.delay and not self.after_tokens:
+            return True
+        if self.delay and time.monotonic() - started_at >= self.delay:
+            return True
+        return token_trigger.is_set()
+
+    def generate(self, prompt):
+        """Return the first valid roadmap from either source"""
+        cancel_event = threading.Event()
+        token_trigger = threading.Event()
+
+        def on_tokens(generated):
+            if self.after_tokens and generated >= self.after_tokens:
+                token_trigger.set()
+
+        started_at = time.monotonic()
+        local_future = self._executor.submit(self._run_local, prompt, cancel_event, on_tokens)
+        backup_future = None
+        local_failed = None
+        local_error = None
+        pending = {local_future}
+
+        while pending or backup_future is None:
+            if backup_future is None and (local_failed or self._backup_due(started_at, token_trigger)):
+                logger.info(f"Starting hedged backup request for '{prompt}'")
+                backup_future = self._executor.submit(self._run_backup, prompt)
+                pending.add(backup_future)
+
+            # Poll while the backup is waiting on its delay or token trigger
+            done, pending = wait(pending, timeout=None if backup_future else 0.02, return_when=FIRST_COMPLETED)
+
+            if local_future in done:
+                result, local_error = local_future.result()
+                local_failed = result is None
+                if result is not None:
+                    if backup_future is not None:
+                        backup_future.cancel()
+                    self.stats.record(prompt, 'local', local_failed=False)
+                    logger.info(f"Local model won the hedge for '{prompt}' in {time.monotonic() - started_at:.2f}s")
+                    return result
+
+            if backup_future is not None and backup_future in done:
+                result = backup_future.result()
+                if result and result.get('success'):
+                    # The losing local run stops at its next decoding step
+                    cancel_event.set()
+                    self.stats.record(prompt, 'backup', local_failed=local_failed)
+                    if self.on_backup_win is not None:
+                        self.on_backup_win(prompt, local_error)
+                    logger.info(f"Backup provider won the hedge for '{prompt}' in {time.monotonic() - started_at:.2f}s")
+                    return result
+                if local_failed or local_future.done():
+                    self.stats.record(prompt, None, local_failed=local_failed)
+                    return result or {"success": False, "error": local_error}
+
+        self.stats.record(prompt, None, local_failed=local_failed)
+        return {"success": False, "error": local_error or "Failed to generate roadmap with local or backup model"}
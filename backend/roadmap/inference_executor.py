@@ -0,0 +1,191 @@
+import asyncio
+import logging
+import math
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+
+class InferenceOverloaded(Exception):
+    """The inference queue is full, so the request was rejected without being queued"""
+
+    def __init__(self, retry_after):
+        super().__init__(f"Inference queue is full, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+_DONE = object()
+
+
+class DrainedStream:
+    """Items of a sync generator produced on a worker thread and read from sync or async code.
+
+    ``drain`` runs on the worker and pushes each item onto a queue: an asyncio
+    queue of ``loop`` when given (read with ``async for``), otherwise a plain
+    queue (read with ``for``). When the reader stops early, e.g. because the
+    client disconnected, the generator is closed at its next item so its own
+    cleanup runs.
+    """
+
+    def __init__(self, gen_fn, args=(), loop=None):
+        self.gen_fn = gen_fn
+        self.args = args
+        self.loop = loop
+        self._queue = asyncio.Queue() if loop is not None else queue.Queue()
+        self._stop = threading.Event()
+
+    def _put(self, entry):
+        if self.loop is None:
+            self._queue.put(entry)
+            return
+        try:
+            self.loop.call_soon_threadsafe(self._queue.put_nowait, entry)
+        except RuntimeError:
+            # The event loop is closed, so nobody is reading any more
+            self._stop.set()
+
+    def drain(self):
+        """Run the generator to the end (or until the reader stops), queueing its items"""
+        generator = self.gen_fn(*self.args)
+        try:
+            for item in generator:
+                if self._stop.is_set():
+                    break
+                self._put((item, None))
+            self._put((_DONE, None))
+        except Exception as e:
+            self._put((_DONE, e))
+        finally:
+            generator.close()
+
+    def __iter__(self):
+        try:
+            while True:
+                item, error = self._queue.get()
+                if item is _DONE:
+                    if error is not None:
+                        raise error
+                    return
+                yield item
+        finally:
+            self._stop.set()
+
+    async def __aiter__(self):
+        try:
+            while True:
+                item, error = await self._queue.get()
+                if item is _DONE:
+                    if error is not None:
+                        raise error
+                    return
+                yield item
+        finally:
+            self._stop.set()
+
+
+class InferenceExecutor:
+    """Bounded thread pool that model generations run on, with admission control.
+
+    At most ``max_workers`` generations run at once (matching the batch size, so
+    the batch scheduler can still fill its batches) and at most ``max_queue``
+    more wait for a worker. Anything beyond that raises ``InferenceOverloaded``
+    straight away with a Retry-After estimate based on recent generation times,
+    instead of piling up behind work the server cannot finish in time.
+    """
+
+    def __init__(self, max_workers=None, max_queue=None, name='inference'):
+        self.max_workers = max_workers or int(os.getenv(
+            'ROADMAP_INFERENCE_WORKERS', os.getenv('ROADMAP_BATCH_MAX_SIZE', '4')))
+        self.max_queue = max_queue if max_queue is not None else int(os.getenv('ROADMAP_INFERENCE_MAX_QUEUE', '16'))
+        self.name = name
+        self._lock = threading.Lock()
+        self._executor = None
+        self._pid = None
+        self._admitted = 0
+        self._running = 0
+        self._rejected = 0
+        self._completed = 0
+        # Moving average of how long one generation holds a worker
+        self._avg_seconds = None
+
+    def _get_executor(self):
+        # Threads do not survive fork, so each worker process gets its own pool
+        if self._executor is None or self._pid != os.getpid():
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=self.name)
+            self._pid = os.getpid()
+            self._admitted = 0
+            self._running = 0
+        return self._executor
+
+    def retry_after(self):
+        """Seconds until a worker is likely free for a new request"""
+        with self._lock:
+            avg_seconds = self._avg_seconds or 5.0
+            waves = (self._admitted + 1) / self.max_workers
+        return max(1, math.ceil(avg_seconds * waves))
+
+    def _run(self, fn, args, kwargs):
+        started = time.perf_counter()
+        with self._lock:
+            self._running += 1
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self._running -= 1
+                self._admitted -= 1
+                self._completed += 1
+                if self._avg_seconds is None:
+                    self._avg_seconds = elapsed
+                else:
+                    self._avg_seconds = 0.8 * self._avg_seconds + 0.2 * elapsed
+
+    def submit(self, fn, *args, **kwargs):
+        """Queue fn on a worker and return its Future, or raise InferenceOverloaded if the queue is full"""
+        with self._lock:
+            executor = self._get_executor()
+            if self._admitted >= self.max_workers + self.max_queue:
+                self._rejected += 1
+                overloaded = True
+            else:
+                self._admitted += 1
+                overloaded = False
+        if overloaded:
+            retry_after = self.retry_after()
+            logger.warning(f"Rejecting generation: {self.max_workers + self.max_queue} already admitted, "
+                           f"retry after {retry_after}s")
+            raise InferenceOverloaded(retry_after)
+        return executor.submit(self._run, fn, args, kwargs)
+
+    async def run(self, fn, *args, **kwargs):
+        """Run fn on a worker without blocking the event loop"""
+        return await asyncio.wrap_future(self.submit(fn, *args, **kwargs))
+
+    def stream(self, gen_fn, *args, loop=None):
+        """Drain the generator gen_fn(*args) on a worker and return a DrainedStream of its items.
+
+        The stream holds a worker, and counts against the queue limit, until it
+        is exhausted or abandoned; InferenceOverloaded is raised here, before any
+        response has been started.
+        """
+        stream = DrainedStream(gen_fn, args, loop)
+        self.submit(stream.drain)
+        return stream
+
+    def stats(self):
+        """Queue depth and admission counters for this process"""
+        with self._lock:
+            return {
+                "workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "running": self._running,
+                "queued": self._admitted - self._running,
+                "completed": self._completed,
+                "rejected": self._rejected,
+                "avg_seconds": round(self._avg_seconds, 3) if self._avg_seconds is not None else None
+            }
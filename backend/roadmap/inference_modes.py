@@ -0,0 +1,60 @@
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+INFERENCE_MODES = ('native', 'fp32', 'bf16', 'int8', 'compiled')
+
+
+def default_inference_mode():
+    """Inference mode selected by ROADMAP_INFERENCE_MODE, eager in the checkpoint's dtype by default"""
+    mode = os.getenv('ROADMAP_INFERENCE_MODE', 'native').lower()
+    if mode not in INFERENCE_MODES:
+        raise ValueError(f"Unknown inference mode '{mode}', expected one of {', '.join(INFERENCE_MODES)}")
+    return mode
+
+
+def _merge_adapter(model):
+    """Fold a LoRA adapter into its base weights so the model is a plain transformer"""
+    if hasattr(model, 'merge_and_unload'):
+        logger.info("Merging LoRA adapter into the base weights")
+        return model.merge_and_unload()
+    return model
+
+
+def apply_inference_mode(model, mode):
+    """Prepare a loaded model for CPU inference in the given mode and return it.
+
+    native: eager, in whatever dtype the checkpoint was loaded with.
+    fp32: eager float32, the reference mode.
+    bf16: bfloat16 weights and activations, half the memory traffic on CPUs with AVX512-BF16/AMX.
+    int8: float32 model whose Linear layers are dynamically quantized to int8.
+    compiled: the checkpoint's dtype with the forward pass compiled by torch.compile.
+
+    Only fp32, bf16 and int8 convert the weights; a bfloat16 merged checkpoint
+    stays bfloat16 otherwise.
+    """
+    import torch
+
+    if mode not in INFERENCE_MODES:
+        raise ValueError(f"Unknown inference mode '{mode}', expected one of {', '.join(INFERENCE_MODES)}")
+
+    if mode == 'bf16':
+        model = model.to(torch.bfloat16)
+    elif mode in ('fp32', 'int8'):
+        # Dynamic quantization needs float32 weights to start from
+        model = model.to(torch.float32)
+
+    if mode == 'int8':
+        # quantize_dynamic only swaps exact nn.Linear modules, so the LoRA wrappers
+        # have to be merged away first or the adapted projections stay in fp32
+        model = _merge_adapter(model)
+        model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    elif mode == 'compiled':
+        model = _merge_adapter(model)
+        # Sequence length and batch size change every step, so compile for dynamic shapes
+        model.forward = torch.compile(model.forward, dynamic=True)
+
+    model.eval()
+    logger.info(f"Model prepared for {mode} inference")
+    return model
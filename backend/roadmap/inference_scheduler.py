@@ -0,0 +1,121 @@
+import logging
+import os
+import queue
+import threading
+import time
+import traceback
+from concurrent.futures import Future
+
+logger = logging.getLogger(__name__)
+
+
+class _PendingRequest:
+    """A single queued item together with the future its caller is waiting on"""
+
+    __slots__ = ('item', 'future', 'enqueued_at')
+
+    def __init__(self, item):
+        self.item = item
+        self.future = Future()
+        self.enqueued_at = time.monotonic()
+
+
+class BatchScheduler:
+    """Gather requests that arrive within a short window and run them as one batch.
+
+    ``batch_fn`` receives a list of items and must return a list of results in the
+    same order. A single worker thread drives it, so the model only ever sees one
+    batch at a time and callers simply block on their own future.
+    """
+
+    def __init__(self, batch_fn, max_batch_size=8, max_wait_ms=25, name='inference'):
+        self.batch_fn = batch_fn
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, max_wait_ms / 1000.0)
+        self.name = name
+        self._lock = threading.Lock()
+        self._queue = None
+        self._worker = None
+        self._pid = None
+        self._running = 0
+
+    def _ensure_worker(self):
+        """Start the worker thread, restarting it after a fork"""
+        pid = os.getpid()
+        if self._worker is not None and self._pid == pid:
+            return
+        with self._lock:
+            if self._worker is not None and self._pid == pid:
+                return
+            # Threads do not survive fork, so a preloaded generator gets a fresh
+            # queue and worker in each child process
+            self._queue = queue.Queue()
+            self._running = 0
+            self._worker = threading.Thread(
+                target=self._run_forever,
+                name=f"{self.name}-batcher",
+                daemon=True
+            )
+            self._pid = pid
+            self._worker.start()
+
+    def submit(self, item):
+        """Queue an item and return a Future for its result"""
+        self._ensure_worker()
+        pending = _PendingRequest(item)
+        self._queue.put(pending)
+        return pending.future
+
+    def run(self, item, timeout=None):
+        """Queue an item and block until its batch has been processed"""
+        return self.submit(item).result(timeout=timeout)
+
+    def pending(self):
+        """Number of requests waiting for a batch slot"""
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def running(self):
+        """Number of requests in the batch being processed right now"""
+        return self._running
+
+    def _collect_batch(self):
+        """Block for the first request, then gather more until the window closes"""
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run_forever(self):
+        while True:
+            batch = self._collect_batch()
+            # Skip requests whose callers gave up while they were queued
+            live = [pending for pending in batch if pending.future.set_running_or_notify_cancel()]
+            if live:
+                self._running = len(live)
+                try:
+                    self._run_batch(live)
+                finally:
+                    self._running = 0
+
+    def _run_batch(self, batch):
+        logger.info(f"Running {self.name} batch of {len(batch)} request(s)")
+        try:
+            results = self.batch_fn([pending.item for pending in batch])
+            if len(results) != len(batch):
+                raise RuntimeError(f"Batch function returned {len(results)} results for {len(batch)} requests")
+        except Exception as e:
+            logger.error(f"Error running {self.name} batch: {str(e)}")
+            logger.error(traceback.format_exc())
+            for pending in batch:
+                pending.future.set_exception(e)
+            return
+
+        for pending, result in zip(batch, results):
+            pending.future.set_result(result)
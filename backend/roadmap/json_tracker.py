@@ -0,0 +1,132 @@
+import json
+
+# Maximum number of children kept at each level of the roadmap tree:
+# main topics, subtopics per main topic, points per subtopic
+NODE_LIMITS = (6, 4, 3)
+
+
+def limit_node_count(roadmap_json, node_limits=NODE_LIMITS, level=0):
+    """Trim the children at each level of the roadmap to node_limits"""
+    if not isinstance(roadmap_json, dict):
+        return roadmap_json
+
+    if 'children' in roadmap_json and isinstance(roadmap_json['children'], list):
+        if level < len(node_limits):
+            roadmap_json['children'] = roadmap_json['children'][:node_limits[level]]
+        for child in roadmap_json['children']:
+            limit_node_count(child, node_limits, level + 1)
+
+    return roadmap_json
+
+
+class RoadmapJsonTracker:
+    """Follow the structure of a streamed roadmap JSON object one character at a time.
+
+    Anything before the first ``{`` is ignored. The tracker reports ``done`` as soon
+    as the top-level object closes, or as soon as the model starts a main topic
+    beyond the first ``NODE_LIMITS`` entry, in which case the output is cut before
+    that topic and the open brackets are closed. Overflowing subtopics and points
+    cannot be cut without also losing the main topics that follow them, so those
+    are trimmed after parsing by ``limit_node_count``.
+    """
+
+    def __init__(self, node_limits=NODE_LIMITS):
+        self.node_limits = node_limits
+        self.position = 0
+        self.done = False
+        self.truncated = False
+        self.invalid = False
+        self.completed_main_topics = []
+        self._chars = []
+        self._start = None
+        self._end = None
+        # Each open container is [kind, child_object_count, start_index]
+        self._stack = []
+        self._object_depth = 0
+        self._in_string = False
+        self._escaped = False
+
+    def feed(self, chunk):
+        """Consume newly generated text; returns True once the roadmap is complete"""
+        for char in chunk:
+            if self.done:
+                break
+            index = self.position
+            self.position += 1
+            self._chars.append(char)
+
+            if self._start is None:
+                if char != '{':
+                    continue
+                self._start = index
+
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == '\\':
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char == '{':
+                self._open_object(index)
+            elif char == '[':
+                self._stack.append(['[', 0, index])
+            elif char in '}]':
+                self._close(char, index)
+        return self.done
+
+    def _open_object(self, index):
+        if self._stack and self._stack[-1][0] == '[':
+            parent = self._stack[-1]
+            parent[1] += 1
+            # Objects directly inside the root's children array are main topics
+            if self._object_depth == 1 and parent[1] > self.node_limits[0]:
+                self._truncate_before(index)
+                return
+        self._stack.append(['{', 0, index])
+        self._object_depth += 1
+
+    def _close(self, char, index):
+        expected = '{' if char == '}' else '['
+        if not self._stack or self._stack[-1][0] != expected:
+            self.invalid = True
+            self.done = True
+            return
+
+        opened = self._stack.pop()
+        if char == '}':
+            self._object_depth -= 1
+            if self._object_depth == 1:
+                self._record_main_topic(opened[2], index)
+
+        if not self._stack:
+            self._end = index + 1
+            self.done = True
+
+    def _record_main_topic(self, start, end):
+        try:
+            node = json.loads(''.join(self._chars[start:end + 1]))
+        except json.JSONDecodeError:
+            return
+        if isinstance(node, dict):
+            self.completed_main_topics.append(limit_node_count(node, self.node_limits[1:]))
+
+    def _truncate_before(self, index):
+        """Cut the output before an overflowing node and close what is still open"""
+        kept = ''.join(self._chars[self._start:index]).rstrip()
+        if kept.endswith(','):
+            kept = kept[:-1].rstrip()
+        closing = ''.join(']' if kind == '[' else '}' for kind, _, _ in reversed(self._stack))
+        self._truncated_text = kept + closing
+        self.truncated = True
+        self.done = True
+
+    def result_text(self):
+        """The roadmap JSON text if it is complete, otherwise everything fed so far"""
+        if self.truncated:
+            return self._truncated_text
+        if self._end is not None and not self.invalid:
+            return ''.join(self._chars[self._start:self._end])
+        return ''.join(self._chars).strip()
@@ -0,0 +1,173 @@
+import asyncio
+import json
+import os
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = "Replay a JSONL request trace against the API and report throughput, latency percentiles and RSS"
+
+    def add_arguments(self, parser):
+        from roadmap.benchmark import DEFAULT_TRACE_PATH
+
+        parser.add_argument('--trace', default=DEFAULT_TRACE_PATH, help="JSONL file of {\"path\", \"body\"} requests")
+        parser.add_argument('--concurrency', type=int, default=8, help="Requests in flight at once")
+        parser.add_argument('--repeat', type=int, default=1, help="Replay the trace this many times")
+        parser.add_argument('--warmup', type=int, default=0, help="Unmeasured requests from the start of the trace")
+        parser.add_argument(
+            '--real-model',
+            action='store_true',
+            help="Use the local model instead of the fake generator (Wikipedia and the backup stay stubbed)"
+        )
+        parser.add_argument(
+            '--url',
+            help="Replay against a running server at this base URL instead of in this process; no stubs are applied"
+        )
+        parser.add_argument('--no-cache', action='store_true', help="Send no_cache with every generate request")
+        parser.add_argument('--tokens-per-second', type=float, default=40.0, help="Speed of the fake generator")
+        parser.add_argument('--tokens', type=int, default=300, help="Tokens the fake generator produces per batch")
+        parser.add_argument(
+            '--failure-rate',
+            type=float,
+            default=0.1,
+            help="Share of prompts the fake generator fails on, sending them to the backup stub"
+        )
+        parser.add_argument('--wiki-latency', type=float, default=0.15, help="Seconds per stub Wikipedia lookup")
+        parser.add_argument('--backup-latency', type=float, default=0.5, help="Seconds per stub backup provider call")
+        parser.add_argument('--output', help="Where to save the JSON report (default: benchmark_results/<time>.json)")
+        parser.add_argument('--compare', help="A previous JSON report to compare this run against")
+
+    def handle(self, *args, **options):
+        from roadmap.benchmark import load_trace
+
+        try:
+            trace = load_trace(options['trace'])
+        except (OSError, ValueError) as e:
+            raise CommandError(f"Could not read trace: {str(e)}")
+        if not trace:
+            raise CommandError("The trace has no requests")
+        if options['no_cache']:
+            for item in trace:
+                if item['path'].rstrip('/').endswith('/generate'):
+                    item['body'] = dict(item['body'], no_cache=True)
+
+        if options['url']:
+            mode = 'remote'
+            report = asyncio.run(self._run_remote(trace, options))
+        else:
+            mode = 'real-model' if options['real_model'] else 'fake-model'
+            report = self._run_local(trace, options)
+
+        report = {
+            "mode": mode,
+            "started_at": time.strftime('%Y-%m-%dT%H:%M:%S'),
+            "config": {
+                key: options[key] for key in (
+                    'trace', 'concurrency', 'repeat', 'warmup', 'url', 'no_cache', 'tokens_per_second',
+                    'tokens', 'failure_rate', 'wiki_latency', 'backup_latency'
+                )
+            },
+            **report
+        }
+        self._print_report(report)
+        if options['compare']:
+            self._print_comparison(report, options['compare'])
+
+        output = options['output'] or os.path.join(
+            settings.BASE_DIR, 'benchmark_results', f"{time.strftime('%Y%m%d-%H%M%S')}-{mode}.json"
+        )
+        os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+        with open(output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        self.stderr.write(f"Saved report to {output}")
+
+    def _run_local(self, trace, options):
+        from django.db import connection
+        from django.test import AsyncClient
+        from django.test.utils import setup_test_environment, teardown_test_environment
+        from roadmap.benchmark import install_stubs, run_benchmark
+
+        install_stubs(
+            fake_model=not options['real_model'],
+            model_options={
+                'tokens_per_second': options['tokens_per_second'],
+                'tokens': options['tokens'],
+                'failure_rate': options['failure_rate'],
+            },
+            wiki_latency=options['wiki_latency'],
+            backup_latency=options['backup_latency']
+        )
+        # A throwaway database so cached roadmaps from earlier runs do not skew the numbers
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            client = AsyncClient()
+
+            async def send(item):
+                response = await client.post(item['path'], item['body'], content_type='application/json')
+                return response.status_code
+
+            return asyncio.run(run_benchmark(
+                trace, send, options['concurrency'], warmup=options['warmup'], repeat=options['repeat']
+            ))
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+    async def _run_remote(self, trace, options):
+        import httpx
+        from roadmap.benchmark import run_benchmark
+
+        limits = httpx.Limits(max_connections=options['concurrency'])
+        async with httpx.AsyncClient(base_url=options['url'], limits=limits, timeout=300) as client:
+            async def send(item):
+                response = await client.post(item['path'], json=item['body'])
+                return response.status_code
+
+            return await run_benchmark(
+                trace, send, options['concurrency'], warmup=options['warmup'], repeat=options['repeat']
+            )
+
+    def _print_report(self, report):
+        self.stdout.write(
+            f"{report['mode']}: {report['overall']['requests']} requests in {report['seconds']:.2f}s, "
+            f"peak RSS {report['peak_rss_mb']:.1f} MB"
+        )
+        header = f"{'path':<24}{'requests':>9}{'errors':>8}{'req/s':>9}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}"
+        self.stdout.write(header)
+        for path, summary in list(report['endpoints'].items()) + [('overall', report['overall'])]:
+            latency = summary['latency_ms']
+            self.stdout.write(
+                f"{path:<24}{summary['requests']:>9}{summary['errors']:>8}{summary['throughput_rps']:>9.2f}"
+                f"{latency['p50']:>10.1f}{latency['p90']:>10.1f}{latency['p99']:>10.1f}"
+            )
+
+    def _print_comparison(self, report, baseline_path):
+        try:
+            with open(baseline_path, encoding='utf-8') as f:
+                baseline = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            raise CommandError(f"Could not read baseline report: {str(e)}")
+
+        def change(new, old):
+            if new is None or not old:
+                return '-'
+            return f"{(new - old) / old:+.1%}"
+
+        self.stdout.write(f"Compared with {baseline_path}:")
+        self.stdout.write(f"{'path':<24}{'req/s':>10}{'p50':>10}{'p99':>10}")
+        current = dict(report['endpoints'], overall=report['overall'])
+        previous = dict(baseline.get('endpoints', {}), overall=baseline.get('overall'))
+        for path, summary in current.items():
+            old = previous.get(path)
+            if not old:
+                continue
+            self.stdout.write(
+                f"{path:<24}{change(summary['throughput_rps'], old['throughput_rps']):>10}"
+                f"{change(summary['latency_ms']['p50'], old['latency_ms']['p50']):>10}"
+                f"{change(summary['latency_ms']['p99'], old['latency_ms']['p99']):>10}"
+            )
+        self.stdout.write(f"{'peak RSS':<24}{change(report['peak_rss_mb'], baseline.get('peak_rss_mb')):>10}")
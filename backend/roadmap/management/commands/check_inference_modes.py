@@ -0,0 +1,79 @@
+import json
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from roadmap.inference_modes import INFERENCE_MODES
+
+DEFAULT_TOPICS = (
+    'Python Developer',
+    'Frontend Developer',
+    'Machine Learning Engineer',
+    'DevOps Engineer',
+)
+
+
+class Command(BaseCommand):
+    help = "Measure tokens/sec, peak RSS and JSON validity of the local model in each inference mode"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--modes',
+            nargs='+',
+            choices=INFERENCE_MODES,
+            default=list(INFERENCE_MODES),
+            help="Inference modes to check"
+        )
+        parser.add_argument(
+            '--topics',
+            nargs='+',
+            default=list(DEFAULT_TOPICS),
+            help="Topics to generate roadmaps for in every mode"
+        )
+        parser.add_argument(
+            '--warmup',
+            type=int,
+            default=1,
+            help="Unmeasured generations to run first in each mode"
+        )
+        parser.add_argument(
+            '--single',
+            choices=INFERENCE_MODES,
+            help="Check one mode in this process and print its report as JSON (used internally)"
+        )
+
+    def handle(self, *args, **options):
+        if options['single']:
+            from roadmap.ml_model import RoadmapGenerator
+
+            generator = RoadmapGenerator(inference_mode=options['single'])
+            report = generator.self_check(options['topics'], warmup=options['warmup'])
+            self.stdout.write(json.dumps(report))
+            return
+
+        reports = []
+        for mode in options['modes']:
+            self.stdout.write(f"Checking {mode}...")
+            # Every mode runs in a fresh process so peak RSS is not inherited from the last one
+            completed = subprocess.run(
+                [
+                    sys.executable, str(settings.BASE_DIR / 'manage.py'), 'check_inference_modes',
+                    '--single', mode, '--warmup', str(options['warmup']), '--topics', *options['topics']
+                ],
+                capture_output=True,
+                text=True
+            )
+            if completed.returncode != 0:
+                self.stderr.write(completed.stderr)
+                raise CommandError(f"Self-check failed in {mode} mode")
+            reports.append(json.loads(completed.stdout.strip().splitlines()[-1]))
+
+        header = f"{'mode':<10}{'tokens/s':>10}{'peak RSS MB':>13}{'valid JSON':>12}{'seconds':>10}"
+        self.stdout.write(header)
+        for report in reports:
+            self.stdout.write(
+                f"{report['mode']:<10}{report['tokens_per_second']:>10.2f}{report['peak_rss_mb']:>13.1f}"
+                f"{report['json_valid_rate']:>12.1%}{report['seconds']:>10.2f}"
+            )
@@ -0,0 +1,74 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+DTYPES = ('float32', 'bfloat16', 'float16')
+
+
+class Command(BaseCommand):
+    help = "Merge the LoRA adapter into the base model and export a single safetensors checkpoint"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output',
+            help="Directory to write the merged checkpoint to (defaults to ROADMAP_MERGED_MODEL_PATH or model/merged)"
+        )
+        parser.add_argument(
+            '--dtype',
+            choices=DTYPES,
+            default='float32',
+            help="Weight dtype of the exported checkpoint"
+        )
+        parser.add_argument(
+            '--max-shard-size',
+            default='10GB',
+            help="Largest safetensors shard to write; the default keeps the model in one file"
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help="Overwrite an existing merged checkpoint"
+        )
+
+    def handle(self, *args, **options):
+        import torch
+        from peft import PeftModel
+        from transformers import AutoModelForCausalLM, AutoTokenizer
+
+        from roadmap.ml_model import ADAPTER_PATH, BASE_MODEL_NAME, default_merged_model_path
+
+        adapter_path = ADAPTER_PATH
+        output_path = options['output'] or default_merged_model_path(adapter_path)
+
+        if os.path.isfile(os.path.join(output_path, 'config.json')) and not options['force']:
+            raise CommandError(f"A merged checkpoint already exists at {output_path}; pass --force to overwrite it")
+
+        started = time.perf_counter()
+        self.stdout.write(f"Loading base model {BASE_MODEL_NAME}...")
+        base_model = AutoModelForCausalLM.from_pretrained(BASE_MODEL_NAME, torch_dtype=torch.float32)
+        tokenizer = AutoTokenizer.from_pretrained(BASE_MODEL_NAME)
+
+        self.stdout.write(f"Applying LoRA adapter from {adapter_path}...")
+        model = PeftModel.from_pretrained(base_model, adapter_path)
+
+        # Fold the low-rank updates into q_proj/v_proj so inference runs a plain
+        # transformer without the extra LoRA matmuls
+        model = model.merge_and_unload()
+        # Merge in fp32 and only then cast, so rounding happens once
+        model = model.to(getattr(torch, options['dtype']))
+        model.eval()
+
+        os.makedirs(output_path, exist_ok=True)
+        self.stdout.write(f"Writing {options['dtype']} checkpoint to {output_path}...")
+        model.save_pretrained(
+            output_path,
+            safe_serialization=True,
+            max_shard_size=options['max_shard_size']
+        )
+        tokenizer.save_pretrained(output_path)
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Merged checkpoint exported in {elapsed:.1f}s; RoadmapGenerator will now load it on start"
+        ))
@@ -0,0 +1,44 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = "Generate introduction / why-learn / Q&A content for many topics in batched model calls"
+
+    def add_arguments(self, parser):
+        parser.add_argument('topics', nargs='*', help="Topics to generate content for")
+        parser.add_argument(
+            '--roadmap',
+            help="Generate content for every main topic and subtopic of the roadmap for this prompt"
+        )
+        parser.add_argument('--output', help="Write the content as JSON to this file instead of stdout")
+
+    def handle(self, *args, **options):
+        from roadmap.model_registry import get_roadmap_service, get_topic_content_generator
+        from roadmap.topic_resources import clean_topic_name, roadmap_node_names
+
+        topics = list(options['topics'])
+        if options['roadmap']:
+            result = get_roadmap_service().generate(options['roadmap'])
+            if not result.get('success'):
+                raise CommandError(f"Could not build roadmap: {result.get('error')}")
+            # Main topics and subtopics; the leaf points are too narrow for their own content
+            topics.extend(clean_topic_name(name) for name in roadmap_node_names(result['roadmap'], max_depth=2))
+        if not topics:
+            raise CommandError("Pass topics or --roadmap")
+
+        started = time.perf_counter()
+        contents = get_topic_content_generator().generate_many(topics)
+        elapsed = time.perf_counter() - started
+
+        output = json.dumps(contents, indent=2)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as f:
+                f.write(output)
+        else:
+            self.stdout.write(output)
+
+        failed = sum(1 for content in contents.values() if content is None)
+        self.stderr.write(f"Generated content for {len(contents) - failed}/{len(contents)} topics in {elapsed:.1f}s")
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = "Fill the roadmap and topic description caches for popular topics once"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--cpu-budget',
+            type=float,
+            help="Share of wall time to spend working, sleeping in between (defaults to ROADMAP_PREWARM_CPU_BUDGET)"
+        )
+
+    def handle(self, *args, **options):
+        from roadmap.prewarm import Prewarmer
+
+        report = Prewarmer(cpu_budget=options['cpu_budget']).run_once()
+        self.stdout.write(self.style.SUCCESS(
+            f"Prewarmed {report['prompts']} roadmaps and {report['topics']} topic descriptions in {report['seconds']}s"
+        ))
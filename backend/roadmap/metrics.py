@@ -0,0 +1,269 @@
+import abc
+import bisect
+import logging
+import math
+import threading
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+# Seconds; wide enough for a sub-millisecond regex check and a minute-long generation
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120)
+
+
+def _format_value(value):
+    if value == math.inf:
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in labels) + '}'
+
+
+class _Metric(abc.ABC):
+    type_name = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def _key(self, labels):
+        return tuple(str(labels.get(name, '')) for name in self.labelnames)
+
+    @property
+    def exposed_name(self):
+        return self.name
+
+    @abc.abstractmethod
+    def _samples(self):
+        """Yield (name suffix, [(label, value)], sample value) for every series"""
+
+    def render(self):
+        lines = [
+            f"# HELP {self.exposed_name} {self.documentation}",
+            f"# TYPE {self.exposed_name} {self.type_name}"
+        ]
+        for suffix, labels, value in self._samples():
+            lines.append(f"{self.name}{suffix}{_format_labels(labels)} {_format_value(value)}")
+        return lines
+
+
+class Counter(_Metric):
+    """Monotonic count, optionally split by labels"""
+
+    type_name = 'counter'
+
+    @property
+    def exposed_name(self):
+        return f"{self.name}_total"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def _samples(self):
+        with self._lock:
+            values = dict(self._values)
+        for key, value in sorted(values.items()):
+            yield '_total', list(zip(self.labelnames, key)), value
+
+
+class Histogram(_Metric):
+    """Distribution of observed values in fixed buckets, optionally split by labels"""
+
+    type_name = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                # Per-bucket counts plus an overflow slot, then sum and count
+                entry = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            entry[0][index] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the wall time of the with block"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def _samples(self):
+        with self._lock:
+            values = {key: (list(counts), total, count) for key, (counts, total, count) in self._values.items()}
+        for key, (counts, total, count) in sorted(values.items()):
+            labels = list(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (math.inf,), counts):
+                cumulative += bucket_count
+                yield '_bucket', labels + [('le', _format_value(float(bound)))], cumulative
+            yield '_sum', labels, total
+            yield '_count', labels, count
+
+
+class MetricsRegistry:
+    """Process-local metrics rendered in the Prometheus text format.
+
+    Recording is a dict lookup and an increment under a lock, cheap enough to
+    leave on in production. Collectors are called at scrape time for values
+    that other components already track, such as cache hit counters.
+    """
+
+    def __init__(self):
+        self._metrics = []
+        self._collectors = []
+
+    def counter(self, name, documentation, labelnames=()):
+        metric = Counter(name, documentation, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        metric = Histogram(name, documentation, labelnames, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def register_collector(self, collector):
+        """Add a zero-argument callable returning [(name, type, help, [(labels dict, value)])]"""
+        self._collectors.append(collector)
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format"""
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        for collector in self._collectors:
+            try:
+                families = collector()
+            except Exception as e:
+                logger.warning(f"Metrics collector failed: {str(e)}")
+                continue
+            for name, type_name, documentation, samples in families:
+                lines.append(f"# HELP {name} {documentation}")
+                lines.append(f"# TYPE {name} {type_name}")
+                for labels, value in samples:
+                    lines.append(f"{name}{_format_labels(sorted(labels.items()))} {_format_value(value)}")
+        return '\n'.join(lines) + '\n'
+
+
+metrics = MetricsRegistry()
+
+STAGE_SECONDS = metrics.histogram(
+    'roadmap_stage_seconds',
+    'Time spent in each stage of roadmap generation and resource lookups',
+    ['stage']
+)
+GENERATED_TOKENS = metrics.counter(
+    'roadmap_generated_tokens',
+    'Tokens generated by the local model',
+    ['kind']
+)
+TOKENS_PER_SECOND = metrics.histogram(
+    'roadmap_generation_tokens_per_second',
+    'Generated tokens per second of each local generate call, summed over the batch',
+    ['kind'],
+    buckets=(1, 2, 5, 10, 20, 35, 50, 75, 100, 150, 200, 300, 500)
+)
+GENERATIONS = metrics.counter(
+    'roadmap_generations',
+    'Roadmap generations by the source that produced the result',
+    ['source']
+)
+FALLBACKS = metrics.counter(
+    'roadmap_fallbacks',
+    'Roadmaps served by the backup model after the local model failed or lost the hedge, by reason',
+    ['reason']
+)
+
+
+def record_generation(kind, tokens, seconds):
+    """Count tokens from one generate call and its throughput"""
+    GENERATED_TOKENS.inc(tokens, kind=kind)
+    if seconds > 0:
+        TOKENS_PER_SECOND.observe(tokens / seconds, kind=kind)
+
+
+def _cache_samples(caches):
+    hits, misses, ratios = [], [], []
+    for name, stats in caches:
+        hits.append(({'cache': name}, stats['hits'] + stats.get('stale_hits', 0)))
+        misses.append(({'cache': name}, stats['misses']))
+        ratios.append(({'cache': name}, stats['hit_ratio']))
+    return [
+        ('roadmap_cache_hits_total', 'counter', 'Cache lookups answered from the cache', hits),
+        ('roadmap_cache_misses_total', 'counter', 'Cache lookups that missed', misses),
+        ('roadmap_cache_hit_ratio', 'gauge', 'Share of cache lookups answered from the cache', ratios),
+    ]
+
+
+def collect_runtime_metrics():
+    """Cache, queue and decoder statistics of the components loaded in this process"""
+    from .model_registry import registry
+
+    families = []
+    caches = []
+    if registry.is_loaded('roadmap_service'):
+        service = registry.get('roadmap_service')
+        caches.append(('result', service.cache.stats()))
+        if service.semantic_cache is not None:
+            caches.append(('semantic', service.semantic_cache.stats()))
+    if registry.is_loaded('description_cache'):
+        caches.append(('description', registry.get('description_cache').stats()))
+    if caches:
+        families.extend(_cache_samples(caches))
+
+    queue = []
+    if registry.is_loaded('roadmap_generator'):
+        generator = registry.get('roadmap_generator')
+        if generator.scheduler is not None:
+            queue.append(({'queue': 'batch'}, generator.scheduler.pending()))
+        if generator.speculative is not None:
+            stats = generator.speculative.stats()
+            families.append((
+                'roadmap_speculative_acceptance_ratio', 'gauge',
+                'Share of drafted tokens accepted by speculative decoding',
+                [({}, stats['acceptance_rate'])]
+            ))
+    if registry.is_loaded('inference_executor'):
+        stats = registry.get('inference_executor').stats()
+        queue.append(({'queue': 'inference'}, stats['queued']))
+        families.append((
+            'roadmap_inference_running', 'gauge', 'Generations running on the inference executor',
+            [({}, stats['running'])]
+        ))
+        families.append((
+            'roadmap_inference_rejected_total', 'counter', 'Generations rejected by admission control',
+            [({}, stats['rejected'])]
+        ))
+    if registry.is_loaded('description_cache'):
+        queue.append(({'queue': 'description_refresh'}, registry.get('description_cache').stats()['refreshing']))
+    if queue:
+        families.append(('roadmap_queue_depth', 'gauge', 'Requests waiting in each queue', queue))
+    return families
+
+
+metrics.register_collector(collect_runtime_metrics)
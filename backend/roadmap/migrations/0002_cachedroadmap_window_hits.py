@@ -0,0 +1,26 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('roadmap', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cachedroadmap',
+            name='access_window',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='cachedroadmap',
+            name='previous_window_hits',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='cachedroadmap',
+            name='window_hits',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -1,41 +1,225 @@
-from transformers import AutoModelForCausalLM, AutoTokenizer
+from transformers import (
+    AutoModelForCausalLM,
+    AutoTokenizer,
+    LogitsProcessorList,
+    StoppingCriteria,
+    StoppingCriteriaList,
+    TextIteratorStreamer
+)
 import torch
 import os
+import resource
+import threading
+import time
 import re
 import json
 import logging
 import traceback
 from peft import PeftModel
-from .backup_generator import BackupModelGenerator  # Updated import
+from .constrained_decoding import RoadmapSchema, RoadmapSchemaLogitsProcessor
+from .curated_index import CuratedRoadmapIndex
+from .inference_scheduler import BatchScheduler
+from .hedging import RoadmapHedger
+from .inference_modes import apply_inference_mode, default_inference_mode
+from .json_tracker import RoadmapJsonTracker, limit_node_count
+from .metrics import FALLBACKS, GENERATIONS, STAGE_SECONDS, record_generation
+from .model_registry import get_backup_generator
+from .speculative import NgramDraftIndex, SpeculativeDecoder
+from .tech_classifier import tech_classifier
 
 logger = logging.getLogger(__name__)
 
+BASE_MODEL_NAME = "TinyLlama/TinyLlama-1.1B-Chat-v1.0"
+ADAPTER_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'model')
+PROMPT_PREFIX = "Create a learning roadmap for the following topic\n"
+
+# Metric labels for the reasons a roadmap is handed to the backup model
+FALLBACK_REASONS = {
+    "Failed to generate roadmap with local model": "invalid_json",
+    "local model failed to generate valid roadmap": "invalid_structure",
+    "Local generation cancelled": "cancelled",
+    # The hedged backup answered before the local model finished
+    None: "hedged",
+}
+
+
+def default_merged_model_path(model_path):
+    """Location of the merged checkpoint written by `manage.py export_merged_model`"""
+    return os.getenv('ROADMAP_MERGED_MODEL_PATH', os.path.join(model_path, 'merged'))
+
+
+class GenerationRequest:
+    """A formatted prompt queued for generation, with optional cancellation and progress hooks"""
+
+    __slots__ = ('prompt', 'cancel_event', 'on_tokens')
+
+    def __init__(self, prompt, cancel_event=None, on_tokens=None):
+        self.prompt = prompt
+        self.cancel_event = cancel_event
+        self.on_tokens = on_tokens
+
+    def cancelled(self):
+        return self.cancel_event is not None and self.cancel_event.is_set()
+
+
+class RoadmapJsonStoppingCriteria(StoppingCriteria):
+    """Stop generation once every sequence in the batch has closed its roadmap object or been cancelled.
+
+    With ``stop_on_first`` the batch holds candidates for one prompt, so it stops as
+    soon as any of them has produced a complete roadmap.
+    """
+
+    def __init__(self, tokenizer, prompt_length, requests, stop_on_first=False):
+        self.tokenizer = tokenizer
+        self.prompt_length = prompt_length
+        self.requests = requests
+        self.stop_on_first = stop_on_first
+        self.trackers = [RoadmapJsonTracker() for _ in requests]
+        # Per row, where the tokens decoded for context start and where the
+        # tokens not yet fed to the tracker start, relative to the prompt
+        self._offsets = [(0, 0) for _ in requests]
+        self._ended = set()
+
+    def _new_text(self, row, token_ids):
+        """Text of the tokens not fed yet, or None while they end inside a multi-byte character.
+
+        The tokens fed last step are decoded along with the new ones, because
+        sentencepiece renders a token's leading space differently at the start
+        of a sequence; the new text is what the new tokens add to theirs.
+        """
+        prefix_offset, read_offset = self._offsets[row]
+        prefix_text = self.tokenizer.decode(token_ids[prefix_offset:read_offset], skip_special_tokens=True)
+        text = self.tokenizer.decode(token_ids[prefix_offset:], skip_special_tokens=True)
+        if len(text) <= len(prefix_text) or text.endswith('\ufffd'):
+            return None
+        self._offsets[row] = (read_offset, len(token_ids))
+        return text[len(prefix_text):]
+
+    def __call__(self, input_ids, scores, **kwargs):
+        generated = input_ids.shape[1] - self.prompt_length
+        finished = True
+        for row, (request, tracker) in enumerate(zip(self.requests, self.trackers)):
+            if tracker.done or request.cancelled():
+                continue
+            if request.on_tokens is not None:
+                request.on_tokens(generated)
+            if row in self._ended:
+                continue
+            token_ids = input_ids[row, self.prompt_length:]
+            text = self._new_text(row, token_ids)
+            if text is not None:
+                tracker.feed(text)
+            if self.stop_on_first and tracker.done and not tracker.invalid:
+                return True
+            if len(token_ids) and token_ids[-1] == self.tokenizer.eos_token_id:
+                # generate only pads this row from here on, so there is nothing left to follow
+                self._ended.add(row)
+                continue
+            finished = finished and tracker.done
+        return finished
+
+    def result_text(self, row, fallback):
+        """The tracked roadmap text for a row, or the decoded fallback if it never started"""
+        tracker = self.trackers[row]
+        return tracker.result_text() if tracker.done else fallback
+
+
 class RoadmapGenerator:
-    def __init__(self):
+    def __init__(self, inference_mode=None):
         self.model = None
         self.tokenizer = None
-        self.model_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'model')
+        self.model_path = ADAPTER_PATH
+        self.merged_model_path = default_merged_model_path(self.model_path)
+        self.inference_mode = inference_mode or default_inference_mode()
+        self.scheduler = None
+        self.schema = None
+        self.hedger = None
+        self.prefix_ids = None
+        self.prefix_cache = None
+        self.speculative = None
+        self.best_of = max(1, int(os.getenv('ROADMAP_BEST_OF', '1')))
         self.load_model()
 
+        # Every prompt starts with the same instruction, so its attention keys and
+        # values are computed once here instead of in every prefill
+        if os.getenv('ROADMAP_PREFIX_CACHE', '1').lower() in ('1', 'true', 'yes'):
+            self.build_prefix_cache()
+
+        # Only let the model sample tokens that keep its output a valid roadmap,
+        # so the remote fallback is reserved for real failures
+        if os.getenv('ROADMAP_CONSTRAINED_DECODING', '1').lower() in ('1', 'true', 'yes'):
+            self.schema = RoadmapSchema(self.tokenizer)
+
+        # Single-sequence generations verify drafts copied from earlier text and the
+        # curated roadmaps, emitting several tokens per forward pass
+        if os.getenv('ROADMAP_SPECULATIVE', '1').lower() in ('1', 'true', 'yes'):
+            self.speculative = self._build_speculative_decoder()
+
+        # Concurrent requests share one padded generate call instead of queueing
+        # for full-length generations one after another
+        max_batch_size = int(os.getenv('ROADMAP_BATCH_MAX_SIZE', '4'))
+        if max_batch_size > 1:
+            self.scheduler = BatchScheduler(
+                self.generate_texts,
+                max_batch_size=max_batch_size,
+                max_wait_ms=float(os.getenv('ROADMAP_BATCH_MAX_WAIT_MS', '25')),
+                name='roadmap'
+            )
+
+        if os.getenv('ROADMAP_HEDGE_MODE', 'off').lower() != 'off':
+            self.hedger = RoadmapHedger(
+                self.generate_local,
+                lambda prompt: self._backup_roadmap(prompt, "Failed to generate roadmap with local or backup model"),
+                on_backup_win=lambda prompt, local_error: self._record_fallback(local_error)
+            )
+
+    def has_merged_checkpoint(self):
+        """Check whether a merged base+adapter checkpoint has been exported"""
+        return os.path.isfile(os.path.join(self.merged_model_path, 'config.json'))
+
     def load_model(self):
         """Load the fine-tuned model and tokenizer"""
         try:
-            logger.info("Loading model and tokenizer...")
-            # First load the base model
-            base_model_name = "TinyLlama/TinyLlama-1.1B-Chat-v1.0"
-            base_model = AutoModelForCausalLM.from_pretrained(base_model_name)
-            self.tokenizer = AutoTokenizer.from_pretrained(base_model_name)
-            
-            # Then load the LoRA adapter
-            logger.info(f"Loading LoRA adapter from {self.model_path}")
-            self.model = PeftModel.from_pretrained(base_model, self.model_path)
-            self.model.eval()
+            if self.has_merged_checkpoint():
+                self._load_merged_model()
+            else:
+                self._load_adapter_model()
+            self.model = apply_inference_mode(self.model, self.inference_mode)
+
+            # Batched decoder-only generation needs a pad token and left padding
+            if self.tokenizer.pad_token is None:
+                self.tokenizer.pad_token = self.tokenizer.eos_token
+            self.tokenizer.padding_side = 'left'
             logger.info("Model loaded successfully!")
         except Exception as e:
             logger.error(f"Error loading model: {str(e)}")
             logger.error(traceback.format_exc())
             raise
 
+    def _load_merged_model(self):
+        """Load the self-contained checkpoint with the LoRA weights already folded in"""
+        logger.info(f"Loading merged model from {self.merged_model_path}")
+        # safetensors files are memory-mapped, so the weights are not copied through
+        # an intermediate state dict and keep the dtype they were exported with
+        self.model = AutoModelForCausalLM.from_pretrained(
+            self.merged_model_path,
+            torch_dtype="auto",
+            low_cpu_mem_usage=True,
+            use_safetensors=True
+        )
+        self.tokenizer = AutoTokenizer.from_pretrained(self.merged_model_path)
+
+    def _load_adapter_model(self):
+        """Load the base model from the hub and wrap it with the LoRA adapter"""
+        logger.info("Loading model and tokenizer...")
+        # First load the base model
+        base_model = AutoModelForCausalLM.from_pretrained(BASE_MODEL_NAME)
+        self.tokenizer = AutoTokenizer.from_pretrained(BASE_MODEL_NAME)
+
+        # Then load the LoRA adapter
+        logger.info(f"Loading LoRA adapter from {self.model_path}")
+        self.model = PeftModel.from_pretrained(base_model, self.model_path)
+
     def clean_roadmap_text(self, text):
         """Remove time durations from text"""
         # Remove patterns like (1 hour), (2 hours), (1hr), etc.
@@ -46,15 +230,299 @@ class RoadmapGenerator:
 
     def _generate_prompt(self, topic):
         """Generate the prompt for the model"""
-        return f"Create a learning roadmap for the following topic\n{topic}"
+        return f"{PROMPT_PREFIX}{topic}"
+
+    def _build_speculative_decoder(self):
+        """Speculative sampler drafting from n-grams of the prompt, the output so far and the curated roadmaps"""
+        corpus = [
+            self.tokenizer.encode(json.dumps(roadmap), add_special_tokens=False)
+            for roadmap in CuratedRoadmapIndex().roadmaps()
+        ]
+        draft_index = NgramDraftIndex(
+            corpus,
+            max_draft_tokens=int(os.getenv('ROADMAP_SPECULATIVE_DRAFT_TOKENS', '8'))
+        )
+        settings = self._generation_kwargs()
+        return SpeculativeDecoder(
+            self.model,
+            draft_index,
+            self.tokenizer.eos_token_id,
+            temperature=settings['temperature'],
+            top_k=settings['top_k'],
+            top_p=settings['top_p']
+        )
+
+    def build_prefix_cache(self):
+        """Run the fixed instruction prefix through the model once and keep its key/value cache"""
+        prefix_ids = self.tokenizer(PROMPT_PREFIX, return_tensors="pt")['input_ids']
+        with torch.no_grad():
+            outputs = self.model(input_ids=prefix_ids, use_cache=True)
+
+        past_key_values = outputs.past_key_values
+        if hasattr(past_key_values, 'to_legacy_cache'):
+            past_key_values = past_key_values.to_legacy_cache()
+        self.prefix_ids = prefix_ids[0].tolist()
+        self.prefix_cache = tuple(tuple(layer) for layer in past_key_values)
+        logger.info(f"Cached key/values for the {len(self.prefix_ids)}-token prompt prefix")
+
+    def _tokenize(self, formatted_prompts):
+        """Tokenize a batch of prompts into left-padded model inputs"""
+        if self.prefix_cache is not None:
+            inputs = self._tokenize_with_prefix(formatted_prompts)
+            if inputs is not None:
+                return inputs
+
+        inputs = self.tokenizer(
+            formatted_prompts,
+            return_tensors="pt",
+            padding=True,
+            truncation=True,
+            max_length=2048
+        )
+
+        attention_mask = inputs.get('attention_mask', None)
+        if attention_mask is None:
+            attention_mask = torch.ones_like(inputs['input_ids'])
+            inputs['attention_mask'] = attention_mask
+        return inputs
+
+    def _tokenize_with_prefix(self, formatted_prompts):
+        """Tokenize prompts that start with the cached prefix so only their topics are prefilled.
+
+        Padding goes between the shared prefix and each topic: every row keeps the
+        prefix at the positions it was cached at and still ends in the same column.
+        Returns None when a prompt does not tokenize to the cached prefix plus a topic.
+        """
+        encoded = self.tokenizer(formatted_prompts, truncation=True, max_length=2048)['input_ids']
+        prefix_length = len(self.prefix_ids)
+        topics = []
+        for ids in encoded:
+            if len(ids) <= prefix_length or ids[:prefix_length] != self.prefix_ids:
+                return None
+            topics.append(ids[prefix_length:])
+
+        width = max(len(topic) for topic in topics)
+        pad_token_id = self.tokenizer.pad_token_id
+        input_ids = [self.prefix_ids + [pad_token_id] * (width - len(topic)) + topic for topic in topics]
+        attention_mask = [[1] * prefix_length + [0] * (width - len(topic)) + [1] * len(topic) for topic in topics]
+        batch_size = len(topics)
+        return {
+            'input_ids': torch.tensor(input_ids),
+            'attention_mask': torch.tensor(attention_mask),
+            # Expanded views share the cached tensors; generate concatenates new keys
+            # and values onto them rather than writing in place
+            'past_key_values': tuple(
+                tuple(tensor.expand(batch_size, -1, -1, -1) for tensor in layer)
+                for layer in self.prefix_cache
+            )
+        }
+
+    def _generation_kwargs(self):
+        """Sampling settings shared by the batched and streaming generate calls"""
+        return {
+            "max_length": 2048,
+            "temperature": 0.7,
+            "num_return_sequences": 1,
+            "do_sample": True,
+            "top_p": 0.95,
+            "top_k": 50,
+            "pad_token_id": self.tokenizer.pad_token_id
+        }
+
+    def _logits_processors(self, prompt_length):
+        """Logits processors applied to every roadmap generate call"""
+        processors = LogitsProcessorList()
+        if self.schema is not None:
+            processors.append(RoadmapSchemaLogitsProcessor(self.schema, prompt_length))
+        return processors
+
+    def generate_texts(self, formatted_prompts):
+        """Run one batched generate call and return the completion for each prompt.
+
+        Items may be plain prompt strings or GenerationRequest objects carrying a
+        cancel event and a token-progress callback.
+        """
+        requests = [
+            prompt if isinstance(prompt, GenerationRequest) else GenerationRequest(prompt)
+            for prompt in formatted_prompts
+        ]
+        with STAGE_SECONDS.time(stage='tokenize'):
+            inputs = self._tokenize([request.prompt for request in requests])
+        # Prompts are left-padded to a common width, so every completion starts there
+        prompt_length = inputs['input_ids'].shape[1]
+        json_criteria = RoadmapJsonStoppingCriteria(self.tokenizer, prompt_length, requests)
+
+        logger.info(f"Generating {len(requests)} response(s) with local model...")
+        started = time.perf_counter()
+        if self.speculative is not None and len(requests) == 1:
+            outputs = self.speculative.generate(
+                inputs['input_ids'],
+                past_key_values=inputs.get('past_key_values'),
+                logits_processor=self._logits_processors(prompt_length),
+                stopping_criteria=StoppingCriteriaList([json_criteria]),
+                max_length=self._generation_kwargs()['max_length']
+            )
+        else:
+            with torch.no_grad():
+                outputs = self.model.generate(
+                    input_ids=inputs['input_ids'],
+                    attention_mask=inputs['attention_mask'],
+                    past_key_values=inputs.get('past_key_values'),
+                    logits_processor=self._logits_processors(prompt_length),
+                    stopping_criteria=StoppingCriteriaList([json_criteria]),
+                    **self._generation_kwargs()
+                )
+        self._record_generate(outputs, prompt_length, started, 'roadmap')
+
+        return self._decode_results(outputs, prompt_length, json_criteria)
+
+    def _record_generate(self, outputs, prompt_length, started, kind):
+        """Record the generate stage time and the number of tokens it produced"""
+        elapsed = time.perf_counter() - started
+        STAGE_SECONDS.observe(elapsed, stage='generate')
+        tokens = int((outputs[:, prompt_length:] != self.tokenizer.pad_token_id).sum())
+        record_generation(kind, tokens, elapsed)
+
+    def _decode_results(self, outputs, prompt_length, json_criteria):
+        """Decode each generated row, preferring the text the JSON tracker stopped at"""
+        with STAGE_SECONDS.time(stage='decode'):
+            return [
+                json_criteria.result_text(
+                    row,
+                    self.tokenizer.decode(sequence[prompt_length:], skip_special_tokens=True).strip()
+                )
+                for row, sequence in enumerate(outputs)
+            ]
+
+    def generate_free_texts(self, formatted_prompts, max_new_tokens=384):
+        """Sample plain-text completions for a batch of prompts, without the roadmap schema or JSON stopping"""
+        inputs = self._tokenize(formatted_prompts)
+        prompt_length = inputs['input_ids'].shape[1]
+        settings = self._generation_kwargs()
+        settings.pop('max_length')
+
+        logger.info(f"Generating {len(formatted_prompts)} text completion(s) with local model...")
+        with torch.no_grad():
+            outputs = self.model.generate(
+                input_ids=inputs['input_ids'],
+                attention_mask=inputs['attention_mask'],
+                past_key_values=inputs.get('past_key_values'),
+                max_new_tokens=max_new_tokens,
+                **settings
+            )
+
+        return [
+            self.tokenizer.decode(sequence[prompt_length:], skip_special_tokens=True).strip()
+            for sequence in outputs
+        ]
+
+    def _complete(self, formatted_prompt, cancel_event=None, on_tokens=None):
+        """Generate a completion, sharing a batch with concurrent callers when enabled"""
+        request = GenerationRequest(formatted_prompt, cancel_event, on_tokens)
+        if self.scheduler is not None:
+            return self.scheduler.run(request)
+        return self.generate_texts([request])[0]
+
+    def generate_candidates(self, formatted_prompt, count, cancel_event=None, on_tokens=None):
+        """Sample count completions of one prompt in a single generate call, prefilling the prompt once"""
+        with STAGE_SECONDS.time(stage='tokenize'):
+            inputs = self._tokenize([formatted_prompt])
+        input_ids = inputs['input_ids']
+        prompt_length = input_ids.shape[1]
+        past_key_values = inputs.get('past_key_values')
+        cached = len(self.prefix_ids) if past_key_values is not None else 0
+
+        # Run the prompt (all but its last token) through the model once; every
+        # candidate then starts from a view of the same key/value cache
+        if prompt_length - 1 > cached:
+            with torch.no_grad():
+                past_key_values = self.model(
+                    input_ids=input_ids[:, cached:-1],
+                    past_key_values=past_key_values,
+                    use_cache=True
+                ).past_key_values
+            if hasattr(past_key_values, 'to_legacy_cache'):
+                past_key_values = past_key_values.to_legacy_cache()
+        if past_key_values is not None:
+            past_key_values = tuple(
+                tuple(tensor.expand(count, -1, -1, -1) for tensor in layer)
+                for layer in past_key_values
+            )
+
+        requests = [GenerationRequest(formatted_prompt, cancel_event, on_tokens) for _ in range(count)]
+        json_criteria = RoadmapJsonStoppingCriteria(self.tokenizer, prompt_length, requests, stop_on_first=True)
+
+        logger.info(f"Sampling {count} candidate roadmaps with local model...")
+        started = time.perf_counter()
+        with torch.no_grad():
+            outputs = self.model.generate(
+                input_ids=input_ids.repeat(count, 1),
+                attention_mask=inputs['attention_mask'].repeat(count, 1),
+                past_key_values=past_key_values,
+                logits_processor=self._logits_processors(prompt_length),
+                stopping_criteria=StoppingCriteriaList([json_criteria]),
+                **self._generation_kwargs()
+            )
+        self._record_generate(outputs, prompt_length, started, 'candidates')
+
+        return self._decode_results(outputs, prompt_length, json_criteria)
+
+    def generate_local(self, prompt, cancel_event=None, on_tokens=None):
+        """Generate with the local model only; returns (result, None) or (None, error)"""
+        formatted_prompt = self._generate_prompt(prompt)
+        logger.info(f"Using prompt: {formatted_prompt}")
+        if self.best_of > 1:
+            candidates = self.generate_candidates(formatted_prompt, self.best_of, cancel_event, on_tokens)
+        else:
+            candidates = [self._complete(formatted_prompt, cancel_event, on_tokens)]
+        if cancel_event is not None and cancel_event.is_set():
+            return None, "Local generation cancelled"
+
+        local_error = None
+        for index, roadmap in enumerate(candidates):
+            result, local_error = self._parse_local_output(roadmap)
+            if result is not None:
+                if index:
+                    logger.info(f"Local candidate {index + 1} of {len(candidates)} passed validation")
+                return result, None
+        return None, local_error
+
+    def self_check(self, topics, warmup=1):
+        """Generate a roadmap per topic and report throughput, peak memory and JSON validity"""
+        # Warm-up runs pay one-off costs such as compilation and are not measured
+        for topic in topics[:warmup]:
+            self.generate_texts([self._generate_prompt(topic)])
+
+        generated_tokens = 0
+        valid = 0
+        started = time.perf_counter()
+        for topic in topics:
+            text = self.generate_texts([self._generate_prompt(topic)])[0]
+            generated_tokens += len(self.tokenizer.encode(text, add_special_tokens=False))
+            result, _ = self._parse_local_output(text)
+            valid += result is not None
+        elapsed = time.perf_counter() - started
+
+        return {
+            "mode": self.inference_mode,
+            "topics": len(topics),
+            "generated_tokens": generated_tokens,
+            "seconds": round(elapsed, 2),
+            "tokens_per_second": round(generated_tokens / elapsed, 2) if elapsed else 0.0,
+            # ru_maxrss is reported in kilobytes on Linux
+            "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+            "json_valid_rate": round(valid / len(topics), 3) if topics else 0.0
+        }
 
     def generate_roadmap(self, prompt):
         """Generate roadmap based on the input prompt"""
         try:
             # First check if the topic is tech-related
-            backup_generator = BackupModelGenerator()
-            if not backup_generator.is_tech_related(prompt):
+            with STAGE_SECONDS.time(stage='tech_gate'):
+                is_tech = tech_classifier.is_tech_related(prompt)
+            if not is_tech:
                 logger.info(f"Non-tech topic rejected: {prompt}")
+                GENERATIONS.inc(source='rejected')
                 return {
                     "success": False,
                     "error": "Currently, we only support technology-related learning roadmaps."
@@ -63,102 +531,176 @@ class RoadmapGenerator:
             if self.model is None or self.tokenizer is None:
                 raise ValueError("Model or tokenizer not initialized properly")
 
+            # Race the backup provider for topics the local model often gets wrong
+            if self.hedger is not None and self.hedger.should_hedge(prompt):
+                result = self.hedger.generate(prompt)
+                GENERATIONS.inc(source=result.get('source') or 'failed')
+                return result
+
+            result, local_error = self.generate_local(prompt)
+            if result is None:
+                result = self._fall_back(prompt, local_error)
+                winner = 'backup' if result.get('success') else None
+            else:
+                winner = 'local'
+            if self.hedger is not None:
+                # Unhedged requests still teach the adaptive mode which topics need it
+                self.hedger.stats.record(prompt, winner, local_failed=winner != 'local')
+            GENERATIONS.inc(source=result.get('source') or 'failed')
+            return result
+
+        except Exception as e:
+            logger.error(f"Error generating roadmap: {str(e)}")
+            logger.error(traceback.format_exc())
+            GENERATIONS.inc(source='error')
+            return {
+                "success": False,
+                "error": str(e)
+            }
+
+    def stream_roadmap(self, prompt):
+        """Generate a roadmap, yielding ("token", text) events and finally ("result", result)"""
+        cancel_event = threading.Event()
+        try:
+            if not tech_classifier.is_tech_related(prompt):
+                logger.info(f"Non-tech topic rejected: {prompt}")
+                yield "result", {
+                    "success": False,
+                    "error": "Currently, we only support technology-related learning roadmaps."
+                }
+                return
+
+            if self.model is None or self.tokenizer is None:
+                raise ValueError("Model or tokenizer not initialized properly")
+
             formatted_prompt = self._generate_prompt(prompt)
-            logger.info(f"Using prompt: {formatted_prompt}")
-            
-            inputs = self.tokenizer(
-                formatted_prompt,
-                return_tensors="pt",
-                padding=True,
-                truncation=True,
-                max_length=2048
+            logger.info(f"Streaming prompt: {formatted_prompt}")
+            inputs = self._tokenize([formatted_prompt])
+
+            streamer = TextIteratorStreamer(self.tokenizer, skip_prompt=True, skip_special_tokens=True)
+            json_criteria = RoadmapJsonStoppingCriteria(
+                self.tokenizer,
+                inputs['input_ids'].shape[1],
+                [GenerationRequest(formatted_prompt, cancel_event)]
             )
-            
-            attention_mask = inputs.get('attention_mask', None)
-            if attention_mask is None:
-                attention_mask = torch.ones_like(inputs['input_ids'])
-                inputs['attention_mask'] = attention_mask
+            errors = []
+            worker = threading.Thread(
+                target=self._generate_into_streamer,
+                args=(inputs, streamer, json_criteria, errors),
+                name="roadmap-stream",
+                daemon=True
+            )
+            worker.start()
+
+            # A separate tracker follows the streamed text so finished main topics can
+            # be pushed as soon as they close
+            node_tracker = RoadmapJsonTracker()
+            chunks = []
+            sent_nodes = 0
+            for text in streamer:
+                if not text:
+                    continue
+                chunks.append(text)
+                yield "token", text
+                node_tracker.feed(text)
+                while sent_nodes < len(node_tracker.completed_main_topics):
+                    yield "node", node_tracker.completed_main_topics[sent_nodes]
+                    sent_nodes += 1
+            worker.join()
 
-            logger.info("Generating response with local model...")
+            if errors:
+                raise errors[0]
+
+            roadmap = json_criteria.result_text(0, "".join(chunks).strip())
+            yield "result", self._parse_roadmap_output(prompt, roadmap)
+
+        except Exception as e:
+            logger.error(f"Error streaming roadmap: {str(e)}")
+            logger.error(traceback.format_exc())
+            yield "result", {
+                "success": False,
+                "error": str(e)
+            }
+        finally:
+            # Stop the generate call if the client disconnected mid-stream
+            cancel_event.set()
+
+    def _generate_into_streamer(self, inputs, streamer, json_criteria, errors):
+        """Run generate on a worker thread, feeding tokens into the streamer"""
+        try:
             with torch.no_grad():
-                outputs = self.model.generate(
+                self.model.generate(
                     input_ids=inputs['input_ids'],
                     attention_mask=inputs['attention_mask'],
-                    max_length=2048,
-                    temperature=0.7,
-                    num_return_sequences=1,
-                    do_sample=True,
-                    top_p=0.95,
-                    top_k=50,
-                    pad_token_id=self.tokenizer.eos_token_id
+                    past_key_values=inputs.get('past_key_values'),
+                    streamer=streamer,
+                    logits_processor=self._logits_processors(inputs['input_ids'].shape[1]),
+                    stopping_criteria=StoppingCriteriaList([json_criteria]),
+                    **self._generation_kwargs()
                 )
-            
-            generated_text = self.tokenizer.decode(outputs[0], skip_special_tokens=True)
-            
-            # Extract the roadmap part (after the prompt)
-            roadmap = generated_text[len(formatted_prompt):].strip()
-            
-            try:
-                # Try to parse as JSON if the output is in JSON format
+        except Exception as e:
+            errors.append(e)
+            # Unblock the consumer, which would otherwise wait for tokens forever
+            streamer.end()
+
+    def _parse_roadmap_output(self, prompt, roadmap):
+        """Validate the local model output, falling back to the backup model if needed"""
+        result, local_error = self._parse_local_output(roadmap)
+        if result is not None:
+            return result
+        return self._fall_back(prompt, local_error)
+
+    def _parse_local_output(self, roadmap):
+        """Parse local model output into a result; returns (result, None) or (None, error)"""
+        try:
+            # Try to parse as JSON if the output is in JSON format
+            with STAGE_SECONDS.time(stage='json_parse'):
                 roadmap_json = json.loads(roadmap)
-                
-                # Validate the structure of the generated roadmap
-                if isinstance(roadmap_json, dict) and 'name' in roadmap_json and 'children' in roadmap_json:
-                    return {
-                        "success": True,
-                        "roadmap": roadmap_json,
-                        "format": "json",
-                        "source": "local_model"
-                    }
-                else:
-                    # If local model output doesn't match expected structure, try backup model
-                    backup_generator = BackupModelGenerator()
-                    backup_roadmap = backup_generator.generate_roadmap(prompt)
-                    
-                    if backup_roadmap:
-                        if backup_roadmap["success"]:
-                            return {
-                                "success": True,
-                                "roadmap": backup_roadmap["roadmap"],
-                                "format": "json",
-                                "source": "backup_model"
-                            }
-                        else:
-                            logger.error(f"Local Model error: {backup_roadmap.get('error', 'Unknown error')}")
-                    
-                    return {
-                        "success": False,
-                        "error": "local model failed to generate valid roadmap"
-                    }
-                        
-            except json.JSONDecodeError:
-                # If parsing fails, try backup model
-                backup_generator = BackupModelGenerator()
-                backup_roadmap = backup_generator.generate_roadmap(prompt)
-                
-                if backup_roadmap:
-                    if backup_roadmap["success"]:
-                        return {
-                            "success": True,
-                            "roadmap": backup_roadmap["roadmap"],
-                            "format": "json",
-                            "source": "backup_model"
-                        }
-                    else:
-                        logger.error(f"Local Model error: {backup_roadmap.get('error', 'Unknown error')}")
-                
+        except json.JSONDecodeError:
+            return None, "Failed to generate roadmap with local model"
+
+        # Validate the structure of the generated roadmap
+        if isinstance(roadmap_json, dict) and 'name' in roadmap_json and 'children' in roadmap_json:
+            return {
+                "success": True,
+                "roadmap": limit_node_count(roadmap_json),
+                "format": "json",
+                "source": "local_model"
+            }, None
+
+        return None, "local model failed to generate valid roadmap"
+
+    def _record_fallback(self, local_error):
+        """Count a roadmap served by the backup model instead of the local one"""
+        FALLBACKS.inc(reason=FALLBACK_REASONS.get(local_error, 'other'))
+
+    def _fall_back(self, prompt, local_error):
+        """Backup model roadmap after the local model failed, counted as a fallback if it is used"""
+        result = self._backup_roadmap(prompt, local_error)
+        if result.get('source') == 'backup_model':
+            self._record_fallback(local_error)
+        return result
+
+    def _backup_roadmap(self, prompt, local_error):
+        """Ask the backup model for a roadmap after the local model failed"""
+        with STAGE_SECONDS.time(stage='backup'):
+            backup_roadmap = get_backup_generator().generate_roadmap(prompt)
+
+        if backup_roadmap:
+            if backup_roadmap["success"]:
                 return {
-                    "success": False,
-                    "error": "Failed to generate roadmap with local model"
+                    "success": True,
+                    "roadmap": backup_roadmap["roadmap"],
+                    "format": "json",
+                    "source": "backup_model"
                 }
-                    
-        except Exception as e:
-            logger.error(f"Error generating roadmap: {str(e)}")
-            logger.error(traceback.format_exc())
-            return {
-                "success": False,
-                "error": str(e)
-            }
+            else:
+                logger.error(f"Local Model error: {backup_roadmap.get('error', 'Unknown error')}")
+
+        return {
+            "success": False,
+            "error": local_error
+        }
 
     def _convert_json_to_markdown(self, node, level=0):
         """Convert the JSON tree structure to markdown format"""
@@ -174,6 +716,3 @@ class RoadmapGenerator:
                 markdown += self._convert_json_to_markdown(child, level + 1)
         
         return markdown
-
-# Initialize the model
-roadmap_generator = RoadmapGenerator()
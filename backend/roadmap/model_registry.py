@@ -0,0 +1,171 @@
+import gc
+import logging
+import os
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class ModelRegistry:
+    """Process-wide registry that builds heavy model objects once, on first use"""
+
+    def __init__(self):
+        self._factories = {}
+        self._instances = {}
+        self._lock = threading.RLock()
+
+    def register(self, name, factory):
+        """Register a zero-argument factory for a shared object"""
+        with self._lock:
+            self._factories[name] = factory
+
+    def get(self, name):
+        """Return the shared instance for name, building it on first access"""
+        instance = self._instances.get(name)
+        if instance is not None:
+            return instance
+
+        with self._lock:
+            # Another thread may have finished loading while we waited
+            instance = self._instances.get(name)
+            if instance is None:
+                if name not in self._factories:
+                    raise KeyError(f"No factory registered for '{name}'")
+                logger.info(f"Loading shared instance '{name}' (pid {os.getpid()})")
+                instance = self._factories[name]()
+                self._instances[name] = instance
+            return instance
+
+    def set(self, name, instance):
+        """Install a ready-made instance, e.g. a stub in tests or benchmarks"""
+        with self._lock:
+            self._instances[name] = instance
+
+    def is_loaded(self, name):
+        """Check whether name has already been built in this process"""
+        return name in self._instances
+
+    def clear(self, name=None):
+        """Drop one or all cached instances so the next get() rebuilds them"""
+        with self._lock:
+            if name is None:
+                self._instances.clear()
+            else:
+                self._instances.pop(name, None)
+
+    def preload(self, names=None):
+        """Eagerly build instances before worker processes are forked"""
+        for name in names or list(self._factories):
+            self.get(name)
+
+        # Move everything allocated so far into the permanent generation so the
+        # cyclic GC in forked workers never writes to (and un-shares) these pages
+        gc.collect()
+        gc.freeze()
+        logger.info(f"Preloaded shared instances: {', '.join(sorted(self._instances))}")
+
+
+registry = ModelRegistry()
+
+
+def _build_roadmap_generator():
+    from .ml_model import RoadmapGenerator
+    return RoadmapGenerator()
+
+
+def _build_roadmap_service():
+    from .roadmap_service import RoadmapService
+    return RoadmapService()
+
+
+def _build_topic_content_generator():
+    from .topic_content import TopicContentGenerator
+    return TopicContentGenerator(get_roadmap_generator())
+
+
+def _build_description_cache():
+    from .description_cache import DescriptionCache
+    return DescriptionCache()
+
+
+def _build_topic_catalog():
+    from .topic_catalog import TopicCatalog
+    return TopicCatalog()
+
+
+def _build_inference_executor():
+    from .inference_executor import InferenceExecutor
+    return InferenceExecutor()
+
+
+def _build_backup_client():
+    from .backup_client import BackupProviderClient
+    return BackupProviderClient()
+
+
+def _build_backup_generator():
+    from .backup_generator import BackupModelGenerator
+    return BackupModelGenerator(client=get_backup_client())
+
+
+registry.register('roadmap_generator', _build_roadmap_generator)
+registry.register('roadmap_service', _build_roadmap_service)
+registry.register('topic_content_generator', _build_topic_content_generator)
+registry.register('description_cache', _build_description_cache)
+registry.register('topic_catalog', _build_topic_catalog)
+registry.register('inference_executor', _build_inference_executor)
+registry.register('backup_client', _build_backup_client)
+registry.register('backup_generator', _build_backup_generator)
+
+
+def get_roadmap_generator():
+    """Return the process-wide RoadmapGenerator, loading the model on first call"""
+    return registry.get('roadmap_generator')
+
+
+def get_roadmap_service():
+    """Return the process-wide RoadmapService with its result caches"""
+    return registry.get('roadmap_service')
+
+
+def get_topic_content_generator():
+    """Return the process-wide TopicContentGenerator sharing the roadmap model"""
+    return registry.get('topic_content_generator')
+
+
+def get_description_cache():
+    """Return the process-wide cache of topic descriptions"""
+    return registry.get('description_cache')
+
+
+def get_topic_catalog():
+    """Return the process-wide catalog of topic descriptions and courses"""
+    return registry.get('topic_catalog')
+
+
+def get_inference_executor():
+    """Return the process-wide bounded executor that model generations run on"""
+    return registry.get('inference_executor')
+
+
+def get_backup_client():
+    """Return the process-wide client for the backup provider"""
+    return registry.get('backup_client')
+
+
+def get_backup_generator():
+    """Return the process-wide BackupModelGenerator"""
+    return registry.get('backup_generator')
+
+
+def preload_models():
+    """Load shared models at import time when ROADMAP_PRELOAD_MODELS is set.
+
+    Call this from the WSGI/ASGI module so that a preforking server started with
+    preloading (e.g. ``gunicorn --preload``) loads the weights once in the master
+    process and every forked worker shares the same read-only pages.
+    """
+    if os.getenv('ROADMAP_PRELOAD_MODELS', '').lower() not in ('1', 'true', 'yes'):
+        return
+    # The backup client owns a thread pool, which must be created after fork
+    registry.preload(['roadmap_generator', 'roadmap_service'])
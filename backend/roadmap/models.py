@@ -0,0 +1,20 @@
+from django.db import models
+
+
+class CachedRoadmap(models.Model):
+    """A generated roadmap stored under its normalized prompt, shared by all workers"""
+
+    key = models.CharField(max_length=64, unique=True)
+    normalized_prompt = models.TextField()
+    result = models.JSONField()
+    hit_count = models.PositiveIntegerField(default=0)
+    # Index of the access window (ROADMAP_CACHE_HIT_WINDOW seconds long) last hit
+    access_window = models.PositiveIntegerField(default=0)
+    # Hits in that window and in the one before it, for ranking by recent popularity
+    window_hits = models.PositiveIntegerField(default=0)
+    previous_window_hits = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    last_accessed = models.DateTimeField(auto_now=True, db_index=True)
+
+    def __str__(self):
+        return self.normalized_prompt
@@ -0,0 +1,198 @@
+import logging
+import os
+import random
+import threading
+import time
+import traceback
+from datetime import timedelta
+
+from django.core.signals import request_started
+from django.utils import timezone
+
+from .model_registry import (
+    get_description_cache,
+    get_roadmap_generator,
+    get_roadmap_service,
+    get_topic_catalog,
+    registry
+)
+from .topic_resources import clean_topic_name, roadmap_node_names
+
+logger = logging.getLogger(__name__)
+
+
+class Prewarmer:
+    """Fill the roadmap and resource caches for popular topics in the background.
+
+    Topics come from the cached prompts hit most over the last day or two, the
+    topic catalog descriptions and the curated roadmaps. Work
+    is paced to use at most ``cpu_budget`` of wall time (sleeping in between
+    items) and pauses while live requests are queued for or running on the
+    model. Popular cached roadmaps close to their TTL are regenerated so they
+    never expire. Cache reads here are not counted as hits, so warming an
+    entry does not keep it popular.
+    """
+
+    def __init__(self, cpu_budget=None, interval=None, prompt_limit=None, resource_limit=None, refresh_ratio=0.8):
+        self.cpu_budget = cpu_budget or float(os.getenv('ROADMAP_PREWARM_CPU_BUDGET', '0.25'))
+        self.interval = interval or float(os.getenv('ROADMAP_PREWARM_INTERVAL', str(6 * 3600)))
+        self.prompt_limit = prompt_limit or int(os.getenv('ROADMAP_PREWARM_PROMPTS', '50'))
+        self.resource_limit = resource_limit or int(os.getenv('ROADMAP_PREWARM_RESOURCES', '300'))
+        self.refresh_ratio = refresh_ratio
+        self._stop = threading.Event()
+        self._thread = None
+        self._pid = None
+        self._start_lock = threading.Lock()
+
+    def popular_prompts(self):
+        """Recently most hit cached prompts, with whether their entry is close to expiring"""
+        cache = get_roadmap_service().cache
+        refresh_before = timezone.now() - timedelta(seconds=cache.ttl * self.refresh_ratio)
+        return [
+            (prompt, created_at < refresh_before, result)
+            for prompt, created_at, result in cache.popular(self.prompt_limit)
+        ]
+
+    def resource_topics(self, roadmaps):
+        """Distinct node topics to prefetch descriptions for, most popular sources first"""
+        names = get_topic_catalog().description_topics()
+        for roadmap in roadmaps:
+            names.extend(roadmap_node_names(roadmap, max_depth=2))
+        for roadmap in get_roadmap_service().curated_index.roadmaps():
+            names.extend(roadmap_node_names(roadmap, max_depth=1))
+
+        topics = {}
+        for name in names:
+            topic = clean_topic_name(name)
+            if topic:
+                topics.setdefault(topic.lower(), topic)
+        return list(topics.values())[:self.resource_limit]
+
+    def warmup_generate(self):
+        """One short generate so allocator pools and kernels are warm before the first user"""
+        from .ml_model import PROMPT_PREFIX
+
+        started = time.perf_counter()
+        get_roadmap_generator().generate_free_texts([f"{PROMPT_PREFIX}Python"], max_new_tokens=8)
+        logger.info(f"Warmup generate finished in {time.perf_counter() - started:.2f}s")
+
+    def _live_traffic(self):
+        """Whether requests are waiting for or running on the model"""
+        if registry.is_loaded('inference_executor'):
+            stats = registry.get('inference_executor').stats()
+            if stats['running'] or stats['queued']:
+                return True
+        if not registry.is_loaded('roadmap_generator'):
+            return False
+        scheduler = get_roadmap_generator().scheduler
+        return scheduler is not None and (scheduler.pending() > 0 or scheduler.running() > 0)
+
+    def _paced(self, fn, *args):
+        """Run one unit of work after live traffic drains, then sleep to stay within the CPU budget"""
+        while self._live_traffic() and not self._stop.is_set():
+            self._stop.wait(0.5)
+        if self._stop.is_set():
+            return False
+        started = time.perf_counter()
+        try:
+            fn(*args)
+        except Exception as e:
+            logger.warning(f"Prewarm step failed: {str(e)}")
+        elapsed = time.perf_counter() - started
+        self._stop.wait(elapsed * (1.0 / self.cpu_budget - 1.0))
+        return not self._stop.is_set()
+
+    def _warm_roadmap(self, prompt, refresh):
+        service = get_roadmap_service()
+        # Loads the entry into this worker's LRU without counting a hit
+        if not refresh and service.cache.get(prompt, record_access=False) is not None:
+            return
+        service.generate(prompt, use_cache=False)
+
+    def run_once(self):
+        """Warm the model, popular roadmaps and topic descriptions once"""
+        started = time.perf_counter()
+        self._paced(self.warmup_generate)
+
+        roadmaps = []
+        warmed_prompts = 0
+        for prompt, refresh, result in self.popular_prompts():
+            if not self._paced(self._warm_roadmap, prompt, refresh):
+                break
+            warmed_prompts += 1
+            if result and result.get('roadmap'):
+                roadmaps.append(result['roadmap'])
+
+        description_cache = get_description_cache()
+        warmed_topics = 0
+        for topic in self.resource_topics(roadmaps):
+            if not self._paced(description_cache.get, topic):
+                break
+            warmed_topics += 1
+
+        elapsed = time.perf_counter() - started
+        logger.info(f"Prewarmed {warmed_prompts} roadmaps and {warmed_topics} topic descriptions in {elapsed:.1f}s")
+        return {"prompts": warmed_prompts, "topics": warmed_topics, "seconds": round(elapsed, 1)}
+
+    def _run(self, initial_delay):
+        # Stagger workers so they do not all warm the same entries at once
+        if self._stop.wait(initial_delay):
+            return
+        try:
+            # Yield the CPU to request threads; on Linux this lowers only this thread
+            os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), 10)
+        except (AttributeError, OSError):
+            pass
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception as e:
+                logger.error(f"Prewarm run failed: {str(e)}")
+                logger.error(traceback.format_exc())
+            self._stop.wait(self.interval)
+
+    def start(self, initial_delay=None):
+        """Start the background prewarm loop in this process"""
+        if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+            return
+        if self._pid != os.getpid():
+            # A lock inherited across fork may be held by a thread that no longer exists
+            self._start_lock = threading.Lock()
+        with self._start_lock:
+            if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+                return
+            if initial_delay is None:
+                initial_delay = float(os.getenv('ROADMAP_PREWARM_DELAY', '5')) + random.uniform(0, 10)
+            # A fresh event, since one inherited across fork may be in any state
+            self._stop = threading.Event()
+            self._pid = os.getpid()
+            self._thread = threading.Thread(
+                target=self._run, args=(initial_delay,), name='roadmap-prewarm', daemon=True
+            )
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+
+prewarmer = Prewarmer()
+
+
+def _start_on_request(sender, **kwargs):
+    prewarmer.start()
+
+
+def start_prewarm():
+    """Arrange background prewarming when ROADMAP_PREWARM is set.
+
+    The loop never runs in the process that calls this: a preforking server
+    may be loading the app in its master, whose threads would not be
+    inherited by the workers. Each forked child starts its own loop straight
+    away; a server that does not fork starts it on the first request.
+    """
+    if os.getenv('ROADMAP_PREWARM', '').lower() not in ('1', 'true', 'yes'):
+        return
+    if hasattr(os, 'register_at_fork'):
+        os.register_at_fork(after_in_child=prewarmer.start)
+    # Only processes that serve requests reach this; start() is a no-op once running
+    request_started.connect(_start_on_request, weak=False, dispatch_uid='roadmap-prewarm')
@@ -0,0 +1,132 @@
+import asyncio
+import logging
+import os
+import time
+
+import httpx
+
+from .topic_resources import (
+    WIKIPEDIA_API_URL,
+    get_backup_topic_info,
+    get_courses,
+    is_useful_description,
+    shorten_description,
+    wiki_extract_params,
+    wiki_page_id,
+    wiki_search_params
+)
+
+logger = logging.getLogger(__name__)
+
+
+class WikipediaSource:
+    """Short topic description from the Wikipedia API"""
+
+    def __init__(self, timeout=None):
+        self.timeout = timeout or float(os.getenv('ROADMAP_WIKI_TIMEOUT', '3'))
+
+    async def fetch(self, client, topic):
+        # First, search for the most relevant page
+        search_response = await client.get(WIKIPEDIA_API_URL, params=wiki_search_params(topic))
+        page_id = wiki_page_id(search_response.json())
+        if page_id is None:
+            return self.fallback(topic)
+
+        # Then, get the extract for that page
+        extract_response = await client.get(WIKIPEDIA_API_URL, params=wiki_extract_params(page_id))
+        description = shorten_description(extract_response.json(), page_id)
+        return description if is_useful_description(description) else self.fallback(topic)
+
+    def fallback(self, topic):
+        return get_backup_topic_info(topic)
+
+
+class CourseCatalogSource:
+    """Courses from the bundled course catalog"""
+
+    def __init__(self, timeout=None):
+        self.timeout = timeout or float(os.getenv('ROADMAP_COURSES_TIMEOUT', '1'))
+
+    async def fetch(self, client, topic):
+        return get_courses(topic)
+
+    def fallback(self, topic):
+        return []
+
+
+class StaticSource:
+    """Local stand-in for a remote source, for tests and benchmarks"""
+
+    def __init__(self, value, latency=0.0, timeout=1.0):
+        self.value = value
+        self.latency = latency
+        self.timeout = timeout
+
+    async def fetch(self, client, topic):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return self.value(topic) if callable(self.value) else self.value
+
+    def fallback(self, topic):
+        return None
+
+
+def default_sources():
+    """The sources behind /api/resources/, keyed by their field in the response"""
+    return {
+        'topicInfo': WikipediaSource(),
+        'courses': CourseCatalogSource(),
+    }
+
+
+class ResourceFetcher:
+    """Fetch every resource for a topic concurrently over one pooled HTTP client.
+
+    Each source has its own timeout; a source that fails or runs out of time
+    contributes its fallback instead of failing the whole response, so a slow
+    upstream only ever costs its own deadline.
+    """
+
+    def __init__(self, sources=None, client=None, max_connections=None):
+        self.sources = sources if sources is not None else default_sources()
+        self.max_connections = max_connections or int(os.getenv('ROADMAP_RESOURCE_MAX_CONNECTIONS', '20'))
+        self._client = client
+
+    @property
+    def client(self):
+        # Created lazily so it binds to the running event loop
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections
+                ),
+                headers={'User-Agent': 'BrightPath-Roadmap/1.0'}
+            )
+        return self._client
+
+    async def _fetch_source(self, name, source, topic):
+        started = time.perf_counter()
+        try:
+            return await asyncio.wait_for(source.fetch(self.client, topic), timeout=source.timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Resource source '{name}' timed out after {source.timeout:.1f}s for '{topic}'")
+        except Exception as e:
+            logger.error(f"Resource source '{name}' failed for '{topic}': {str(e)}")
+        finally:
+            logger.debug(f"Resource source '{name}' took {time.perf_counter() - started:.3f}s")
+        return source.fallback(topic)
+
+    async def fetch_all_resources(self, topic):
+        """Return {source name: resource} for topic, querying all sources at once"""
+        names = list(self.sources)
+        results = await asyncio.gather(*(
+            self._fetch_source(name, self.sources[name], topic) for name in names
+        ))
+        return dict(zip(names, results))
+
+    async def aclose(self):
+        """Close the pooled HTTP client"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
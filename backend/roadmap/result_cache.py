@@ -0,0 +1,258 @@
+import copy
+import hashlib
+import logging
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from datetime import timedelta
+
+from django.db import DatabaseError
+from django.db.models import Case, F, IntegerField, Value, When
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_prompt(prompt):
+    """Canonical form of a prompt: lowercase, punctuation dropped, single spaces"""
+    # Keep + and # so "c++" and "c#" stay distinct from "c"
+    normalized = re.sub(r'[^\w\s+#]', ' ', prompt.lower())
+    return ' '.join(normalized.split())
+
+
+def prompt_key(normalized_prompt):
+    """Fixed-length database key for a normalized prompt"""
+    return hashlib.sha256(normalized_prompt.encode('utf-8')).hexdigest()
+
+
+class RoadmapResultCache:
+    """Two-level cache of successful roadmap results keyed by normalized prompt.
+
+    Hot entries live in an in-process LRU; every entry is also written to the
+    ``CachedRoadmap`` table so all workers share results. Entries expire after
+    ``ttl`` seconds and the table is capped at ``max_entries`` rows, evicting
+    the least recently used. Hit counts and access times are collected in
+    memory and written to the table at most every ``access_flush_interval``
+    seconds, so reads do not queue behind each other for the write lock.
+    Hits are also counted per ``hit_window`` seconds so ``popular()`` can rank
+    entries by recent rather than all-time use.
+    """
+
+    def __init__(self, ttl=None, max_entries=None, lru_size=None, access_flush_interval=None, hit_window=None):
+        self.ttl = ttl if ttl is not None else int(os.getenv('ROADMAP_CACHE_TTL', str(7 * 24 * 3600)))
+        self.max_entries = max_entries if max_entries is not None else int(os.getenv('ROADMAP_CACHE_MAX_ENTRIES', '10000'))
+        self.lru_size = lru_size if lru_size is not None else int(os.getenv('ROADMAP_CACHE_LRU_SIZE', '256'))
+        self.access_flush_interval = access_flush_interval if access_flush_interval is not None else float(
+            os.getenv('ROADMAP_CACHE_ACCESS_FLUSH_INTERVAL', '30'))
+        self.hit_window = hit_window or int(os.getenv('ROADMAP_CACHE_HIT_WINDOW', str(24 * 3600)))
+        self._lru = OrderedDict()
+        self._lock = threading.Lock()
+        # Hits per key not yet written to the shared table
+        self._pending_hits = {}
+        self._last_flush = time.monotonic()
+        self.hits = 0
+        self.lru_hits = 0
+        self.misses = 0
+
+    def get(self, prompt, record_access=True):
+        """Return a cached result for prompt, or None.
+
+        record_access=False reads without counting a hit or a miss, for
+        background work that should not make an entry look popular.
+        """
+        normalized = normalize_prompt(prompt)
+        if not normalized:
+            return None
+        key = prompt_key(normalized)
+
+        result = self._get_local(key)
+        if result is not None:
+            if record_access:
+                with self._lock:
+                    self.hits += 1
+                    self.lru_hits += 1
+                self._record_access(key)
+            return result
+
+        entry = self._get_shared(key)
+        if record_access:
+            with self._lock:
+                if entry is None:
+                    self.misses += 1
+                else:
+                    self.hits += 1
+        if entry is None:
+            return None
+        if record_access:
+            self._record_access(key)
+        result, created_at = entry
+        # Keep the shared entry's age so promoting it does not extend its TTL
+        self._set_local(key, result, stored_at=created_at.timestamp())
+        return copy.deepcopy(result)
+
+    def set(self, prompt, result):
+        """Store a successful result for prompt"""
+        if not result or not result.get('success'):
+            return
+        normalized = normalize_prompt(prompt)
+        if not normalized:
+            return
+        key = prompt_key(normalized)
+        result = copy.deepcopy(result)
+        self._set_local(key, result)
+        self._set_shared(key, normalized, result)
+
+    def flush_access(self):
+        """Write the hit counts and access times collected since the last flush to the shared table"""
+        from django.db import transaction
+        from .models import CachedRoadmap
+
+        with self._lock:
+            pending, self._pending_hits = self._pending_hits, {}
+            self._last_flush = time.monotonic()
+        if not pending:
+            return
+
+        # One UPDATE per distinct count, all in one transaction, so a flush takes the write lock once
+        keys_by_count = {}
+        for key, count in pending.items():
+            keys_by_count.setdefault(count, []).append(key)
+        now = timezone.now()
+        window = self._window(now)
+        try:
+            with transaction.atomic():
+                for count, keys in keys_by_count.items():
+                    # Every right-hand side sees the row as it was before the update
+                    CachedRoadmap.objects.filter(key__in=keys).update(
+                        hit_count=F('hit_count') + count,
+                        last_accessed=now,
+                        previous_window_hits=Case(
+                            When(access_window=window, then=F('previous_window_hits')),
+                            When(access_window=window - 1, then=F('window_hits')),
+                            default=Value(0)
+                        ),
+                        window_hits=Case(
+                            When(access_window=window, then=F('window_hits') + count),
+                            default=Value(count)
+                        ),
+                        access_window=window
+                    )
+        except DatabaseError as e:
+            logger.warning(f"Roadmap cache access update failed: {str(e)}")
+
+    def popular(self, limit):
+        """Unexpired entries with the most hits over the last one to two hit windows, most popular first.
+
+        Returns (normalized_prompt, created_at, result) tuples.
+        """
+        from .models import CachedRoadmap
+
+        now = timezone.now()
+        window = self._window(now)
+        recent_hits = Case(
+            When(access_window=window, then=F('window_hits') + F('previous_window_hits')),
+            When(access_window=window - 1, then=F('window_hits')),
+            default=Value(0),
+            output_field=IntegerField()
+        )
+        try:
+            rows = CachedRoadmap.objects.filter(
+                created_at__gte=now - timedelta(seconds=self.ttl),
+                access_window__gte=window - 1
+            ).annotate(recent_hits=recent_hits).filter(recent_hits__gt=0)
+            return list(rows.order_by('-recent_hits', '-last_accessed').values_list(
+                'normalized_prompt', 'created_at', 'result'
+            )[:limit])
+        except DatabaseError as e:
+            logger.warning(f"Could not read popular roadmaps: {str(e)}")
+            return []
+
+    def stats(self):
+        """Hit/miss counters for this process"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "lru_hits": self.lru_hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "lru_entries": len(self._lru)
+            }
+
+    def _get_local(self, key):
+        with self._lock:
+            entry = self._lru.get(key)
+            if entry is None:
+                return None
+            result, stored_at = entry
+            if time.time() - stored_at > self.ttl:
+                del self._lru[key]
+                return None
+            self._lru.move_to_end(key)
+            return copy.deepcopy(result)
+
+    def _set_local(self, key, result, stored_at=None):
+        with self._lock:
+            self._lru[key] = (result, stored_at or time.time())
+            self._lru.move_to_end(key)
+            while len(self._lru) > self.lru_size:
+                self._lru.popitem(last=False)
+
+    def _window(self, now):
+        return int(now.timestamp() // self.hit_window)
+
+    def _record_access(self, key):
+        with self._lock:
+            self._pending_hits[key] = self._pending_hits.get(key, 0) + 1
+            due = time.monotonic() - self._last_flush >= self.access_flush_interval
+            if due:
+                # Claim this flush so concurrent readers do not start another one
+                self._last_flush = time.monotonic()
+        if due:
+            self.flush_access()
+
+    def _get_shared(self, key):
+        from .models import CachedRoadmap
+
+        try:
+            cutoff = timezone.now() - timedelta(seconds=self.ttl)
+            return CachedRoadmap.objects.filter(key=key, created_at__gte=cutoff).values_list(
+                'result', 'created_at'
+            ).first()
+        except DatabaseError as e:
+            logger.warning(f"Roadmap cache read failed: {str(e)}")
+            return None
+
+    def _set_shared(self, key, normalized, result):
+        from .models import CachedRoadmap
+
+        try:
+            CachedRoadmap.objects.update_or_create(
+                key=key,
+                defaults={
+                    'normalized_prompt': normalized,
+                    'result': result,
+                    'created_at': timezone.now()
+                }
+            )
+            self._evict_shared()
+        except DatabaseError as e:
+            logger.warning(f"Roadmap cache write failed: {str(e)}")
+
+    def _evict_shared(self):
+        """Drop expired rows and the least recently used rows beyond max_entries"""
+        from .models import CachedRoadmap
+
+        cutoff = timezone.now() - timedelta(seconds=self.ttl)
+        CachedRoadmap.objects.filter(created_at__lt=cutoff).delete()
+
+        overflow = CachedRoadmap.objects.count() - self.max_entries
+        if overflow > 0:
+            # Recent hits decide what is least recently used, so write them out first
+            self.flush_access()
+            stale_ids = list(
+                CachedRoadmap.objects.order_by('last_accessed').values_list('id', flat=True)[:overflow]
+            )
+            CachedRoadmap.objects.filter(id__in=stale_ids).delete()
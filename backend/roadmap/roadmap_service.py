@@ -0,0 +1,86 @@
+import logging
+import os
+
+from .curated_index import CuratedRoadmapIndex
+from .metrics import GENERATIONS, STAGE_SECONDS
+from .model_registry import get_roadmap_generator
+from .result_cache import RoadmapResultCache
+from .semantic_cache import SemanticRoadmapCache
+from .tech_classifier import tech_classifier
+
+logger = logging.getLogger(__name__)
+
+
+class RoadmapService:
+    """Answer roadmap prompts from curated data or the result caches, generating only on a miss"""
+
+    def __init__(self, cache=None, semantic_cache=None, curated_index=None):
+        self.curated_index = curated_index if curated_index is not None else CuratedRoadmapIndex()
+        self.cache = cache if cache is not None else RoadmapResultCache()
+        if semantic_cache is None and os.getenv('ROADMAP_SEMANTIC_CACHE', '1').lower() in ('1', 'true', 'yes'):
+            semantic_cache = SemanticRoadmapCache()
+        self.semantic_cache = semantic_cache
+
+    def rejection(self, prompt):
+        """The error result for a prompt that is not about technology, or None if it is"""
+        with STAGE_SECONDS.time(stage='tech_gate'):
+            is_tech = tech_classifier.is_tech_related(prompt)
+        if is_tech:
+            return None
+        logger.info(f"Non-tech topic rejected: {prompt}")
+        GENERATIONS.inc(source='rejected')
+        return {
+            "success": False,
+            "error": "Currently, we only support technology-related learning roadmaps."
+        }
+
+    def lookup(self, prompt):
+        """Return a result for prompt without touching the model, or None.
+
+        Non-tech prompts get their rejection before any curated or cached
+        result, so a cache entry can never answer a prompt the model would refuse.
+        """
+        rejected = self.rejection(prompt)
+        if rejected is not None:
+            return rejected
+
+        curated = self.curated_index.lookup(prompt)
+        if curated is not None:
+            logger.info(f"Serving curated roadmap: {prompt}")
+            return curated
+
+        cached = self.cache.get(prompt)
+        if cached is not None:
+            logger.info(f"Roadmap cache hit: {prompt}")
+        elif self.semantic_cache is not None:
+            # Differently phrased requests for a topic we have already answered
+            cached = self.semantic_cache.get(prompt)
+        if cached is not None:
+            cached["cached"] = True
+        return cached
+
+    def store(self, prompt, result):
+        """Remember a freshly generated result in every cache layer"""
+        self.cache.set(prompt, result)
+        if self.semantic_cache is not None:
+            self.semantic_cache.add(prompt, result)
+
+    def generate(self, prompt, use_cache=True, looked_up=False):
+        """Return a roadmap for prompt; use_cache=False forces a fresh generation.
+
+        Pass looked_up=True when lookup() has just missed for this prompt, so
+        the caches are not searched (and the miss counted) a second time.
+        """
+        if not looked_up:
+            if use_cache:
+                cached = self.lookup(prompt)
+            else:
+                # Curated roadmaps are not a cache, so they are served even on a forced refresh
+                cached = self.rejection(prompt) or self.curated_index.lookup(prompt)
+            if cached is not None:
+                return cached
+
+        result = get_roadmap_generator().generate_roadmap(prompt)
+        # A forced refresh still replaces the stored entry
+        self.store(prompt, result)
+        return result
@@ -0,0 +1,330 @@
+import copy
+import json
+import logging
+import math
+import os
+import threading
+import zlib
+from collections import deque
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+from .result_cache import normalize_prompt
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INDEX_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'semantic_cache.npz')
+
+# Words that change how a request is phrased but not which roadmap it asks for
+FILLER_WORDS = {
+    'a', 'an', 'the', 'i', 'im', 'me', 'my', 'want', 'wanna', 'would', 'like', 'to', 'be', 'become',
+    'becoming', 'study', 'roadmap', 'road', 'map', 'path', 'plan', 'guide',
+    'career', 'complete', 'from', 'scratch', 'beginner', 'beginners', 'begineer', 'expert', 'advanced',
+    'zero', 'hero', 'how', 'do', 'can', 'for', 'in', 'of', 'on', 'and', 'with', 'as', 'please',
+    'give', 'create', 'make', 'show', 'get', 'start', 'started', 'getting', 'into',
+}
+
+# Filler only at the start of a topic: "learning python", but "machine learning" and "scikit learn"
+LEADING_FILLER_WORDS = {'learn', 'learning'}
+
+# Common abbreviations expanded so "ml engineer" and "machine learning engineer" share n-grams
+ABBREVIATIONS = {
+    'ml': 'machine learning',
+    'ai': 'artificial intelligence',
+    'dl': 'deep learning',
+    'ds': 'data science',
+    'js': 'javascript',
+    'ts': 'typescript',
+    'nlp': 'natural language processing',
+    'cv': 'computer vision',
+    'fullstack': 'full stack',
+    'frontend': 'front end',
+    'backend': 'back end',
+    'devops': 'dev ops',
+}
+
+
+def topic_text(prompt):
+    """Reduce a prompt to the words that identify its topic"""
+    words = []
+    for word in normalize_prompt(prompt).split():
+        words.extend(ABBREVIATIONS.get(word, word).split())
+    topic_words = [word for word in words if word not in FILLER_WORDS]
+    while topic_words and topic_words[0] in LEADING_FILLER_WORDS:
+        topic_words.pop(0)
+    # A prompt made only of filler words still needs a non-empty vector
+    return ' '.join(topic_words or words)
+
+
+class SemanticRoadmapCache:
+    """Near-duplicate lookup of past prompts using character n-gram TF-IDF vectors.
+
+    Prompts are hashed into a fixed number of features so the index can grow one
+    row at a time. New rows are weighted with the current IDF; the IDF and all
+    rows are recomputed from document frequencies once about a tenth of the
+    index has changed. Rows live in NumPy matrices that grow geometrically and
+    are filled in place; once ``max_entries`` is reached the oldest row is
+    overwritten. The index is persisted with ``np.savez`` by a background
+    thread ``save_delay`` seconds after a change, outside the lock lookups use.
+    Saving merges in entries other workers wrote to the file since, so workers
+    sharing a file do not overwrite each other's prompts.
+    """
+
+    def __init__(self, path=None, threshold=None, max_entries=None, n_features=4096, ngram_range=(3, 4),
+                 save_delay=None):
+        self.path = path or os.getenv('ROADMAP_SEMANTIC_CACHE_PATH', DEFAULT_INDEX_PATH)
+        self.threshold = threshold if threshold is not None else float(os.getenv('ROADMAP_SEMANTIC_THRESHOLD', '0.85'))
+        self.max_entries = max_entries if max_entries is not None else int(os.getenv('ROADMAP_SEMANTIC_MAX_ENTRIES', '2000'))
+        self.save_delay = save_delay if save_delay is not None else float(os.getenv('ROADMAP_SEMANTIC_SAVE_DELAY', '2'))
+        self.n_features = n_features
+        self.ngram_range = ngram_range
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        # Row i holds _prompts[i] and _results[i]; _order lists the rows oldest first
+        self._term_frequencies = np.zeros((0, n_features), dtype=np.float32)
+        self._document_frequencies = np.zeros(n_features, dtype=np.float32)
+        self._prompts = []
+        self._results = []
+        self._order = deque()
+        self._weighted = np.zeros((0, n_features), dtype=np.float32)
+        self._idf = None
+        # Rows added or overwritten since the IDF was last recomputed
+        self._stale_rows = 0
+        self._dirty = False
+        self._save_timer = None
+        self._save_pid = None
+        self._save_lock = threading.Lock()
+        self.load()
+
+    def _vectorize(self, prompt):
+        """Sublinear term frequencies of the hashed character n-grams of a prompt"""
+        text = f" {topic_text(prompt)} "
+        counts = {}
+        for n in range(self.ngram_range[0], self.ngram_range[1] + 1):
+            for start in range(len(text) - n + 1):
+                feature = zlib.crc32(text[start:start + n].encode('utf-8')) % self.n_features
+                counts[feature] = counts.get(feature, 0) + 1
+
+        vector = np.zeros(self.n_features, dtype=np.float32)
+        for feature, count in counts.items():
+            vector[feature] = 1.0 + math.log(count)
+        return vector
+
+    def _weigh(self, term_frequencies):
+        """L2-normalised TF-IDF rows under the current IDF"""
+        weighted = term_frequencies * self._idf
+        norms = np.linalg.norm(weighted, axis=-1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return weighted / norms
+
+    def _ensure_weighted(self):
+        """Recompute the IDF and every weighted row once enough of the index has changed"""
+        documents = len(self._prompts)
+        if self._idf is not None and self._stale_rows <= max(16, documents // 10):
+            return
+        self._idf = np.log((1.0 + documents) / (1.0 + self._document_frequencies)) + 1.0
+        self._weighted[:documents] = self._weigh(self._term_frequencies[:documents])
+        self._stale_rows = 0
+
+    def _best_match(self, vector):
+        """Row and cosine similarity of the closest stored prompt"""
+        if not self._prompts:
+            return None, 0.0
+        self._ensure_weighted()
+        query = vector * self._idf
+        norm = np.linalg.norm(query)
+        if norm == 0:
+            return None, 0.0
+        scores = self._weighted[:len(self._prompts)] @ (query / norm)
+        best = int(np.argmax(scores))
+        return best, float(scores[best])
+
+    def get(self, prompt):
+        """Return the stored result of the most similar past prompt above the threshold"""
+        vector = self._vectorize(prompt)
+        with self._lock:
+            best, score = self._best_match(vector)
+            if best is None or score < self.threshold:
+                self.misses += 1
+                return None
+            self.hits += 1
+            result = copy.deepcopy(self._results[best])
+            matched = self._prompts[best]
+
+        logger.info(f"Semantic cache hit ({score:.2f}): '{prompt}' ~ '{matched}'")
+        result["similarity"] = round(score, 4)
+        return result
+
+    def add(self, prompt, result):
+        """Index a successful result, replacing the entry of an equivalent prompt"""
+        if not result or not result.get('success'):
+            return
+        result = copy.deepcopy(result)
+        result.pop('cached', None)
+        result.pop('similarity', None)
+        vector = self._vectorize(prompt)
+
+        with self._lock:
+            best, score = self._best_match(vector)
+            if best is not None and score >= 0.999:
+                self._results[best] = result
+            else:
+                self._append(prompt, result, vector)
+            self._dirty = True
+        self._schedule_save()
+
+    def _append(self, prompt, result, vector):
+        """Store a new row, overwriting the oldest one when the index is full; the lock must be held"""
+        if len(self._prompts) >= self.max_entries:
+            row = self._order.popleft()
+            self._document_frequencies -= self._term_frequencies[row] > 0
+            self._prompts[row] = prompt
+            self._results[row] = result
+        else:
+            row = len(self._prompts)
+            if row == len(self._term_frequencies):
+                # Grow geometrically so appends copy the matrices only O(log n) times
+                capacity = min(self.max_entries, max(16, 2 * row))
+                self._term_frequencies = self._grow(self._term_frequencies, capacity)
+                self._weighted = self._grow(self._weighted, capacity)
+            self._prompts.append(prompt)
+            self._results.append(result)
+        self._term_frequencies[row] = vector
+        self._document_frequencies += vector > 0
+        self._order.append(row)
+        if self._idf is not None:
+            self._weighted[row] = self._weigh(vector)
+        self._stale_rows += 1
+
+    def _grow(self, matrix, capacity):
+        grown = np.zeros((capacity, self.n_features), dtype=np.float32)
+        grown[:len(matrix)] = matrix
+        return grown
+
+    def stats(self):
+        """Hit/miss counters and index size for this process"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "entries": len(self._prompts)
+            }
+
+    def _read_file(self):
+        """(term frequencies, prompts, results) saved at path, oldest first, or None"""
+        if not os.path.exists(self.path):
+            return None
+        try:
+            with np.load(self.path, allow_pickle=False) as data:
+                term_frequencies = data['term_frequencies']
+                if term_frequencies.shape[1] != self.n_features:
+                    logger.warning(f"Ignoring semantic cache at {self.path}: feature size changed")
+                    return None
+                return (
+                    term_frequencies.astype(np.float32),
+                    json.loads(str(data['prompts'])),
+                    json.loads(str(data['results']))
+                )
+        except Exception as e:
+            logger.warning(f"Could not load semantic cache from {self.path}: {str(e)}")
+            return None
+
+    def _merge(self, saved):
+        """Append saved entries whose prompts this index does not have yet; returns how many"""
+        term_frequencies, prompts, results = saved
+        added = 0
+        with self._lock:
+            known = set(self._prompts)
+            for vector, prompt, result in zip(term_frequencies, prompts, results):
+                if prompt not in known:
+                    self._append(prompt, result, vector)
+                    known.add(prompt)
+                    added += 1
+        return added
+
+    def load(self):
+        """Load a previously saved index from disk, if there is one"""
+        saved = self._read_file()
+        if saved is not None:
+            added = self._merge(saved)
+            logger.info(f"Loaded {added} prompts into the semantic cache")
+
+    def _schedule_save(self):
+        with self._save_lock:
+            # A timer started before a fork does not exist in the child
+            if self._save_timer is not None and self._save_pid == os.getpid():
+                return
+            self._save_pid = os.getpid()
+            self._save_timer = threading.Timer(self.save_delay, self.flush)
+            self._save_timer.daemon = True
+            self._save_timer.start()
+
+    def flush(self):
+        """Save unsaved changes now, merging in entries other workers saved in the meantime"""
+        with self._save_lock:
+            self._save_timer = None
+        with self._lock:
+            if not self._dirty:
+                return
+            self._dirty = False
+
+        with _FileLock(f"{self.path}.lock"):
+            # Pick up what other workers saved, so writing the file does not drop their entries
+            saved = self._read_file()
+            if saved is not None:
+                self._merge(saved)
+            with self._lock:
+                order = list(self._order)
+                term_frequencies = self._term_frequencies[order]
+                prompts = [self._prompts[row] for row in order]
+                results = [self._results[row] for row in order]
+            self._save(term_frequencies, prompts, results)
+
+    def _save(self, term_frequencies, prompts, results):
+        """Write the index atomically so readers never see a partial file"""
+        temporary_path = f"{self.path}.{os.getpid()}.tmp.npz"
+        try:
+            np.savez(
+                temporary_path,
+                term_frequencies=term_frequencies,
+                prompts=np.array(json.dumps(prompts)),
+                results=np.array(json.dumps(results))
+            )
+            os.replace(temporary_path, self.path)
+        except Exception as e:
+            logger.warning(f"Could not save semantic cache to {self.path}: {str(e)}")
+
+
+class _FileLock:
+    """Exclusive advisory lock on a file shared by worker processes; a no-op where fcntl is unavailable"""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = None
+
+    def __enter__(self):
+        if fcntl is None:
+            return self
+        try:
+            self._file = open(self.path, 'a')
+            fcntl.flock(self._file, fcntl.LOCK_EX)
+        except OSError as e:
+            logger.warning(f"Could not lock {self.path}: {str(e)}")
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+        return self
+
+    def __exit__(self, *exc_info):
+        if self._file is not None:
+            fcntl.flock(self._file, fcntl.LOCK_UN)
+            self._file.close()
+            self._file = None
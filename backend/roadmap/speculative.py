@@ -0,0 +1,210 @@
+import logging
+import threading
+
+import torch
+from transformers import LogitsProcessorList, TemperatureLogitsWarper, TopKLogitsWarper, TopPLogitsWarper
+
+logger = logging.getLogger(__name__)
+
+
+class NgramDraftIndex:
+    """Corpus of token sequences searched for continuations of the latest n-gram.
+
+    Built once from the curated roadmaps, whose numbered names and JSON
+    boilerplate are exactly what the model writes. Each n-gram maps to where it
+    first occurs, so a lookup is one dictionary access.
+    """
+
+    def __init__(self, sequences=(), max_ngram=3, min_ngram=2, max_draft_tokens=8):
+        self.max_ngram = max_ngram
+        self.min_ngram = min_ngram
+        self.max_draft_tokens = max_draft_tokens
+        self._sequences = []
+        self._positions = {}
+        for token_ids in sequences:
+            self.add(token_ids)
+
+    def add(self, token_ids):
+        """Index every n-gram of a token sequence by the position right after it"""
+        token_ids = list(token_ids)
+        sequence = len(self._sequences)
+        self._sequences.append(token_ids)
+        for end in range(1, len(token_ids)):
+            for n in range(self.min_ngram, min(self.max_ngram, end) + 1):
+                self._positions.setdefault(tuple(token_ids[end - n:end]), (sequence, end))
+
+    def continuation(self, ngram):
+        """Tokens that followed ngram in the corpus, or an empty list"""
+        match = self._positions.get(ngram)
+        if match is None:
+            return []
+        sequence, end = match
+        return self._sequences[sequence][end:end + self.max_draft_tokens]
+
+    def session(self, token_ids):
+        return DraftSession(self, token_ids)
+
+
+class DraftSession:
+    """Draft proposals for one generation: the running sequence first, then the corpus"""
+
+    def __init__(self, index, token_ids):
+        self.index = index
+        self.tokens = []
+        self._positions = {}
+        self.extend(token_ids)
+
+    def extend(self, token_ids):
+        for token_id in token_ids:
+            # Register the n-grams ending here before appending, so the current
+            # tail never matches itself
+            end = len(self.tokens)
+            for n in range(1, min(self.index.max_ngram, end) + 1):
+                self._positions[tuple(self.tokens[end - n:end])] = end
+            self.tokens.append(token_id)
+
+    def propose(self):
+        """Draft tokens continuing the longest n-gram seen before, most recent occurrence first"""
+        for n in range(min(self.index.max_ngram, len(self.tokens)), 0, -1):
+            ngram = tuple(self.tokens[-n:])
+            end = self._positions.get(ngram)
+            if end is not None:
+                return self.tokens[end:end + self.index.max_draft_tokens]
+            if n >= self.index.min_ngram:
+                draft = self.index.continuation(ngram)
+                if draft:
+                    return draft
+        return []
+
+
+def _cache_length(past_key_values):
+    if past_key_values is None:
+        return 0
+    if hasattr(past_key_values, 'get_seq_length'):
+        return past_key_values.get_seq_length()
+    return past_key_values[0][0].shape[2]
+
+
+def _crop_cache(past_key_values, length):
+    """Drop cached keys/values for rejected draft tokens"""
+    if hasattr(past_key_values, 'crop'):
+        past_key_values.crop(length)
+        return past_key_values
+    return tuple(
+        tuple(tensor[:, :, :length] for tensor in layer)
+        for layer in past_key_values
+    )
+
+
+class SpeculativeDecoder:
+    """Sampling with n-gram drafts verified in one forward pass per step.
+
+    Each step feeds the last token plus up to ``max_draft_tokens`` drafted ones.
+    A draft token is accepted with the probability the model assigns it after
+    the logits processors and sampling warpers; on rejection the replacement is
+    drawn from that distribution with the draft token removed. Because drafts
+    are deterministic this is standard speculative sampling, so outputs follow
+    the same distribution as plain sampling. Handles one sequence at a time.
+    """
+
+    def __init__(self, model, draft_index, eos_token_id, temperature=0.7, top_k=50, top_p=0.95):
+        self.model = model
+        self.draft_index = draft_index
+        self.eos_token_id = eos_token_id
+        self.warpers = LogitsProcessorList([
+            TemperatureLogitsWarper(temperature),
+            TopKLogitsWarper(top_k),
+            TopPLogitsWarper(top_p)
+        ])
+        self._lock = threading.Lock()
+        self.drafted = 0
+        self.accepted = 0
+        self.forward_passes = 0
+        self.generated_tokens = 0
+
+    def stats(self):
+        """Draft acceptance counters for this process"""
+        with self._lock:
+            return {
+                "drafted": self.drafted,
+                "accepted": self.accepted,
+                "acceptance_rate": self.accepted / self.drafted if self.drafted else 0.0,
+                "forward_passes": self.forward_passes,
+                "generated_tokens": self.generated_tokens,
+                "tokens_per_forward": self.generated_tokens / self.forward_passes if self.forward_passes else 0.0
+            }
+
+    def _forward(self, token_ids, past_key_values):
+        with torch.no_grad():
+            outputs = self.model(
+                input_ids=torch.tensor([token_ids]),
+                past_key_values=past_key_values,
+                use_cache=True
+            )
+        return outputs.logits[0], outputs.past_key_values
+
+    def _probabilities(self, token_ids, logits, logits_processor):
+        """Sampling distribution for the next token after token_ids"""
+        input_ids = torch.tensor([token_ids])
+        scores = logits.float().unsqueeze(0)
+        if logits_processor is not None:
+            scores = logits_processor(input_ids, scores)
+        scores = self.warpers(input_ids, scores)
+        return torch.softmax(scores, dim=-1)[0]
+
+    def generate(self, input_ids, past_key_values=None, logits_processor=None, stopping_criteria=None, max_length=2048):
+        """Sample a continuation of a single sequence and return the full token ids"""
+        token_ids = input_ids[0].tolist()
+        session = self.draft_index.session(token_ids)
+        forward_passes = 0
+        drafted = 0
+        accepted_total = 0
+        generated = 0
+
+        # The cache always covers every token but the last, which is fed with the next draft
+        cached = _cache_length(past_key_values)
+        if cached < len(token_ids) - 1:
+            _, past_key_values = self._forward(token_ids[cached:-1], past_key_values)
+            forward_passes += 1
+
+        while len(token_ids) < max_length:
+            draft = session.propose()[:max_length - len(token_ids) - 1]
+            logits, past_key_values = self._forward([token_ids[-1]] + draft, past_key_values)
+            forward_passes += 1
+
+            accepted = []
+            next_token = None
+            for position, draft_token in enumerate(draft):
+                probabilities = self._probabilities(token_ids + accepted, logits[position], logits_processor)
+                if torch.rand(()).item() < probabilities[draft_token].item():
+                    accepted.append(draft_token)
+                    if draft_token == self.eos_token_id:
+                        break
+                    continue
+                probabilities[draft_token] = 0
+                next_token = torch.multinomial(probabilities / probabilities.sum(), 1).item()
+                break
+            else:
+                # Every draft token was accepted, so the last logits give a bonus token
+                probabilities = self._probabilities(token_ids + accepted, logits[len(accepted)], logits_processor)
+                next_token = torch.multinomial(probabilities, 1).item()
+
+            new_tokens = accepted + ([next_token] if next_token is not None else [])
+            token_ids.extend(new_tokens)
+            session.extend(new_tokens)
+            past_key_values = _crop_cache(past_key_values, len(token_ids) - 1)
+            drafted += len(draft)
+            accepted_total += len(accepted)
+            generated += len(new_tokens)
+
+            if self.eos_token_id in new_tokens:
+                break
+            if stopping_criteria is not None and stopping_criteria(torch.tensor([token_ids]), None):
+                break
+
+        with self._lock:
+            self.drafted += drafted
+            self.accepted += accepted_total
+            self.forward_passes += forward_passes
+            self.generated_tokens += generated
+        return torch.tensor([token_ids])
@@ -0,0 +1,93 @@
+import re
+
+# Define allowed tech fields
+TECH_FIELDS = frozenset({
+    # Programming Languages
+    'programming', 'python', 'javascript', 'java', 'c++', 'c#', 'ruby', 'php', 'swift', 'kotlin', 'rust', 'go', 'mongodb',
+
+    # Web Development
+    'web development', 'frontend', 'backend', 'fullstack', 'html', 'css', 'react', 'angular', 'vue', 'node.js',
+    'django', 'flask', 'spring boot', 'asp.net', 'web design', 'responsive design', 'full stack development',
+
+    # Data Related
+    'data', 'data science', 'data engineering', 'data analyst', 'data analytics', 'business analyst', 'business intelligence',
+    'bi', 'power bi', 'tableau', 'data visualization', 'etl', 'sql', 'mysql', 'postgresql', 'database',
+    'big data', 'hadoop', 'spark', 'data warehouse', 'data modeling',
+
+    # AI/ML
+    'machine learning', 'artificial intelligence', 'ai', 'deep learning', 'nlp', 'computer vision',
+    'neural networks', 'tensorflow', 'pytorch', 'scikit-learn', 'ml ops',
+
+    # Cloud & DevOps
+    'devops', 'cloud computing', 'aws', 'azure', 'gcp', 'docker', 'kubernetes', 'jenkins', 'ci/cd',
+    'terraform', 'ansible', 'cloud architect', 'site reliability', 'sre', 'system admin',
+
+    # Security
+    'cybersecurity', 'security', 'ethical hacking', 'penetration testing', 'pen testing', 'network security',
+    'security analyst', 'security engineer', 'information security', 'infosec',
+
+    # Mobile Development
+    'mobile development', 'android', 'ios', 'flutter', 'react native', 'mobile app', 'app development',
+
+    # Other Tech Roles & Skills
+    'software engineer', 'software developer', 'software architect', 'solution architect',
+    'quality assurance', 'qa engineer', 'test automation', 'automation engineer',
+    'technical project manager', 'scrum master', 'agile', 'product owner',
+    'ui/ux', 'user interface', 'user experience', 'product design', 'system design',
+    'blockchain', 'web3', 'defi', 'smart contracts', 'cryptocurrency',
+    'game development', 'unity', 'unreal engine',
+    'embedded systems', 'iot', 'internet of things', 'robotics',
+    'technical lead', 'tech lead', 'engineering manager',
+    'networking', 'network engineer', 'system administrator',
+    'linux', 'unix', 'windows server', 'shell scripting',
+    'api', 'rest api', 'graphql', 'microservices', 'distributed systems',
+})
+
+# Topics the bundled curated roadmaps cover that TECH_FIELDS misses. Curated
+# roadmaps are only served to prompts that pass the gate, so without these
+# their topics would be refused. Each entry matches at least one curated topic;
+# broad words such as 'developer', 'cloud' or 'coding' are deliberately absent.
+CURATED_TOPIC_FIELDS = frozenset({
+    'full stack', 'web developer', 'reactflow', 'typescript', 'golang', 'wordpress', 'cross platform', 'design system',
+    'software development', 'software engineering', 'platform engineer', 'google cloud', 'cloud architecture',
+    'ml', 'mlops', 'natural language processing', 'speech recognition', 'reinforcement learning',
+    'chatbot', 'prompt engineering', 'prompt engineer',
+    'qa', 'ui', 'ux', 'product manager', 'it consultant', 'network administrator', 'git', 'github',
+    'game developer', 'game designer', 'mobile game', '3d graphics',
+})
+
+
+class TechTopicClassifier:
+    """Decide whether a prompt is about technology with one precompiled regex.
+
+    All keywords are compiled into a single alternation (longest first) that only
+    matches whole words, with optional plural endings and any run of spaces,
+    hyphens or underscores between the words of a phrase, so the check is one
+    pass over the prompt.
+    """
+
+    def __init__(self, keywords=TECH_FIELDS | CURATED_TOPIC_FIELDS):
+        alternatives = sorted({keyword.lower() for keyword in keywords if keyword}, key=len, reverse=True)
+        pattern = '|'.join(
+            r'[\s_-]+'.join(re.escape(word) for word in keyword.split())
+            for keyword in alternatives
+        )
+        self._pattern = re.compile(rf'(?<![a-z0-9])(?:{pattern})(?:e?s)?(?![a-z0-9])', re.IGNORECASE)
+
+    def match(self, prompt):
+        """Return the first tech keyword found in prompt, or None"""
+        found = self._pattern.search(prompt)
+        return found.group(0).lower() if found else None
+
+    def is_tech_related(self, prompt):
+        """Check if the prompt is related to technology field"""
+        return self._pattern.search(prompt) is not None
+
+
+# Compiled once per process and shared by every request
+tech_classifier = TechTopicClassifier()
+
+
+def is_tech_related(prompt):
+    """Check if the prompt is related to technology field"""
+    return tech_classifier.is_tech_related(prompt)
@@ -0,0 +1,122 @@
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from roadmap.backup_client import (
+    BackupProviderClient,
+    BackupProviderError,
+    CircuitBreaker,
+    CircuitOpenError,
+    StubTransport
+)
+
+
+class FailingTransport:
+    def __init__(self):
+        self.calls = 0
+        self.fail = True
+
+    def generate(self, prompt, timeout):
+        self.calls += 1
+        if self.fail:
+            raise ConnectionError("provider down")
+        return "ok"
+
+
+class CircuitBreakerTests(SimpleTestCase):
+    def setUp(self):
+        self.now = 1000.0
+        patcher = mock.patch('roadmap.backup_client.time.monotonic', side_effect=lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_opens_after_threshold_then_half_opens_and_closes(self):
+        breaker = CircuitBreaker(failure_threshold=3, reset_timeout=30)
+        for _ in range(2):
+            self.assertTrue(breaker.allow())
+            breaker.record_failure()
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+
+        breaker.record_failure()
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+        self.assertFalse(breaker.allow())
+
+        self.now += 31
+        # One trial call is let through; concurrent callers still fail fast
+        self.assertTrue(breaker.allow())
+        self.assertEqual(breaker.state, CircuitBreaker.HALF_OPEN)
+        self.assertFalse(breaker.allow())
+
+        breaker.record_success()
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+        self.assertTrue(breaker.allow())
+
+    def test_failed_trial_reopens(self):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+        breaker.record_failure()
+        self.now += 31
+        self.assertTrue(breaker.allow())
+
+        breaker.record_failure()
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+        self.now += 10
+        self.assertFalse(breaker.allow())
+        self.now += 21
+        self.assertTrue(breaker.allow())
+
+    def test_success_resets_the_failure_count(self):
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30)
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+
+
+class BackupProviderClientTests(SimpleTestCase):
+    def test_client_fails_fast_while_the_circuit_is_open(self):
+        transport = FailingTransport()
+        client = BackupProviderClient(
+            transport_factory=lambda: transport,
+            max_concurrency=1,
+            timeout=5,
+            max_retries=0,
+            breaker=CircuitBreaker(failure_threshold=2, reset_timeout=60)
+        )
+        for _ in range(2):
+            with self.assertRaises(BackupProviderError):
+                client.generate_text("prompt")
+        self.assertEqual(transport.calls, 2)
+
+        with self.assertRaises(CircuitOpenError):
+            client.generate_text("prompt")
+        self.assertEqual(transport.calls, 2)
+
+    def test_client_recovers_after_the_reset_timeout(self):
+        transport = FailingTransport()
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60)
+        client = BackupProviderClient(
+            transport_factory=lambda: transport, max_concurrency=1, timeout=5, max_retries=0, breaker=breaker
+        )
+        with self.assertRaises(BackupProviderError):
+            client.generate_text("prompt")
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+
+        transport.fail = False
+        breaker._opened_at -= 61
+        self.assertEqual(client.generate_text("prompt"), "ok")
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+
+    def test_retries_within_one_call(self):
+        transport = FailingTransport()
+        client = BackupProviderClient(
+            transport_factory=lambda: transport, max_concurrency=1, timeout=5, max_retries=2, retry_backoff=0,
+            breaker=CircuitBreaker(failure_threshold=10)
+        )
+        with self.assertRaises(BackupProviderError):
+            client.generate_text("prompt")
+        self.assertEqual(transport.calls, 3)
+
+    def test_stub_transport_answers_with_a_roadmap_for_the_topic(self):
+        client = BackupProviderClient(transport_factory=StubTransport, max_concurrency=1, timeout=5)
+        text = client.generate_text("Create a learning roadmap for Rust.\n")
+        self.assertIn('"name": "Rust"', text)
@@ -0,0 +1,161 @@
+import asyncio
+import json
+import os
+import threading
+import time
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from roadmap import bulk_resources
+from roadmap.bulk_resources import aiter_resources, group_topics, iter_resources
+from roadmap.topic_resources import roadmap_node_names
+
+LOCAL_ROADMAP = {
+    "name": "Python",
+    "children": [
+        {"name": "Basics", "children": [{"name": "Variables"}, {"name": "Loops"}]},
+        {"name": "Web", "children": [{"name": "Django", "children": [{"name": "Models"}]}]},
+    ]
+}
+BACKUP_ROADMAP = {
+    "title": "Python",
+    "subtopics": [
+        {"title": "Basics", "subtopics": [{"title": "Variables"}]},
+        {"title": "Web"},
+    ]
+}
+
+
+def fake_resources(topic):
+    return {'topicInfo': f"About {topic}", 'courses': []}
+
+
+class ConcurrencyProbe:
+    """resolve_fn recording how many calls overlap"""
+
+    def __init__(self, seconds=0.02):
+        self.seconds = seconds
+        self.active = 0
+        self.peak = 0
+        self.threads = set()
+        self._lock = threading.Lock()
+
+    def __call__(self, topic):
+        with self._lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+            self.threads.add(threading.current_thread().name)
+        time.sleep(self.seconds)
+        with self._lock:
+            self.active -= 1
+        return fake_resources(topic)
+
+
+class GroupTopicsTests(SimpleTestCase):
+    def test_names_normalizing_to_one_topic_are_grouped(self):
+        groups = group_topics(["Python Basics", "python basics", "Loops", "", None, 3])
+        self.assertEqual(list(groups.values()), [
+            ("Python Basics", ["Python Basics", "python basics"]),
+            ("Loops", ["Loops"]),
+        ])
+
+
+class RoadmapNodeNamesTests(SimpleTestCase):
+    def test_local_roadmap_shape(self):
+        self.assertEqual(roadmap_node_names(LOCAL_ROADMAP), ["Basics", "Variables", "Loops", "Web", "Django", "Models"])
+        self.assertEqual(roadmap_node_names(LOCAL_ROADMAP, max_depth=1), ["Basics", "Web"])
+
+    def test_backup_roadmap_shape(self):
+        self.assertEqual(roadmap_node_names(BACKUP_ROADMAP), ["Basics", "Variables", "Web"])
+
+
+class IterResourcesTests(SimpleTestCase):
+    def setUp(self):
+        # A fresh two-thread pool, restored to the module's own afterwards
+        patchers = [
+            mock.patch.dict(os.environ, {'ROADMAP_RESOURCE_BULK_WORKERS': '2'}),
+            mock.patch.object(bulk_resources, '_executor', None),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_each_topic_is_resolved_once(self):
+        resolve = mock.Mock(side_effect=fake_resources)
+        results = list(iter_resources(["Loops", "loops", "Django"], resolve))
+        self.assertEqual(resolve.call_count, 2)
+        self.assertEqual(sorted(names for names, _ in results), [["Django"], ["Loops", "loops"]])
+
+    def test_concurrent_requests_share_one_bounded_pool(self):
+        probe = ConcurrencyProbe()
+        topics = [[f"Topic {request} {index}" for index in range(6)] for request in range(3)]
+        threads = [threading.Thread(target=lambda names=names: list(iter_resources(names, probe))) for names in topics]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(5)
+
+        self.assertLessEqual(probe.peak, 2)
+        self.assertLessEqual(len(probe.threads), 2)
+
+    def test_failed_topics_resolve_to_none(self):
+        def resolve(topic):
+            if topic == "Broken":
+                raise RuntimeError("upstream failed")
+            return fake_resources(topic)
+
+        results = dict((names[0], resources) for names, resources in iter_resources(["Broken", "Loops"], resolve))
+        self.assertIsNone(results["Broken"])
+        self.assertEqual(results["Loops"]["topicInfo"], "About Loops")
+
+    def test_stopping_early_cancels_queued_topics(self):
+        resolve = mock.Mock(side_effect=ConcurrencyProbe(0.05))
+        events = iter_resources([f"Topic {index}" for index in range(10)], resolve)
+        next(events)
+        events.close()
+        time.sleep(0.2)
+        self.assertLess(resolve.call_count, 10)
+
+    def test_async_iteration(self):
+        probe = ConcurrencyProbe()
+
+        async def collect():
+            return [names async for names, _ in aiter_resources([f"Topic {index}" for index in range(5)], probe)]
+
+        self.assertEqual(len(asyncio.run(collect())), 5)
+        self.assertLessEqual(probe.peak, 2)
+
+
+@mock.patch('roadmap.views.get_topic_resources', side_effect=fake_resources)
+class GetBulkResourcesViewTests(SimpleTestCase):
+    url = '/api/resources/bulk/'
+
+    def post(self, body):
+        return self.client.post(self.url, json.dumps(body), content_type='application/json')
+
+    def test_topics_and_roadmap_nodes_are_merged(self, resolve):
+        response = self.post({"topics": ["Rust"], "roadmap": {"name": "Go", "children": [{"name": "Goroutines"}]}})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(set(response.json()["resources"]), {"Rust", "Goroutines"})
+
+    def test_topics_must_be_a_list_of_names(self, resolve):
+        for topics in ("Rust", ["Rust", 3], {"name": "Rust"}):
+            response = self.post({"topics": topics, "roadmap": LOCAL_ROADMAP})
+            self.assertEqual(response.status_code, 400, topics)
+        resolve.assert_not_called()
+
+    def test_streamed_response(self, resolve):
+        response = self.post({"roadmap": LOCAL_ROADMAP, "stream": True})
+        body = b''.join(response.streaming_content).decode()
+        self.assertEqual(body.count("event: resource"), 6)
+        self.assertTrue(body.rstrip().endswith('data: {"success": true, "resolved": 6}'))
+
+    def test_streamed_response_under_asgi(self, resolve):
+        async def read():
+            response = await self.async_client.post(
+                self.url, {"roadmap": LOCAL_ROADMAP, "stream": True}, content_type='application/json'
+            )
+            return b''.join([chunk async for chunk in response.streaming_content]).decode()
+
+        self.assertEqual(asyncio.run(read()).count("event: resource"), 6)
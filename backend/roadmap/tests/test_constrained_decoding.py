@@ -0,0 +1,135 @@
+import json
+
+import torch
+from django.test import SimpleTestCase
+
+from roadmap.constrained_decoding import (
+    DONE,
+    INITIAL_STATE,
+    RoadmapSchema,
+    RoadmapSchemaLogitsProcessor,
+    advance,
+)
+
+
+def node(name, children=None):
+    data = {"name": name}
+    if children is not None:
+        data["children"] = children
+    return data
+
+
+def roadmap(main_topics=2, subtopics=2, points=2):
+    return node("Python", [
+        node(f"Topic {main}", [
+            node(f"Sub {sub}", [node(f"Point {point}", []) for point in range(points)])
+            for sub in range(subtopics)
+        ])
+        for main in range(main_topics)
+    ])
+
+
+def accepts(text):
+    state = advance(INITIAL_STATE, text)
+    return state is not None and state[0] == DONE
+
+
+class RoadmapGrammarTests(SimpleTestCase):
+    def test_accepts_valid_roadmaps(self):
+        self.assertTrue(accepts(json.dumps(roadmap())))
+        self.assertTrue(accepts(json.dumps(roadmap(6, 4, 3), indent=2)))
+        self.assertTrue(accepts(json.dumps(node("C++ \"fast\" \\ café", [node("Leaf")]))))
+        self.assertTrue(accepts('{"name": "Go \\u00e9", "children": [{"name": "A", "children": []}]}'))
+
+    def test_enforces_the_node_limits(self):
+        self.assertFalse(accepts(json.dumps(roadmap(main_topics=7))))
+        self.assertFalse(accepts(json.dumps(roadmap(subtopics=5))))
+        self.assertFalse(accepts(json.dumps(roadmap(points=4))))
+
+    def test_points_cannot_have_children(self):
+        deep = roadmap(1, 1, 1)
+        deep["children"][0]["children"][0]["children"][0]["children"] = [node("Too deep")]
+        self.assertFalse(accepts(json.dumps(deep)))
+
+    def test_root_needs_children(self):
+        self.assertFalse(accepts('{"name": "Python"}'))
+        self.assertFalse(accepts('{"name": "Python", "children": []}'))
+
+    def test_rejects_other_json(self):
+        self.assertIsNone(advance(INITIAL_STATE, '{"title": "Python"}'))
+        self.assertIsNone(advance(INITIAL_STATE, '{"name": 3}'))
+        self.assertIsNone(advance(INITIAL_STATE, '{"name": "a\nb"}'))
+        self.assertIsNone(advance(INITIAL_STATE, json.dumps(roadmap()) + ' '))
+
+    def test_prefixes_of_valid_roadmaps_stay_in_the_grammar(self):
+        text = json.dumps(roadmap())
+        for end in range(len(text)):
+            self.assertIsNotNone(advance(INITIAL_STATE, text[:end]), text[:end])
+
+
+class FakeTokenizer:
+    """Just enough of a SentencePiece tokenizer for RoadmapSchema"""
+
+    tokens = ['</s>', '{', '}', '"name"', ':', '▁"', 'Py', '"', ',', '"children"', '[', ']', '▁', 'x"', 'Hello']
+    eos_token_id = 0
+    all_special_ids = [0]
+
+    def __len__(self):
+        return len(self.tokens)
+
+    def convert_ids_to_tokens(self, ids):
+        return [self.tokens[token_id] for token_id in ids]
+
+    def encode(self, pieces):
+        return [self.tokens.index(piece) for piece in pieces]
+
+
+class RoadmapSchemaTests(SimpleTestCase):
+    def setUp(self):
+        self.tokenizer = FakeTokenizer()
+        self.schema = RoadmapSchema(self.tokenizer)
+
+    def allowed(self, state):
+        mask = self.schema.mask(state)
+        return {self.tokenizer.tokens[token_id] for token_id in range(len(mask)) if mask[token_id]}
+
+    def test_masks_follow_the_grammar(self):
+        self.assertEqual(self.allowed(INITIAL_STATE), {'{', '▁'})
+        # Any token opening a string may follow, even one that spells a key
+        after_key = advance(INITIAL_STATE, '{"name":')
+        self.assertEqual(self.allowed(after_key), {'▁"', '▁', '"', '"name"', '"children"'})
+        in_name = advance(INITIAL_STATE, '{"name": "')
+        self.assertTrue({'Py', 'x"', 'Hello', '{', '"'} <= self.allowed(in_name))
+        # The root needs children, so it cannot close after its name
+        self.assertEqual(self.allowed(advance(INITIAL_STATE, '{"name": "Py"')), {',', '▁'})
+        self.assertEqual(self.allowed(advance(INITIAL_STATE, json.dumps(roadmap(1, 1, 1)))), {'</s>'})
+
+    def test_logits_processor_masks_disallowed_tokens(self):
+        prompt = [14, 14]
+        generated = self.tokenizer.encode(['{', '"name"', ':', '▁"', 'Py', '"'])
+        processor = RoadmapSchemaLogitsProcessor(self.schema, prompt_length=len(prompt))
+        scores = processor(torch.tensor([prompt + generated]), torch.zeros(1, len(self.tokenizer)))
+
+        allowed = {self.tokenizer.tokens[token_id] for token_id in torch.nonzero(scores[0] > float('-inf')).flatten()}
+        self.assertEqual(allowed, {',', '▁'})
+
+    def test_logits_processor_rolls_back_rejected_tokens(self):
+        processor = RoadmapSchemaLogitsProcessor(self.schema, prompt_length=0)
+        longer = self.tokenizer.encode(['{', '"name"', ':'])
+        processor(torch.tensor([longer]), torch.zeros(1, len(self.tokenizer)))
+        scores = processor(torch.tensor([longer[:1]]), torch.zeros(1, len(self.tokenizer)))
+        allowed = torch.isfinite(scores[0]).nonzero().flatten().tolist()
+        self.assertEqual(allowed, sorted(self.tokenizer.encode(['"name"', '▁"', '"', '▁'])))
+
+    def test_logits_processor_follows_one_new_token_per_step(self):
+        processor = RoadmapSchemaLogitsProcessor(self.schema, prompt_length=1)
+        generated = self.tokenizer.encode(['{', '"name"', ':', '▁"', 'Py', '"'])
+        for end in range(len(generated) + 1):
+            processor(torch.tensor([[14] + generated[:end]]), torch.zeros(1, len(self.tokenizer)))
+        self.assertEqual(processor._tokens[0], generated)
+        self.assertEqual(processor._states[0][-1], advance(INITIAL_STATE, '{"name": "Py"'))
+
+        # A shorter row after the step-by-step path still rolls back
+        scores = processor(torch.tensor([[14] + generated[:1]]), torch.zeros(1, len(self.tokenizer)))
+        allowed = torch.isfinite(scores[0]).nonzero().flatten().tolist()
+        self.assertEqual(allowed, sorted(self.tokenizer.encode(['"name"', '▁"', '"', '▁'])))
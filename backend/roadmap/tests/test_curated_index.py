@@ -0,0 +1,38 @@
+from django.test import SimpleTestCase
+
+from roadmap.curated_index import CuratedRoadmapIndex, topic_key
+
+
+class TopicKeyTests(SimpleTestCase):
+    def test_request_phrasing_is_removed(self):
+        self.assertEqual(topic_key("I want to learn Data Science"), "data science")
+        self.assertEqual(topic_key("roadmap for data science"), "data science")
+        self.assertEqual(topic_key("Java from zero to hero"), "java")
+        self.assertEqual(topic_key("learn ML"), "machine learning")
+
+    def test_words_inside_a_topic_are_kept(self):
+        self.assertEqual(topic_key("i want to learn git and github"), "git and github")
+        self.assertEqual(topic_key("internet of things"), "internet of things")
+        self.assertEqual(topic_key("machine learning engineer"), "machine learning engineer")
+
+
+class CuratedRoadmapIndexTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.index = CuratedRoadmapIndex()
+
+    def test_rephrased_prompts_find_the_curated_roadmap(self):
+        first = self.index.lookup("i want to learn data science")
+        second = self.index.lookup("Data Science roadmap")
+        self.assertEqual(first["source"], "curated")
+        self.assertEqual(first["roadmap"], second["roadmap"])
+
+    def test_partial_topics_do_not_match(self):
+        self.assertIsNotNone(self.index.lookup("machine learning"))
+        self.assertIsNone(self.index.lookup("machine"))
+        self.assertIsNone(self.index.lookup("deep"))
+
+    def test_returned_roadmaps_are_copies(self):
+        self.index.lookup("python")["roadmap"]["name"] = "changed"
+        self.assertNotEqual(self.index.lookup("python")["roadmap"]["name"], "changed")
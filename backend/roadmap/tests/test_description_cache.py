@@ -0,0 +1,129 @@
+import asyncio
+import os
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.test import SimpleTestCase
+
+from roadmap.description_cache import DescriptionCache
+
+
+class FakeFetch:
+    """fetch_fn answering from a dict, optionally waiting for a release"""
+
+    def __init__(self, answers=None, release=None, error=None):
+        self.answers = answers or {}
+        self.release = release
+        self.error = error
+        self.calls = []
+
+    def __call__(self, topic, timeout=None):
+        self.calls.append(topic)
+        if self.release is not None:
+            self.release.wait(5)
+        if self.error is not None:
+            raise self.error
+        return self.answers.get(topic)
+
+
+class DescriptionCacheTests(SimpleTestCase):
+    def setUp(self):
+        self.workdir = tempfile.mkdtemp(prefix='description-cache-test-')
+        self.addCleanup(shutil.rmtree, self.workdir, ignore_errors=True)
+
+    def cache(self, fetch, **kwargs):
+        options = {'ttl': 3600, 'negative_ttl': 60, 'stale_ttl': 3600, 'wait_timeout': 2}
+        options.update(kwargs)
+        return DescriptionCache(fetch_fn=fetch, path=os.path.join(self.workdir, 'descriptions.sqlite3'), **options)
+
+    def age_entry(self, cache, topic, seconds):
+        cache._connection().execute(
+            "UPDATE descriptions SET fetched_at = fetched_at - ? WHERE key = ?", (seconds, topic.lower())
+        )
+
+    def wait_for_refreshes(self, cache):
+        deadline = time.monotonic() + 2
+        while cache.stats()['refreshing'] and time.monotonic() < deadline:
+            time.sleep(0.005)
+
+    def test_fresh_hit_does_not_fetch(self):
+        fetch = FakeFetch({'Rust': 'Rust is a systems programming language.'})
+        cache = self.cache(fetch)
+        self.assertEqual(cache.get('Rust'), 'Rust is a systems programming language.')
+        self.assertEqual(cache.get('Rust'), 'Rust is a systems programming language.')
+        self.assertEqual(fetch.calls, ['Rust'])
+        self.assertEqual((cache.stats()['hits'], cache.stats()['misses']), (1, 1))
+
+    def test_negative_hit_is_cached_for_the_negative_ttl(self):
+        fetch = FakeFetch()
+        cache = self.cache(fetch)
+        self.assertIsNone(cache.get('Obscure'))
+        self.assertIsNone(cache.get('Obscure'))
+        self.assertEqual(fetch.calls, ['Obscure'])
+
+        # Past the negative TTL, but well within the positive one
+        self.age_entry(cache, 'Obscure', 120)
+        self.assertIsNone(cache.get('Obscure'))
+        self.wait_for_refreshes(cache)
+        self.assertEqual(fetch.calls, ['Obscure', 'Obscure'])
+
+    def test_stale_hit_is_served_and_refreshed_once(self):
+        fetch = FakeFetch({'Rust': 'Old description of Rust.'})
+        cache = self.cache(fetch)
+        cache.get('Rust')
+        self.age_entry(cache, 'Rust', 4000)
+
+        release = threading.Event()
+        fetch.release = release
+        fetch.answers['Rust'] = 'New description of Rust.'
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            served = list(pool.map(lambda _: cache.get('Rust'), range(4)))
+        self.assertEqual(served, ['Old description of Rust.'] * 4)
+        self.assertEqual(cache.stats()['stale_hits'], 4)
+
+        release.set()
+        self.wait_for_refreshes(cache)
+        self.assertEqual(fetch.calls, ['Rust', 'Rust'])
+        self.assertEqual(cache.get('Rust'), 'New description of Rust.')
+
+    def test_expired_entry_is_a_miss(self):
+        fetch = FakeFetch({'Rust': 'Rust is a systems programming language.'})
+        cache = self.cache(fetch)
+        cache.get('Rust')
+        self.age_entry(cache, 'Rust', 8000)
+        cache.get('Rust')
+        self.assertEqual(cache.stats()['misses'], 2)
+
+    def test_slow_cold_miss_times_out_and_fills_the_cache_afterwards(self):
+        release = threading.Event()
+        fetch = FakeFetch({'Rust': 'Rust is a systems programming language.'}, release=release)
+        cache = self.cache(fetch, wait_timeout=0.05)
+        self.assertIsNone(cache.get('Rust'))
+
+        release.set()
+        self.wait_for_refreshes(cache)
+        self.assertEqual(cache.get('Rust'), 'Rust is a systems programming language.')
+        self.assertEqual(fetch.calls, ['Rust'])
+
+    def test_async_cold_miss_times_out_without_cancelling_the_fetch(self):
+        release = threading.Event()
+        fetch = FakeFetch({'Rust': 'Rust is a systems programming language.'}, release=release)
+        cache = self.cache(fetch, wait_timeout=0.05)
+        self.assertIsNone(asyncio.run(cache.aget('Rust')))
+
+        release.set()
+        self.wait_for_refreshes(cache)
+        self.assertEqual(asyncio.run(cache.aget('Rust')), 'Rust is a systems programming language.')
+
+    def test_fetch_errors_are_not_cached(self):
+        fetch = FakeFetch(error=ConnectionError("Wikipedia is down"))
+        cache = self.cache(fetch)
+        self.assertIsNone(cache.get('Rust'))
+
+        fetch.error = None
+        fetch.answers['Rust'] = 'Rust is a systems programming language.'
+        self.assertEqual(cache.get('Rust'), 'Rust is a systems programming language.')
+        self.assertEqual(fetch.calls, ['Rust', 'Rust'])
@@ -0,0 +1,106 @@
+import threading
+import time
+
+from django.test import SimpleTestCase
+
+from roadmap.hedging import HedgeStats, RoadmapHedger
+
+LOCAL_RESULT = {"success": True, "roadmap": {"name": "local"}, "source": "local_model"}
+BACKUP_RESULT = {"success": True, "roadmap": {"name": "backup"}, "source": "backup_model"}
+
+
+def slow_local(seconds, result=LOCAL_RESULT, error=None):
+    """local_fn that takes seconds unless cancelled, then returns (result, error)"""
+    cancelled = []
+
+    def local_fn(prompt, cancel_event, on_tokens):
+        if cancel_event.wait(seconds):
+            cancelled.append(prompt)
+            return None, "cancelled"
+        return result, error
+
+    return local_fn, cancelled
+
+
+class RoadmapHedgerTests(SimpleTestCase):
+    def test_fast_local_result_wins_without_starting_the_backup(self):
+        backup_calls = []
+        local_fn, _ = slow_local(0)
+        hedger = RoadmapHedger(
+            local_fn, lambda prompt: backup_calls.append(prompt) or BACKUP_RESULT,
+            mode='always', delay_ms=500, stats=HedgeStats(min_samples=1)
+        )
+        self.assertEqual(hedger.generate("learn rust"), LOCAL_RESULT)
+        self.assertEqual(backup_calls, [])
+        self.assertEqual(hedger.stats.stats()["rust"]["local_wins"], 1)
+
+    def test_backup_wins_and_cancels_the_local_run(self):
+        local_fn, cancelled = slow_local(5)
+        hedger = RoadmapHedger(local_fn, lambda prompt: BACKUP_RESULT, mode='always', delay_ms=20)
+        started = time.monotonic()
+        self.assertEqual(hedger.generate("learn rust"), BACKUP_RESULT)
+        self.assertLess(time.monotonic() - started, 2)
+
+        deadline = time.monotonic() + 2
+        while not cancelled and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(cancelled, ["learn rust"])
+        self.assertEqual(hedger.stats.stats()["rust"]["backup_wins"], 1)
+
+    def test_local_failure_starts_the_backup_before_its_delay(self):
+        local_fn, _ = slow_local(0, result=None, error="invalid json")
+        hedger = RoadmapHedger(local_fn, lambda prompt: BACKUP_RESULT, mode='always', delay_ms=10000)
+        started = time.monotonic()
+        self.assertEqual(hedger.generate("learn rust"), BACKUP_RESULT)
+        self.assertLess(time.monotonic() - started, 2)
+        self.assertEqual(hedger.stats.stats()["rust"]["local_failures"], 1)
+
+    def test_token_trigger_starts_the_backup(self):
+        started_backup = threading.Event()
+
+        def local_fn(prompt, cancel_event, on_tokens):
+            on_tokens(50)
+            cancel_event.wait(5)
+            return None, "cancelled"
+
+        def backup_fn(prompt):
+            started_backup.set()
+            return BACKUP_RESULT
+
+        hedger = RoadmapHedger(local_fn, backup_fn, mode='always', delay_ms=10000, after_tokens=32)
+        self.assertEqual(hedger.generate("learn rust"), BACKUP_RESULT)
+        self.assertTrue(started_backup.is_set())
+
+    def test_both_failing_returns_an_error(self):
+        local_fn, _ = slow_local(0, result=None, error="invalid json")
+        hedger = RoadmapHedger(local_fn, lambda prompt: {"success": False, "error": "down"}, mode='always')
+        self.assertFalse(hedger.generate("learn rust")["success"])
+
+    def test_unknown_mode_is_rejected(self):
+        with self.assertRaises(ValueError):
+            RoadmapHedger(lambda *args: (None, None), lambda prompt: None, mode='sometimes')
+
+
+class HedgeStatsTests(SimpleTestCase):
+    def test_adaptive_hedging_follows_the_local_failure_rate(self):
+        stats = HedgeStats(min_samples=3, failure_rate=0.5)
+        hedger = RoadmapHedger(lambda *args: (None, None), lambda prompt: None, mode='adaptive', stats=stats)
+        stats.record("learn rust", 'backup', local_failed=True)
+        stats.record("rust", 'backup', local_failed=True)
+        self.assertFalse(hedger.should_hedge("learn rust"))
+
+        stats.record("learn rust", 'local', local_failed=False)
+        self.assertTrue(hedger.should_hedge("learn rust"))
+        self.assertFalse(hedger.should_hedge("learn go"))
+
+    def test_cancelled_local_runs_do_not_count(self):
+        stats = HedgeStats(min_samples=1, failure_rate=0.5)
+        stats.record("learn rust", 'backup', local_failed=None)
+        self.assertFalse(stats.should_hedge("learn rust"))
+        self.assertEqual(stats.stats()["rust"]["requests"], 1)
+
+    def test_least_recently_used_topics_are_dropped(self):
+        stats = HedgeStats(min_samples=1, max_topics=2)
+        for topic in ("rust", "go", "zig"):
+            stats.record(topic, 'local', local_failed=False)
+        self.assertEqual(list(stats.stats()), ["go", "zig"])
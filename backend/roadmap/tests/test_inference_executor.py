@@ -0,0 +1,149 @@
+import asyncio
+import os
+import threading
+import time
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from roadmap.inference_executor import DrainedStream, InferenceExecutor, InferenceOverloaded
+
+
+def wait_until(condition, timeout=2):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.005)
+    return condition()
+
+
+class InferenceExecutorTests(SimpleTestCase):
+    def setUp(self):
+        self.release = threading.Event()
+        self.addCleanup(self.release.set)
+
+    def blocked(self):
+        self.release.wait(5)
+        return 'done'
+
+    def test_rejects_once_workers_and_queue_are_full(self):
+        executor = InferenceExecutor(max_workers=2, max_queue=1)
+        futures = [executor.submit(self.blocked) for _ in range(3)]
+        self.assertTrue(wait_until(lambda: executor.stats()['running'] == 2))
+        self.assertEqual(executor.stats()['queued'], 1)
+
+        with self.assertRaises(InferenceOverloaded) as raised:
+            executor.submit(self.blocked)
+        self.assertGreaterEqual(raised.exception.retry_after, 1)
+        self.assertEqual(executor.stats()['rejected'], 1)
+
+        self.release.set()
+        self.assertEqual([future.result(5) for future in futures], ['done'] * 3)
+
+    def test_admission_is_released_when_a_job_finishes_or_raises(self):
+        executor = InferenceExecutor(max_workers=1, max_queue=0)
+
+        def explode():
+            raise RuntimeError("boom")
+
+        with self.assertRaises(RuntimeError):
+            executor.submit(explode).result(5)
+        self.assertEqual(executor.submit(lambda: 'ok').result(5), 'ok')
+        stats = executor.stats()
+        self.assertEqual((stats['running'], stats['queued'], stats['completed']), (0, 0, 2))
+
+    def test_retry_after_scales_with_admitted_work(self):
+        executor = InferenceExecutor(max_workers=2, max_queue=4)
+        # Without history a generation is assumed to take five seconds
+        self.assertEqual(executor.retry_after(), 3)
+
+        executor._avg_seconds = 2.0
+        for _ in range(3):
+            executor.submit(self.blocked)
+        # Three admitted plus the new request over two workers
+        self.assertEqual(executor.retry_after(), 4)
+
+    def test_moving_average_of_generation_time(self):
+        executor = InferenceExecutor(max_workers=1, max_queue=0)
+        executor.submit(time.sleep, 0.05).result(5)
+        self.assertGreaterEqual(executor.stats()['avg_seconds'], 0.04)
+
+    def test_pool_and_admission_count_are_rebuilt_after_fork(self):
+        executor = InferenceExecutor(max_workers=1, max_queue=0)
+        executor.submit(self.blocked)
+        with self.assertRaises(InferenceOverloaded):
+            executor.submit(self.blocked)
+        parent_pool = executor._executor
+
+        # A forked child inherits the counters but none of the threads
+        with mock.patch('roadmap.inference_executor.os.getpid', return_value=os.getpid() + 1):
+            future = executor.submit(lambda: 'child')
+            self.assertIsNot(executor._executor, parent_pool)
+            self.assertEqual(future.result(5), 'child')
+
+    def test_run_awaits_the_result(self):
+        executor = InferenceExecutor(max_workers=1, max_queue=0)
+        self.assertEqual(asyncio.run(executor.run(lambda x: x * 2, 21)), 42)
+
+
+class DrainedStreamTests(SimpleTestCase):
+    def endless(self, closed):
+        try:
+            count = 0
+            while True:
+                count += 1
+                yield count
+                time.sleep(0.005)
+        finally:
+            closed.set()
+
+    def test_items_and_errors_reach_a_sync_reader(self):
+        def failing():
+            yield 1
+            raise ValueError("bad")
+
+        stream = DrainedStream(failing)
+        threading.Thread(target=stream.drain).start()
+        items = []
+        with self.assertRaises(ValueError):
+            for item in stream:
+                items.append(item)
+        self.assertEqual(items, [1])
+
+    def test_sync_reader_stopping_early_closes_the_generator(self):
+        closed = threading.Event()
+        stream = DrainedStream(self.endless, (closed,))
+        threading.Thread(target=stream.drain).start()
+        for item in stream:
+            if item == 2:
+                break
+        self.assertTrue(closed.wait(2))
+
+    def test_async_reader_stopping_early_closes_the_generator(self):
+        closed = threading.Event()
+
+        async def read():
+            stream = DrainedStream(self.endless, (closed,), asyncio.get_running_loop())
+            threading.Thread(target=stream.drain).start()
+            items = []
+            async for item in stream:
+                items.append(item)
+                if item == 2:
+                    break
+            return items
+
+        self.assertEqual(asyncio.run(read()), [1, 2])
+        self.assertTrue(closed.wait(2))
+
+    def test_executor_stream_holds_a_worker_until_drained(self):
+        executor = InferenceExecutor(max_workers=1, max_queue=0)
+        closed = threading.Event()
+        stream = executor.stream(self.endless, closed)
+        with self.assertRaises(InferenceOverloaded):
+            executor.stream(self.endless, threading.Event())
+
+        for item in stream:
+            if item == 3:
+                break
+        self.assertTrue(closed.wait(2))
+        self.assertTrue(wait_until(lambda: executor.stats()['running'] == 0))
+        self.assertEqual(executor.submit(lambda: 'free').result(5), 'free')
@@ -0,0 +1,77 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.test import SimpleTestCase
+
+from roadmap.inference_scheduler import BatchScheduler
+
+
+class BatchSchedulerTests(SimpleTestCase):
+    def test_concurrent_requests_share_a_batch(self):
+        batches = []
+        scheduler = BatchScheduler(
+            lambda items: batches.append(list(items)) or [item * 2 for item in items],
+            max_batch_size=8,
+            max_wait_ms=200
+        )
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            results = list(pool.map(scheduler.run, range(4)))
+
+        self.assertEqual(results, [0, 2, 4, 6])
+        self.assertLess(len(batches), 4)
+        self.assertEqual(sorted(item for batch in batches for item in batch), [0, 1, 2, 3])
+
+    def test_batches_are_capped_at_max_batch_size(self):
+        release = threading.Event()
+        batches = []
+
+        def batch_fn(items):
+            release.wait(5)
+            batches.append(list(items))
+            return list(items)
+
+        scheduler = BatchScheduler(batch_fn, max_batch_size=2, max_wait_ms=50)
+        # The first batch blocks, so the rest queue up behind it
+        futures = [scheduler.submit(item) for item in range(5)]
+        release.set()
+
+        self.assertEqual([future.result(5) for future in futures], [0, 1, 2, 3, 4])
+        self.assertTrue(all(len(batch) <= 2 for batch in batches))
+        self.assertEqual(scheduler.pending(), 0)
+
+    def test_a_failing_batch_fails_each_caller(self):
+        def batch_fn(items):
+            raise ValueError("model exploded")
+
+        scheduler = BatchScheduler(batch_fn, max_wait_ms=0)
+        with self.assertRaisesMessage(ValueError, "model exploded"):
+            scheduler.run("python", timeout=5)
+        # The worker survives and keeps serving
+        scheduler.batch_fn = lambda items: list(items)
+        self.assertEqual(scheduler.run("rust", timeout=5), "rust")
+
+    def test_wrong_result_count_is_an_error(self):
+        scheduler = BatchScheduler(lambda items: [], max_wait_ms=0)
+        with self.assertRaises(RuntimeError):
+            scheduler.run("python", timeout=5)
+
+    def test_cancelled_requests_are_skipped(self):
+        started, release = threading.Event(), threading.Event()
+        seen = []
+
+        def batch_fn(items):
+            started.set()
+            release.wait(5)
+            seen.extend(items)
+            return list(items)
+
+        scheduler = BatchScheduler(batch_fn, max_batch_size=1, max_wait_ms=0)
+        first = scheduler.submit("first")
+        started.wait(5)
+        cancelled = scheduler.submit("cancelled")
+        self.assertTrue(cancelled.cancel())
+        last = scheduler.submit("last")
+        release.set()
+
+        self.assertEqual((first.result(5), last.result(5)), ("first", "last"))
+        self.assertEqual(seen, ["first", "last"])
@@ -0,0 +1,92 @@
+import json
+
+from django.test import SimpleTestCase
+
+from roadmap.json_tracker import NODE_LIMITS, RoadmapJsonTracker, limit_node_count
+
+
+def roadmap(main_topics, subtopics=2, points=2):
+    return {
+        "name": "Python",
+        "children": [
+            {
+                "name": f"Topic {main}",
+                "children": [
+                    {"name": f"Sub {main}.{sub}", "children": [{"name": f"Point {point}"} for point in range(points)]}
+                    for sub in range(subtopics)
+                ]
+            }
+            for main in range(main_topics)
+        ]
+    }
+
+
+def feed_in_chunks(tracker, text, size=7):
+    for start in range(0, len(text), size):
+        if tracker.feed(text[start:start + size]):
+            return start + size
+    return len(text)
+
+
+class LimitNodeCountTests(SimpleTestCase):
+    def test_trims_each_level(self):
+        trimmed = limit_node_count(roadmap(9, subtopics=7, points=5))
+        self.assertEqual(len(trimmed["children"]), 6)
+        self.assertTrue(all(len(main["children"]) == 4 for main in trimmed["children"]))
+        self.assertTrue(all(
+            len(sub["children"]) == 3 for main in trimmed["children"] for sub in main["children"]
+        ))
+
+    def test_leaves_small_roadmaps_and_non_objects_alone(self):
+        small = roadmap(2)
+        self.assertEqual(limit_node_count(json.loads(json.dumps(small))), small)
+        self.assertEqual(limit_node_count("not a roadmap"), "not a roadmap")
+
+
+class RoadmapJsonTrackerTests(SimpleTestCase):
+    def test_stops_when_the_object_closes(self):
+        text = json.dumps(roadmap(3))
+        tracker = RoadmapJsonTracker()
+        consumed = feed_in_chunks(tracker, 'Here is your roadmap:\n' + text + '\nHope this helps! {"extra": 1}')
+
+        self.assertTrue(tracker.done)
+        self.assertFalse(tracker.truncated)
+        self.assertEqual(json.loads(tracker.result_text()), roadmap(3))
+        self.assertLess(consumed, len(text) + 40)
+        self.assertEqual([topic["name"] for topic in tracker.completed_main_topics], ["Topic 0", "Topic 1", "Topic 2"])
+
+    def test_braces_inside_strings_are_ignored(self):
+        data = {"name": "C {braces} \\\"quoted\\\" [x]", "children": [{"name": "} ]", "children": []}]}
+        tracker = RoadmapJsonTracker()
+        tracker.feed(json.dumps(data))
+        self.assertTrue(tracker.done)
+        self.assertEqual(json.loads(tracker.result_text()), data)
+
+    def test_truncates_before_the_seventh_main_topic(self):
+        tracker = RoadmapJsonTracker()
+        feed_in_chunks(tracker, json.dumps(roadmap(9)))
+
+        self.assertTrue(tracker.done)
+        self.assertTrue(tracker.truncated)
+        parsed = json.loads(tracker.result_text())
+        self.assertEqual(len(parsed["children"]), NODE_LIMITS[0])
+        self.assertEqual(parsed["children"], roadmap(9)["children"][:NODE_LIMITS[0]])
+
+    def test_completed_main_topics_are_trimmed(self):
+        tracker = RoadmapJsonTracker()
+        tracker.feed(json.dumps(roadmap(1, subtopics=6, points=5)))
+        main_topic = tracker.completed_main_topics[0]
+        self.assertEqual(len(main_topic["children"]), NODE_LIMITS[1])
+        self.assertEqual(len(main_topic["children"][0]["children"]), NODE_LIMITS[2])
+
+    def test_mismatched_brackets_are_invalid(self):
+        tracker = RoadmapJsonTracker()
+        tracker.feed('{"name": "Python", "children": [}')
+        self.assertTrue(tracker.done)
+        self.assertTrue(tracker.invalid)
+
+    def test_incomplete_output_is_returned_as_is(self):
+        tracker = RoadmapJsonTracker()
+        tracker.feed('  {"name": "Python", "children": [')
+        self.assertFalse(tracker.done)
+        self.assertEqual(tracker.result_text(), '{"name": "Python", "children": [')
@@ -0,0 +1,62 @@
+from django.test import SimpleTestCase
+
+from roadmap.metrics import MetricsRegistry, _Metric
+
+
+class MetricsRegistryTests(SimpleTestCase):
+    def test_renders_prometheus_text(self):
+        registry = MetricsRegistry()
+        requests = registry.counter('app_requests', 'Requests served', ['path'])
+        latency = registry.histogram('app_latency_seconds', 'Request latency', ['stage'], buckets=(0.1, 1))
+        registry.register_collector(lambda: [
+            ('app_queue_depth', 'gauge', 'Queued requests', [({'queue': 'batch'}, 3)])
+        ])
+
+        requests.inc(path='/api/generate/')
+        requests.inc(2, path='/api/generate/')
+        requests.inc(path='say "hi"\\\n')
+        for value in (0.05, 0.5, 0.5, 5):
+            latency.observe(value, stage='generate')
+
+        lines = registry.render().splitlines()
+        self.assertEqual(lines[:4], [
+            '# HELP app_requests_total Requests served',
+            '# TYPE app_requests_total counter',
+            'app_requests_total{path="/api/generate/"} 3',
+            'app_requests_total{path="say \\"hi\\"\\\\\\n"} 1',
+        ])
+        self.assertEqual(lines[4:11], [
+            '# HELP app_latency_seconds Request latency',
+            '# TYPE app_latency_seconds histogram',
+            'app_latency_seconds_bucket{stage="generate",le="0.1"} 1',
+            'app_latency_seconds_bucket{stage="generate",le="1"} 3',
+            'app_latency_seconds_bucket{stage="generate",le="+Inf"} 4',
+            'app_latency_seconds_sum{stage="generate"} 6.05',
+            'app_latency_seconds_count{stage="generate"} 4',
+        ])
+        self.assertEqual(lines[11:], [
+            '# HELP app_queue_depth Queued requests',
+            '# TYPE app_queue_depth gauge',
+            'app_queue_depth{queue="batch"} 3',
+        ])
+
+    def test_failing_collector_is_skipped(self):
+        registry = MetricsRegistry()
+        registry.counter('app_errors', 'Errors').inc()
+
+        def broken():
+            raise RuntimeError("collector failed")
+
+        registry.register_collector(broken)
+        self.assertEqual(registry.render().splitlines()[-1], 'app_errors_total 1')
+
+    def test_histogram_times_a_block(self):
+        registry = MetricsRegistry()
+        latency = registry.histogram('app_stage_seconds', 'Stage time')
+        with latency.time():
+            pass
+        self.assertIn('app_stage_seconds_count 1', registry.render())
+
+    def test_base_metric_is_abstract(self):
+        with self.assertRaises(TypeError):
+            _Metric('app_metric', 'No samples')
@@ -0,0 +1,300 @@
+import json
+import os
+import threading
+import time
+from unittest import mock
+
+import torch
+from django.test import SimpleTestCase
+from transformers import AutoTokenizer, LlamaConfig, LlamaForCausalLM
+
+from roadmap.metrics import FALLBACKS
+from roadmap.ml_model import ADAPTER_PATH, GenerationRequest, RoadmapGenerator, RoadmapJsonStoppingCriteria
+from roadmap.model_registry import registry
+
+BACKUP_ROADMAP = {"success": True, "roadmap": {"name": "Zig", "children": []}}
+LOCAL_RESULT = {"success": True, "roadmap": {"name": "Zig", "children": []}, "format": "json", "source": "local_model"}
+
+
+def tiny_generator(**env):
+    """RoadmapGenerator around a randomly initialised two-layer Llama and the bundled tokenizer"""
+    settings = {
+        'ROADMAP_PREFIX_CACHE': '0',
+        'ROADMAP_CONSTRAINED_DECODING': '0',
+        'ROADMAP_SPECULATIVE': '0',
+        'ROADMAP_BATCH_MAX_SIZE': '1',
+        'ROADMAP_HEDGE_MODE': 'off',
+        'ROADMAP_BEST_OF': '1',
+        **env
+    }
+
+    def load_model(self):
+        torch.manual_seed(0)
+        self.tokenizer = AutoTokenizer.from_pretrained(ADAPTER_PATH)
+        self.tokenizer.pad_token = self.tokenizer.eos_token
+        self.tokenizer.padding_side = 'left'
+        config = LlamaConfig(
+            vocab_size=len(self.tokenizer),
+            hidden_size=16,
+            intermediate_size=32,
+            num_hidden_layers=2,
+            num_attention_heads=2,
+            max_position_embeddings=2048
+        )
+        self.model = LlamaForCausalLM(config).eval()
+
+    with mock.patch.dict(os.environ, settings), mock.patch.object(RoadmapGenerator, 'load_model', load_model):
+        return RoadmapGenerator()
+
+
+def bundled_tokenizer():
+    return AutoTokenizer.from_pretrained(ADAPTER_PATH)
+
+
+def fallback_count():
+    return sum(FALLBACKS._values.values())
+
+
+class FallbackMetricTests(SimpleTestCase):
+    def setUp(self):
+        self.backup = mock.Mock()
+        self.backup.generate_roadmap.return_value = BACKUP_ROADMAP
+        registry.set('backup_generator', self.backup)
+        self.addCleanup(registry.clear, 'backup_generator')
+
+    def test_local_failure_answered_by_the_backup_counts_once(self):
+        generator = tiny_generator()
+        generator.generate_local = mock.Mock(return_value=(None, "Failed to generate roadmap with local model"))
+        before = FALLBACKS._values.get(('invalid_json',), 0)
+
+        result = generator.generate_roadmap("Zig systems programming")
+        self.assertEqual(result["source"], "backup_model")
+        self.assertEqual(FALLBACKS._values.get(('invalid_json',), 0), before + 1)
+
+    def test_failed_backup_is_not_counted(self):
+        generator = tiny_generator()
+        generator.generate_local = mock.Mock(return_value=(None, "Failed to generate roadmap with local model"))
+        self.backup.generate_roadmap.return_value = {"success": False, "error": "down"}
+        before = fallback_count()
+
+        self.assertFalse(generator.generate_roadmap("Zig systems programming")["success"])
+        self.assertEqual(fallback_count(), before)
+
+    def test_hedged_request_won_by_the_local_model_is_not_counted(self):
+        generator = tiny_generator(ROADMAP_HEDGE_MODE='always', ROADMAP_HEDGE_DELAY_MS='0')
+        backup_called = threading.Event()
+
+        def local_after_backup_started(prompt, cancel_event=None, on_tokens=None):
+            backup_called.wait(2)
+            return LOCAL_RESULT, None
+
+        def slow_backup(prompt):
+            backup_called.set()
+            time.sleep(0.2)
+            return BACKUP_ROADMAP
+
+        generator.hedger.local_fn = local_after_backup_started
+        self.backup.generate_roadmap.side_effect = slow_backup
+        before = fallback_count()
+
+        self.assertEqual(generator.generate_roadmap("Zig systems programming")["source"], "local_model")
+        self.assertTrue(backup_called.is_set())
+        # Let the losing backup call finish
+        time.sleep(0.3)
+        self.assertEqual(fallback_count(), before)
+
+    def test_hedged_request_won_by_the_backup_counts_as_hedged(self):
+        generator = tiny_generator(ROADMAP_HEDGE_MODE='always', ROADMAP_HEDGE_DELAY_MS='0')
+
+        def slow_local(prompt, cancel_event=None, on_tokens=None):
+            cancel_event.wait(5)
+            return None, "Local generation cancelled"
+
+        generator.hedger.local_fn = slow_local
+        before = FALLBACKS._values.get(('hedged',), 0)
+
+        self.assertEqual(generator.generate_roadmap("Zig systems programming")["source"], "backup_model")
+        self.assertEqual(FALLBACKS._values.get(('hedged',), 0), before + 1)
+
+
+class RoadmapJsonStoppingCriteriaTests(SimpleTestCase):
+    ROADMAP = {"name": "C++ für Anfänger 🚀", "children": [{"name": "Pointers & Speicher", "children": []}]}
+
+    def setUp(self):
+        self.tokenizer = bundled_tokenizer()
+        self.prompt = self.tokenizer("Create a learning roadmap", return_tensors="pt")['input_ids'][0]
+
+    def run_steps(self, criteria, rows, steps=1):
+        """Call criteria as generate would, adding steps tokens per call; returns the step it stopped at"""
+        width = max(len(row) for row in rows)
+        for end in range(steps, width + steps, steps):
+            input_ids = torch.stack([
+                torch.cat([self.prompt, torch.tensor(row[:end] + [self.tokenizer.eos_token_id] * (end - len(row)))])
+                for row in rows
+            ])
+            if criteria(input_ids, None):
+                return end
+        return None
+
+    def test_tracks_the_decoded_text_token_by_token(self):
+        text = "Sure! " + json.dumps(self.ROADMAP, ensure_ascii=False) + " trailing text"
+        token_ids = self.tokenizer.encode(text, add_special_tokens=False)
+        criteria = RoadmapJsonStoppingCriteria(self.tokenizer, len(self.prompt), [GenerationRequest("p")])
+
+        stopped_at = self.run_steps(criteria, [token_ids])
+        self.assertIsNotNone(stopped_at)
+        self.assertLess(stopped_at, len(token_ids))
+        self.assertEqual(json.loads(criteria.result_text(0, None)), self.ROADMAP)
+
+    def test_several_tokens_per_step(self):
+        # Speculative decoding can commit several tokens in one step
+        token_ids = self.tokenizer.encode(json.dumps(self.ROADMAP, ensure_ascii=False), add_special_tokens=False)
+        criteria = RoadmapJsonStoppingCriteria(self.tokenizer, len(self.prompt), [GenerationRequest("p")])
+        self.assertIsNotNone(self.run_steps(criteria, [token_ids], steps=5))
+        self.assertEqual(json.loads(criteria.result_text(0, None)), self.ROADMAP)
+
+    def test_decodes_only_the_new_tokens_each_step(self):
+        roadmap = {"name": "Go", "children": [{"name": f"Topic {index}", "children": []} for index in range(6)]}
+        token_ids = self.tokenizer.encode(json.dumps(roadmap), add_special_tokens=False)
+        decoded_lengths = []
+        decode = self.tokenizer.decode
+
+        def counting_decode(ids, **kwargs):
+            decoded_lengths.append(len(ids))
+            return decode(ids, **kwargs)
+
+        self.tokenizer.decode = counting_decode
+        criteria = RoadmapJsonStoppingCriteria(self.tokenizer, len(self.prompt), [GenerationRequest("p")])
+        self.run_steps(criteria, [token_ids])
+
+        self.assertGreater(len(token_ids), 50)
+        self.assertLessEqual(max(decoded_lengths), 4)
+
+    def test_waits_for_every_row_unless_stopping_on_first(self):
+        rows = [
+            self.tokenizer.encode(json.dumps(self.ROADMAP), add_special_tokens=False),
+            self.tokenizer.encode('{"name": "Rust", "children": []}', add_special_tokens=False),
+        ]
+        self.assertNotEqual(len(rows[0]), len(rows[1]))
+
+        criteria = RoadmapJsonStoppingCriteria(self.tokenizer, len(self.prompt), [GenerationRequest("p")] * 2)
+        self.assertEqual(self.run_steps(criteria, rows), max(len(row) for row in rows))
+
+        first = RoadmapJsonStoppingCriteria(
+            self.tokenizer, len(self.prompt), [GenerationRequest("p")] * 2, stop_on_first=True
+        )
+        self.assertEqual(self.run_steps(first, rows), min(len(row) for row in rows))
+
+    def test_rows_that_ended_without_a_roadmap_do_not_hold_the_batch(self):
+        ended = self.tokenizer.encode("I cannot help with that", add_special_tokens=False)
+        ended.append(self.tokenizer.eos_token_id)
+        complete = self.tokenizer.encode(json.dumps(self.ROADMAP) + " and more text", add_special_tokens=False)
+
+        criteria = RoadmapJsonStoppingCriteria(self.tokenizer, len(self.prompt), [GenerationRequest("p")] * 2)
+        self.assertLess(self.run_steps(criteria, [ended, complete]), len(complete))
+        self.assertEqual(criteria.result_text(0, "fallback"), "fallback")
+
+
+class PrefixCacheTests(SimpleTestCase):
+    PROMPTS = ["Create a learning roadmap for the following topic\nRust", "Create a learning roadmap for the following topic\nMachine learning with PyTorch"]
+
+    def greedy(self, generator, prompts):
+        inputs = generator._tokenize(prompts)
+        with torch.no_grad():
+            outputs = generator.model.generate(
+                input_ids=inputs['input_ids'],
+                attention_mask=inputs['attention_mask'],
+                past_key_values=inputs.get('past_key_values'),
+                do_sample=False,
+                max_new_tokens=12,
+                pad_token_id=generator.tokenizer.pad_token_id
+            )
+        return outputs[:, inputs['input_ids'].shape[1]:].tolist(), inputs
+
+    def test_cached_prefix_gives_the_same_greedy_output_as_a_full_prefill(self):
+        generator = tiny_generator(ROADMAP_PREFIX_CACHE='1')
+        self.assertIsNotNone(generator.prefix_cache)
+        cached, inputs = self.greedy(generator, self.PROMPTS)
+        self.assertIn('past_key_values', inputs)
+
+        generator.prefix_cache = None
+        uncached, inputs = self.greedy(generator, self.PROMPTS)
+        self.assertNotIn('past_key_values', inputs)
+        self.assertEqual(cached, uncached)
+
+    def test_padding_sits_between_the_prefix_and_the_topic(self):
+        generator = tiny_generator(ROADMAP_PREFIX_CACHE='1')
+        inputs = generator._tokenize_with_prefix(self.PROMPTS)
+        prefix_length = len(generator.prefix_ids)
+        short_row, long_row = inputs['input_ids'].tolist()
+        self.assertEqual(short_row[:prefix_length], generator.prefix_ids)
+        self.assertEqual(long_row[:prefix_length], generator.prefix_ids)
+        mask = inputs['attention_mask'][0].tolist()
+        self.assertEqual(mask[:prefix_length], [1] * prefix_length)
+        self.assertEqual(mask[prefix_length], 0)
+        self.assertEqual(mask[-1], 1)
+
+    def test_prompts_without_the_prefix_fall_back_to_a_full_prefill(self):
+        generator = tiny_generator(ROADMAP_PREFIX_CACHE='1')
+        prompts = [self.PROMPTS[0], "Explain Rust ownership"]
+        self.assertIsNone(generator._tokenize_with_prefix(prompts))
+        # A prompt that is only the prefix has no topic to prefill
+        self.assertIsNone(generator._tokenize_with_prefix(["Create a learning roadmap for the following topic\n"]))
+
+        inputs = generator._tokenize(prompts)
+        self.assertNotIn('past_key_values', inputs)
+        self.assertEqual(inputs['input_ids'].shape[0], 2)
+
+
+class CandidateGenerationTests(SimpleTestCase):
+    PROMPT = "Create a learning roadmap for the following topic\nKubernetes operators"
+
+    def greedy_settings(self, generator):
+        return {"max_new_tokens": 10, "do_sample": False, "pad_token_id": generator.tokenizer.pad_token_id}
+
+    def reference(self, generator):
+        """Greedy completion from a full prefill of the prompt alone"""
+        inputs = generator.tokenizer(self.PROMPT, return_tensors="pt")
+        with torch.no_grad():
+            outputs = generator.model.generate(**inputs, **self.greedy_settings(generator))
+        return generator.tokenizer.decode(outputs[0, inputs['input_ids'].shape[1]:], skip_special_tokens=True).strip()
+
+    def check_shared_prefill(self, generator):
+        generator._generation_kwargs = lambda: self.greedy_settings(generator)
+        generate = mock.Mock(wraps=generator.model.generate)
+        generator.model.generate = generate
+
+        candidates = generator.generate_candidates(self.PROMPT, 3)
+        self.assertEqual(candidates, [self.reference(generator)] * 3)
+
+        # Every candidate decodes from one shared cache of the prompt minus its last token
+        kwargs = generate.call_args_list[0].kwargs
+        prompt_length = kwargs['input_ids'].shape[1]
+        self.assertEqual(kwargs['input_ids'].shape[0], 3)
+        keys = kwargs['past_key_values'][0][0]
+        self.assertEqual((keys.shape[0], keys.shape[2]), (3, prompt_length - 1))
+
+    def test_candidates_match_independent_generation(self):
+        self.check_shared_prefill(tiny_generator())
+
+    def test_candidates_match_independent_generation_with_the_prefix_cache(self):
+        generator = tiny_generator(ROADMAP_PREFIX_CACHE='1')
+        self.assertIsNotNone(generator.prefix_cache)
+        self.check_shared_prefill(generator)
+
+    def test_first_valid_candidate_is_used(self):
+        generator = tiny_generator(ROADMAP_BEST_OF='3')
+        generator.generate_candidates = mock.Mock(return_value=[
+            '{"name": "Go", "children": [',
+            '{"name": "Go"}',
+            '{"name": "Go", "children": []}',
+        ])
+        result, error = generator.generate_local("Go")
+        self.assertIsNone(error)
+        self.assertEqual(result["roadmap"], {"name": "Go", "children": []})
+        self.assertEqual(generator.generate_candidates.call_args.args[1], 3)
+
+    def test_all_candidates_invalid_reports_the_last_error(self):
+        generator = tiny_generator(ROADMAP_BEST_OF='2')
+        generator.generate_candidates = mock.Mock(return_value=['not json', '{"name": "Go"}'])
+        self.assertEqual(generator.generate_local("Go"), (None, "local model failed to generate valid roadmap"))
@@ -0,0 +1,77 @@
+import gc
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from roadmap.model_registry import ModelRegistry
+
+
+class ModelRegistryTests(SimpleTestCase):
+    def setUp(self):
+        self.registry = ModelRegistry()
+
+    def test_concurrent_gets_build_once(self):
+        builds = []
+        start = threading.Barrier(8)
+
+        def factory():
+            builds.append(threading.current_thread().name)
+            # Slow enough that every caller arrives while the first is still loading
+            time.sleep(0.05)
+            return object()
+
+        self.registry.register('model', factory)
+
+        def get(_):
+            start.wait(5)
+            return self.registry.get('model')
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            instances = list(pool.map(get, range(8)))
+
+        self.assertEqual(len(builds), 1)
+        self.assertTrue(all(instance is instances[0] for instance in instances))
+        self.assertTrue(self.registry.is_loaded('model'))
+
+    def test_set_overrides_the_factory(self):
+        factory = mock.Mock()
+        self.registry.register('model', factory)
+        stub = object()
+        self.registry.set('model', stub)
+
+        self.assertIs(self.registry.get('model'), stub)
+        factory.assert_not_called()
+
+    def test_clear_rebuilds_on_next_get(self):
+        self.registry.register('model', object)
+        first = self.registry.get('model')
+        self.registry.clear('model')
+        self.assertFalse(self.registry.is_loaded('model'))
+        self.assertIsNot(self.registry.get('model'), first)
+
+        self.registry.clear()
+        self.assertFalse(self.registry.is_loaded('model'))
+
+    def test_unknown_name_raises(self):
+        with self.assertRaises(KeyError):
+            self.registry.get('missing')
+
+    def test_failed_build_is_retried(self):
+        factory = mock.Mock(side_effect=[RuntimeError("out of memory"), 'model'])
+        self.registry.register('model', factory)
+        with self.assertRaises(RuntimeError):
+            self.registry.get('model')
+        self.assertEqual(self.registry.get('model'), 'model')
+
+    def test_preload_builds_the_named_instances(self):
+        self.registry.register('model', object)
+        self.registry.register('service', mock.Mock())
+        try:
+            self.registry.preload(['model'])
+        finally:
+            gc.unfreeze()
+        self.assertTrue(self.registry.is_loaded('model'))
+        self.assertFalse(self.registry.is_loaded('service'))
@@ -0,0 +1,71 @@
+import os
+import threading
+from unittest import mock
+
+from django.test import TestCase
+
+from roadmap.benchmark import FakeRoadmapGenerator
+from roadmap.inference_executor import InferenceExecutor
+from roadmap.model_registry import registry
+from roadmap.models import CachedRoadmap
+from roadmap.prewarm import Prewarmer
+from roadmap.result_cache import RoadmapResultCache
+from roadmap.roadmap_service import RoadmapService
+
+RESULT = {"success": True, "roadmap": {"name": "Python", "children": []}, "format": "json"}
+
+
+class PrewarmerTests(TestCase):
+    def setUp(self):
+        self.cache = RoadmapResultCache(ttl=3600, access_flush_interval=0)
+        self.generator = FakeRoadmapGenerator(tokens_per_second=1000, tokens=1)
+        with mock.patch.dict(os.environ, {'ROADMAP_SEMANTIC_CACHE': '0'}):
+            registry.set('roadmap_service', RoadmapService(cache=self.cache))
+        registry.set('roadmap_generator', self.generator)
+        self.addCleanup(registry.clear, 'roadmap_service')
+        self.addCleanup(registry.clear, 'roadmap_generator')
+        self.addCleanup(registry.clear, 'inference_executor')
+        self.prewarmer = Prewarmer(cpu_budget=1.0, prompt_limit=10)
+
+    def test_warming_does_not_count_hits(self):
+        self.cache.set("Python", RESULT)
+        self.prewarmer._warm_roadmap("python", refresh=False)
+        self.assertEqual(CachedRoadmap.objects.get().hit_count, 0)
+        self.assertEqual(self.cache.stats()["hits"], 0)
+
+    def test_refresh_regenerates_the_entry(self):
+        self.cache.set("Zig systems programming", RESULT)
+        self.prewarmer._warm_roadmap("zig systems programming", refresh=True)
+        row = CachedRoadmap.objects.get()
+        self.assertEqual(row.result["roadmap"]["name"], "zig systems programming")
+        self.assertEqual(row.hit_count, 0)
+
+    def test_live_traffic_includes_running_generations(self):
+        self.assertFalse(self.prewarmer._live_traffic())
+
+        executor = InferenceExecutor(max_workers=1, max_queue=1)
+        registry.set('inference_executor', executor)
+        release = threading.Event()
+        future = executor.submit(release.wait)
+        try:
+            self.assertTrue(self.prewarmer._live_traffic())
+        finally:
+            release.set()
+            future.result()
+
+        started, release = threading.Event(), threading.Event()
+
+        def slow_batch(prompts):
+            started.set()
+            release.wait()
+            return ["{}"] * len(prompts)
+
+        self.generator.scheduler.batch_fn = slow_batch
+        future = self.generator.scheduler.submit("python")
+        started.wait()
+        try:
+            self.assertEqual(self.generator.scheduler.pending(), 0)
+            self.assertTrue(self.prewarmer._live_traffic())
+        finally:
+            release.set()
+            future.result()
@@ -0,0 +1,71 @@
+import asyncio
+import time
+
+from django.test import SimpleTestCase
+
+from roadmap.resource_fetcher import ResourceFetcher, StaticSource
+
+
+class FailingSource(StaticSource):
+    async def fetch(self, client, topic):
+        raise ConnectionError("upstream refused the connection")
+
+    def fallback(self, topic):
+        return f"No description for {topic}"
+
+
+class ResourceFetcherTests(SimpleTestCase):
+    def fetch(self, fetcher, topic):
+        async def run():
+            try:
+                return await fetcher.fetch_all_resources(topic)
+            finally:
+                await fetcher.aclose()
+        return asyncio.run(run())
+
+    def test_sources_are_fetched_concurrently(self):
+        fetcher = ResourceFetcher(sources={
+            'topicInfo': StaticSource(lambda topic: f"About {topic}", latency=0.2),
+            'courses': StaticSource(['Intro course'], latency=0.2),
+        })
+        started = time.perf_counter()
+        resources = self.fetch(fetcher, 'Rust')
+        elapsed = time.perf_counter() - started
+
+        self.assertEqual(resources, {'topicInfo': 'About Rust', 'courses': ['Intro course']})
+        self.assertLess(elapsed, 0.35)
+
+    def test_slow_source_falls_back_without_failing_the_others(self):
+        fetcher = ResourceFetcher(sources={
+            'topicInfo': StaticSource('Too late', latency=1.0, timeout=0.05),
+            'courses': StaticSource(['Intro course']),
+        })
+        started = time.perf_counter()
+        resources = self.fetch(fetcher, 'Rust')
+
+        self.assertEqual(resources, {'topicInfo': None, 'courses': ['Intro course']})
+        self.assertLess(time.perf_counter() - started, 0.5)
+
+    def test_failing_source_returns_its_fallback(self):
+        fetcher = ResourceFetcher(sources={
+            'topicInfo': FailingSource(None),
+            'courses': StaticSource(['Intro course']),
+        })
+        self.assertEqual(self.fetch(fetcher, 'Rust'), {
+            'topicInfo': 'No description for Rust',
+            'courses': ['Intro course'],
+        })
+
+    def test_aclose_closes_the_pooled_client(self):
+        async def run():
+            fetcher = ResourceFetcher(sources={'courses': StaticSource([])})
+            await fetcher.fetch_all_resources('Rust')
+            client = fetcher.client
+            await fetcher.aclose()
+            # Closing twice is harmless, and the next fetch opens a new client
+            await fetcher.aclose()
+            return client, fetcher._client
+
+        client, current = asyncio.run(run())
+        self.assertTrue(client.is_closed)
+        self.assertIsNone(current)
@@ -0,0 +1,94 @@
+from django.test import TestCase
+from django.utils import timezone
+
+from roadmap.models import CachedRoadmap
+from roadmap.result_cache import RoadmapResultCache, normalize_prompt
+
+RESULT = {"success": True, "roadmap": {"name": "Python", "children": []}, "format": "json"}
+
+
+class RoadmapResultCacheTests(TestCase):
+    def setUp(self):
+        self.cache = RoadmapResultCache(ttl=3600, max_entries=100, lru_size=2, access_flush_interval=3600)
+
+    def test_normalized_prompts_share_an_entry(self):
+        self.cache.set("Learn Python!", RESULT)
+        self.assertEqual(self.cache.get("  learn   PYTHON "), RESULT)
+        self.assertEqual(normalize_prompt("C++ and C#"), "c++ and c#")
+
+    def test_failed_results_are_not_stored(self):
+        self.cache.set("Python", {"success": False, "error": "boom"})
+        self.assertIsNone(self.cache.get("Python"))
+        self.assertFalse(CachedRoadmap.objects.exists())
+
+    def test_returned_results_are_copies(self):
+        self.cache.set("Python", RESULT)
+        self.cache.get("Python")["roadmap"]["name"] = "changed"
+        self.assertEqual(self.cache.get("Python")["roadmap"]["name"], "Python")
+
+    def test_shared_entries_are_read_by_other_workers(self):
+        self.cache.set("Python", RESULT)
+        other = RoadmapResultCache(ttl=3600, access_flush_interval=3600)
+        self.assertEqual(other.get("Python"), RESULT)
+        self.assertEqual(other.stats()["lru_hits"], 0)
+        self.assertEqual(other.get("Python"), RESULT)
+        self.assertEqual(other.stats()["lru_hits"], 1)
+
+    def test_reads_do_not_write_until_flushed(self):
+        self.cache.set("Python", RESULT)
+        with self.assertNumQueries(0):
+            for _ in range(3):
+                self.cache.get("Python")
+        self.assertEqual(CachedRoadmap.objects.get().hit_count, 0)
+
+        self.cache.flush_access()
+        self.assertEqual(CachedRoadmap.objects.get().hit_count, 3)
+        self.cache.flush_access()
+        self.assertEqual(CachedRoadmap.objects.get().hit_count, 3)
+
+    def test_access_is_flushed_after_the_interval(self):
+        cache = RoadmapResultCache(ttl=3600, access_flush_interval=0)
+        cache.set("Python", RESULT)
+        cache.get("Python")
+        self.assertEqual(CachedRoadmap.objects.get().hit_count, 1)
+
+    def test_expired_entries_miss(self):
+        cache = RoadmapResultCache(ttl=0, access_flush_interval=3600)
+        cache.set("Python", RESULT)
+        self.assertIsNone(cache.get("Python"))
+        self.assertEqual(cache.stats()["misses"], 1)
+
+    def test_popular_ranks_by_hits_in_recent_windows(self):
+        cache = RoadmapResultCache(ttl=3600, access_flush_interval=3600, hit_window=3600)
+        for prompt in ("Python", "Rust", "Go"):
+            cache.set(prompt, RESULT)
+        for prompt, hits in (("Python", 1), ("Rust", 3)):
+            for _ in range(hits):
+                cache.get(prompt)
+        cache.flush_access()
+        # Lots of hits, but all of them long ago
+        CachedRoadmap.objects.filter(normalized_prompt="go").update(
+            hit_count=100, access_window=cache._window(timezone.now()) - 2, window_hits=100
+        )
+
+        self.assertEqual([row[0] for row in cache.popular(10)], ["rust", "python"])
+        self.assertEqual(len(cache.popular(1)), 1)
+
+    def test_hits_roll_into_the_previous_window(self):
+        cache = RoadmapResultCache(ttl=3600, access_flush_interval=3600, hit_window=3600)
+        cache.set("Python", RESULT)
+        current = cache._window(timezone.now())
+        CachedRoadmap.objects.update(access_window=current - 1, window_hits=5, previous_window_hits=7)
+        cache.get("Python")
+        cache.flush_access()
+
+        row = CachedRoadmap.objects.get()
+        self.assertEqual((row.access_window, row.window_hits, row.previous_window_hits), (current, 1, 5))
+
+    def test_reads_without_recording_access(self):
+        self.cache.set("Python", RESULT)
+        other = RoadmapResultCache(ttl=3600, access_flush_interval=0)
+        self.assertEqual(other.get("Python", record_access=False), RESULT)
+        self.assertIsNone(other.get("Rust", record_access=False))
+        self.assertEqual(other.stats()["hits"] + other.stats()["misses"], 0)
+        self.assertEqual(CachedRoadmap.objects.get().hit_count, 0)
@@ -0,0 +1,51 @@
+import os
+from unittest import mock
+
+from django.test import TestCase
+
+from roadmap.model_registry import registry
+from roadmap.result_cache import RoadmapResultCache
+from roadmap.roadmap_service import RoadmapService
+
+
+class RoadmapServiceTests(TestCase):
+    def setUp(self):
+        with mock.patch.dict(os.environ, {'ROADMAP_SEMANTIC_CACHE': '0'}):
+            self.service = RoadmapService(cache=RoadmapResultCache(access_flush_interval=3600))
+        self.generator = mock.Mock()
+        self.generator.generate_roadmap.return_value = {
+            "success": True, "roadmap": {"name": "Zig", "children": []}, "format": "json", "source": "local_model"
+        }
+        registry.set('roadmap_generator', self.generator)
+        self.addCleanup(registry.clear, 'roadmap_generator')
+
+    def test_non_tech_prompts_are_rejected_before_the_caches(self):
+        # A cached entry for a prompt the model would refuse must not be served
+        self.service.cache.set("cooking", {"success": True, "roadmap": {"name": "Cooking", "children": []}})
+        result = self.service.lookup("cooking")
+        self.assertFalse(result["success"])
+        self.assertIn("technology", result["error"])
+        self.assertFalse(self.service.generate("cooking", use_cache=False)["success"])
+        self.generator.generate_roadmap.assert_not_called()
+
+    def test_curated_roadmaps_are_served_without_the_model(self):
+        result = self.service.generate("I want to learn Python")
+        self.assertEqual(result["source"], "curated")
+        self.generator.generate_roadmap.assert_not_called()
+
+    def test_generated_results_are_cached(self):
+        prompt = "Zig systems programming"
+        self.assertIsNone(self.service.lookup(prompt))
+        self.service.generate(prompt, looked_up=True)
+        self.assertEqual(self.service.cache.stats()["misses"], 1)
+
+        cached = self.service.lookup(prompt)
+        self.assertTrue(cached["cached"])
+        self.assertEqual(cached["roadmap"]["name"], "Zig")
+        self.assertEqual(self.generator.generate_roadmap.call_count, 1)
+
+    def test_forced_refresh_regenerates(self):
+        prompt = "Zig systems programming"
+        self.service.generate(prompt)
+        self.service.generate(prompt, use_cache=False)
+        self.assertEqual(self.generator.generate_roadmap.call_count, 2)
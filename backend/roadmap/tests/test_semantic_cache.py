@@ -0,0 +1,98 @@
+import os
+import shutil
+import tempfile
+import time
+
+from django.test import SimpleTestCase
+
+from roadmap.semantic_cache import SemanticRoadmapCache, topic_text
+
+
+def result(name):
+    return {"success": True, "roadmap": {"name": name, "children": []}, "format": "json"}
+
+
+class TopicTextTests(SimpleTestCase):
+    def test_filler_words_are_dropped(self):
+        self.assertEqual(topic_text("I want to become a Python developer"), "python developer")
+        self.assertEqual(topic_text("Give me a roadmap for learning Rust"), "rust")
+        self.assertEqual(topic_text("learn ML"), "machine learning")
+
+    def test_learning_is_kept_inside_a_topic(self):
+        self.assertEqual(topic_text("machine learning engineer"), "machine learning engineer")
+        self.assertEqual(topic_text("Deep Learning"), "deep learning")
+        self.assertEqual(topic_text("scikit-learn"), "scikit learn")
+
+    def test_all_filler_prompt_keeps_its_words(self):
+        self.assertEqual(topic_text("roadmap"), "roadmap")
+
+
+class SemanticRoadmapCacheTests(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.path = os.path.join(directory, 'semantic_cache.npz')
+
+    def make_cache(self, **kwargs):
+        kwargs.setdefault('save_delay', 3600)
+        return SemanticRoadmapCache(path=self.path, **kwargs)
+
+    def test_rephrased_prompts_hit(self):
+        cache = self.make_cache()
+        cache.add("machine learning engineer", result("ML"))
+        hit = cache.get("I want to become a machine learning engineer")
+        self.assertEqual(hit["roadmap"]["name"], "ML")
+        self.assertGreaterEqual(hit["similarity"], cache.threshold)
+        self.assertIsNone(cache.get("machine engineer"))
+        self.assertIsNone(cache.get("frontend developer"))
+
+    def test_failed_results_are_not_indexed(self):
+        cache = self.make_cache()
+        cache.add("python", {"success": False})
+        self.assertEqual(cache.stats()["entries"], 0)
+
+    def test_equivalent_prompt_replaces_the_entry(self):
+        cache = self.make_cache()
+        cache.add("python", result("old"))
+        cache.add("Learn Python", result("new"))
+        self.assertEqual(cache.stats()["entries"], 1)
+        self.assertEqual(cache.get("python")["roadmap"]["name"], "new")
+
+    def test_oldest_entries_are_overwritten_when_full(self):
+        cache = self.make_cache(max_entries=20)
+        topics = [f"topic{index} programming language" for index in range(25)]
+        for topic in topics:
+            cache.add(topic, result(topic))
+        self.assertEqual(cache.stats()["entries"], 20)
+        self.assertEqual(len(cache._term_frequencies), 20)
+        self.assertIsNone(cache.get(topics[0]))
+        self.assertEqual(cache.get(topics[-1])["roadmap"]["name"], topics[-1])
+
+    def test_flush_persists_and_reloads(self):
+        cache = self.make_cache()
+        cache.add("rust programming", result("Rust"))
+        self.assertFalse(os.path.exists(self.path))
+        cache.flush()
+
+        reloaded = self.make_cache()
+        self.assertEqual(reloaded.get("rust programming")["roadmap"]["name"], "Rust")
+
+    def test_saving_merges_other_workers_entries(self):
+        first, second = self.make_cache(), self.make_cache()
+        first.add("rust programming", result("Rust"))
+        second.add("golang programming", result("Go"))
+        first.flush()
+        second.flush()
+
+        self.assertEqual(second.get("rust programming")["roadmap"]["name"], "Rust")
+        reloaded = self.make_cache()
+        self.assertEqual(reloaded.stats()["entries"], 2)
+        self.assertEqual(reloaded.get("golang programming")["roadmap"]["name"], "Go")
+
+    def test_changes_are_saved_in_the_background(self):
+        cache = self.make_cache(save_delay=0)
+        cache.add("rust programming", result("Rust"))
+        deadline = time.monotonic() + 5
+        while not os.path.exists(self.path) and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertTrue(os.path.exists(self.path))
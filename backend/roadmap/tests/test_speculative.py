@@ -0,0 +1,114 @@
+from collections import Counter
+from types import SimpleNamespace
+
+import torch
+from django.test import SimpleTestCase
+
+from roadmap.speculative import NgramDraftIndex, SpeculativeDecoder
+
+# Next-token probabilities of a four-token Markov chain, indexed by the previous token
+TRANSITIONS = torch.tensor([
+    [0.10, 0.60, 0.20, 0.10],
+    [0.30, 0.10, 0.50, 0.10],
+    [0.25, 0.25, 0.25, 0.25],
+    [0.70, 0.10, 0.10, 0.10],
+])
+EOS = 99
+
+
+class MarkovModel:
+    """Causal LM stand-in whose next-token distribution depends only on the previous token"""
+
+    def __init__(self, transitions):
+        self.log_transitions = transitions.log()
+        self.calls = 0
+
+    def __call__(self, input_ids, past_key_values=None, use_cache=True):
+        self.calls += 1
+        tokens = input_ids[0]
+        # A legacy-format cache whose length tracks the tokens seen so far
+        states = tokens.float().view(1, 1, -1, 1)
+        if past_key_values is not None:
+            states = torch.cat([past_key_values[0][0], states], dim=2)
+        return SimpleNamespace(
+            logits=self.log_transitions[tokens].unsqueeze(0),
+            past_key_values=((states, states),)
+        )
+
+
+def decoder(transitions=TRANSITIONS, sequences=((0, 1, 2, 3, 0, 1, 2, 3),)):
+    # Temperature 1 and no top-k/top-p cut-off leave the model's own distribution
+    return SpeculativeDecoder(
+        MarkovModel(transitions), NgramDraftIndex(sequences, min_ngram=1), EOS,
+        temperature=1.0, top_k=len(transitions), top_p=1.0
+    )
+
+
+class SpeculativeDecoderTests(SimpleTestCase):
+    def test_samples_follow_the_model_distribution(self):
+        torch.manual_seed(1234)
+        speculative = decoder()
+        samples = 4000
+        pairs = Counter()
+        for _ in range(samples):
+            output = speculative.generate(torch.tensor([[0, 1]]), max_length=4)[0].tolist()
+            self.assertEqual(len(output), 4)
+            pairs[tuple(output[2:])] += 1
+
+        for first in range(4):
+            for second in range(4):
+                expected = (TRANSITIONS[1, first] * TRANSITIONS[first, second]).item()
+                observed = pairs[(first, second)] / samples
+                self.assertAlmostEqual(observed, expected, delta=0.03, msg=f"pair {(first, second)}")
+
+        stats = speculative.stats()
+        self.assertGreater(stats["drafted"], 0)
+        self.assertGreater(stats["accepted"], 0)
+        self.assertLess(stats["accepted"], stats["drafted"])
+
+    def test_matching_drafts_take_fewer_forward_passes(self):
+        torch.manual_seed(0)
+        # A deterministic cycle the corpus drafts exactly
+        cycle = torch.full((4, 4), 1e-9)
+        for token in range(4):
+            cycle[token, (token + 1) % 4] = 1.0
+        speculative = decoder(transitions=cycle)
+        output = speculative.generate(torch.tensor([[0, 1]]), max_length=18)[0].tolist()
+
+        self.assertEqual(output, [(token % 4) for token in range(18)])
+        stats = speculative.stats()
+        self.assertEqual(stats["acceptance_rate"], 1.0)
+        self.assertGreater(stats["tokens_per_forward"], 2)
+
+    def test_logits_processor_is_applied_to_drafts(self):
+        torch.manual_seed(7)
+        speculative = decoder()
+
+        def ban_token_two(input_ids, scores):
+            scores = scores.clone()
+            scores[:, 2] = -float('inf')
+            return scores
+
+        for _ in range(50):
+            output = speculative.generate(torch.tensor([[0, 1]]), logits_processor=ban_token_two, max_length=8)
+            self.assertNotIn(2, output[0].tolist()[2:])
+
+    def test_stops_at_eos(self):
+        transitions = torch.full((EOS + 1, EOS + 1), 1e-9)
+        transitions[:, EOS] = 1.0
+        speculative = decoder(transitions=transitions)
+        output = speculative.generate(torch.tensor([[0, 1]]), max_length=10)[0].tolist()
+        self.assertEqual(output, [0, 1, EOS])
+
+
+class NgramDraftIndexTests(SimpleTestCase):
+    def test_corpus_continuation_of_the_latest_ngram(self):
+        index = NgramDraftIndex([[5, 6, 7, 8, 9]], max_draft_tokens=2)
+        self.assertEqual(index.continuation((6, 7)), [8, 9])
+        self.assertEqual(index.session([1, 5, 6]).propose(), [7, 8])
+        self.assertEqual(index.session([1, 2]).propose(), [])
+
+    def test_running_sequence_is_preferred_over_the_corpus(self):
+        index = NgramDraftIndex([[1, 2, 3, 4]], max_draft_tokens=3)
+        session = index.session([1, 2, 9, 9, 1, 2])
+        self.assertEqual(session.propose(), [9, 9, 1])
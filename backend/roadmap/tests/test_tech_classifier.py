@@ -0,0 +1,75 @@
+import json
+import os
+
+from django.test import SimpleTestCase
+
+from roadmap.curated_index import CURATED_DATASETS, DATA_DIR
+from roadmap.tech_classifier import CURATED_TOPIC_FIELDS, TECH_FIELDS, TechTopicClassifier, tech_classifier
+
+
+class TechTopicClassifierTests(SimpleTestCase):
+    def test_accepts_tech_topics(self):
+        for prompt in (
+            "I want to learn Python",
+            "Machine Learning",
+            "roadmap for node.js",
+            "C++ for beginners",
+            "c# and .NET",
+            "become a data analyst",
+            "CI/CD pipelines",
+            "Ethical-Hacking",
+            "learn web   development",
+        ):
+            with self.subTest(prompt=prompt):
+                self.assertTrue(tech_classifier.is_tech_related(prompt))
+
+    def test_every_keyword_matches_as_a_whole_word(self):
+        for keyword in TECH_FIELDS:
+            with self.subTest(keyword=keyword):
+                self.assertTrue(tech_classifier.is_tech_related(f"learn {keyword} today"))
+
+    def test_plurals_match(self):
+        self.assertEqual(tech_classifier.match("Neural Networks and APIs"), "neural networks")
+        self.assertTrue(tech_classifier.is_tech_related("databases"))
+
+    def test_rejects_other_topics(self):
+        for prompt in ("cooking", "learn guitar", "painting lessons", "marketing manager", "yoga", "gold trading", ""):
+            with self.subTest(prompt=prompt):
+                self.assertFalse(tech_classifier.is_tech_related(prompt))
+                self.assertIsNone(tech_classifier.match(prompt))
+
+    def test_keywords_inside_other_words_do_not_match(self):
+        # "ai" in "painting", "go" in "google", "bi" in "biology", "ios" in "studios"
+        for prompt in ("painting", "google sheets", "biology", "art studios", "javanese cooking"):
+            with self.subTest(prompt=prompt):
+                self.assertFalse(tech_classifier.is_tech_related(prompt))
+
+    def test_custom_keywords(self):
+        classifier = TechTopicClassifier({"zig", "embedded rust"})
+        self.assertTrue(classifier.is_tech_related("Embedded-Rust firmware"))
+        self.assertFalse(classifier.is_tech_related("rust removal"))
+
+
+class CuratedTopicFieldsTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.topics = []
+        for file_name, topic_field, _ in CURATED_DATASETS:
+            with open(os.path.join(DATA_DIR, file_name), encoding='utf-8') as f:
+                cls.topics.extend(entry[topic_field] for entry in json.load(f) if entry.get(topic_field))
+
+    def test_every_curated_topic_passes_the_gate(self):
+        rejected = [topic for topic in self.topics if not tech_classifier.is_tech_related(topic)]
+        self.assertEqual(rejected, [])
+
+    def test_every_addition_covers_a_curated_topic(self):
+        for keyword in CURATED_TOPIC_FIELDS - TECH_FIELDS:
+            with self.subTest(keyword=keyword):
+                classifier = TechTopicClassifier({keyword})
+                self.assertTrue(any(classifier.is_tech_related(topic) for topic in self.topics))
+
+    def test_broad_words_stay_out(self):
+        for prompt in ("real estate developer", "cloud watching", "coding for kids at home", "quality control"):
+            with self.subTest(prompt=prompt):
+                self.assertFalse(tech_classifier.is_tech_related(prompt))
@@ -0,0 +1,81 @@
+import json
+import os
+import shutil
+import tempfile
+import time
+
+from django.test import SimpleTestCase
+
+from roadmap.topic_catalog import TopicCatalog, TrigramIndex, normalize_topic
+
+
+class TrigramIndexTests(SimpleTestCase):
+    def setUp(self):
+        self.index = TrigramIndex(["javascript", "git", "python", "react", "api", "api testing", "c++"])
+
+    def match(self, query):
+        return self.index.best_match(normalize_topic(query))[0]
+
+    def test_exact_and_contained_keys_match(self):
+        self.assertEqual(self.match("JavaScript"), "javascript")
+        self.assertEqual(self.match("Python 3"), "python")
+        self.assertEqual(self.match("Learn Git basics"), "git")
+        self.assertEqual(self.match("C++"), "c++")
+
+    def test_most_specific_contained_key_wins(self):
+        self.assertEqual(self.match("API testing tools"), "api testing")
+
+    def test_close_spellings_match(self):
+        self.assertEqual(self.match("ReactJS"), "react")
+
+    def test_short_keys_do_not_match_longer_words(self):
+        self.assertIsNone(self.match("Java"))
+        self.assertIsNone(self.match("GitHub"))
+        self.assertIsNone(self.match("C"))
+
+    def test_unrelated_topics_do_not_match(self):
+        self.assertIsNone(self.match("Cooking"))
+        self.assertEqual(self.index.best_match("cooking"), (None, 0.0))
+
+
+class TopicCatalogTests(SimpleTestCase):
+    def setUp(self):
+        self.catalog_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.catalog_dir)
+        self.write('topic_descriptions.json', {"JavaScript": "The language of the web.", "Git": "Version control."})
+        self.write('courses.json', {"JavaScript": [{"title": "JS 101"}]})
+
+    def write(self, file_name, entries):
+        path = os.path.join(self.catalog_dir, file_name)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(entries, f)
+        # Make sure the modification time changes even on coarse filesystem clocks
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+    def test_lookups(self):
+        catalog = TopicCatalog(self.catalog_dir, reload_interval=0)
+        self.assertEqual(catalog.description("javascript basics"), "The language of the web.")
+        self.assertEqual(catalog.courses("JavaScript"), [{"title": "JS 101"}])
+        self.assertIsNone(catalog.description("Java"))
+        self.assertIsNone(catalog.description("GitHub"))
+        self.assertIsNone(catalog.courses("Git"))
+        self.assertEqual(sorted(catalog.description_topics()), ["git", "javascript"])
+
+    def test_changed_files_are_reloaded_in_the_background(self):
+        catalog = TopicCatalog(self.catalog_dir, reload_interval=0.05)
+        self.assertIsNone(catalog.description("Rust"))
+        self.write('topic_descriptions.json', {"Rust": "A systems language."})
+
+        deadline = time.monotonic() + 5
+        while catalog.description("Rust") is None and time.monotonic() < deadline:
+            time.sleep(0.05)
+        self.assertEqual(catalog.description("Rust"), "A systems language.")
+        self.assertIsNone(catalog.description("JavaScript"))
+
+    def test_invalid_file_keeps_the_old_entries(self):
+        catalog = TopicCatalog(self.catalog_dir, reload_interval=0)
+        with open(os.path.join(self.catalog_dir, 'courses.json'), 'w') as f:
+            f.write('{not json')
+        catalog.reload()
+        self.assertEqual(catalog.courses("JavaScript"), [{"title": "JS 101"}])
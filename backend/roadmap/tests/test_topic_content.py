@@ -0,0 +1,88 @@
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from roadmap.topic_content import CONTENT_PROMPT, TopicContentGenerator, fallback_topic_content, parse_topic_content
+
+GENERATED = """Introduction:
+Rust is a systems programming language focused on safety.
+It has no garbage collector.
+
+Why Learn:
+- Memory safety without a runtime
+- Fearless concurrency
+
+Q&A:
+1. What is Rust?
+A language from Mozilla.
+2) How can I start learning Rust?
+Read the Rust book.
+3. What are the prerequisites for learning Rust?
+[Answer]
+"""
+
+
+class ParseTopicContentTests(SimpleTestCase):
+    def test_sections_are_split(self):
+        content = parse_topic_content("Rust", GENERATED)
+        self.assertEqual(
+            content["introduction"],
+            "Rust is a systems programming language focused on safety.\nIt has no garbage collector."
+        )
+        self.assertEqual(content["whyLearn"], "- Memory safety without a runtime\n- Fearless concurrency")
+        self.assertEqual(content["qa"], [
+            {"question": "What is Rust?", "answer": "A language from Mozilla."},
+            {"question": "How can I start learning Rust?", "answer": "Read the Rust book."},
+        ])
+
+    def test_first_occurrence_wins_over_an_echoed_template(self):
+        content = parse_topic_content("Rust", GENERATED + "\n" + CONTENT_PROMPT.format(topic="Rust"))
+        self.assertTrue(content["introduction"].startswith("Rust is a systems programming language"))
+        self.assertEqual(len(content["qa"]), 2)
+
+    def test_unfilled_placeholders_fall_back(self):
+        content = parse_topic_content("Rust", CONTENT_PROMPT.format(topic="Rust"))
+        self.assertEqual(content, fallback_topic_content("Rust"))
+
+    def test_missing_sections_fall_back(self):
+        content = parse_topic_content("Rust", "Introduction: Rust is fast.\n")
+        fallback = fallback_topic_content("Rust")
+        self.assertEqual(content["introduction"], "Rust is fast.")
+        self.assertEqual(content["whyLearn"], fallback["whyLearn"])
+        self.assertEqual(content["qa"], fallback["qa"])
+
+    def test_headers_are_matched_loosely(self):
+        content = parse_topic_content("Rust", "INTRODUCTION :\nRust is fast.\nq & a:\n1. Why?\nBecause.")
+        self.assertEqual(content["introduction"], "Rust is fast.")
+        self.assertEqual(content["qa"], [{"question": "Why?", "answer": "Because."}])
+
+    def test_empty_output_falls_back(self):
+        self.assertEqual(parse_topic_content("Rust", None), fallback_topic_content("Rust"))
+
+
+class TopicContentGeneratorTests(SimpleTestCase):
+    def setUp(self):
+        self.model = mock.Mock()
+        self.model.generate_free_texts.side_effect = lambda prompts, max_new_tokens: [
+            GENERATED.replace("Rust", prompt.split(" for ", 1)[1].split(" in the following")[0]) for prompt in prompts
+        ]
+        self.generator = TopicContentGenerator(self.model, batch_size=2, max_new_tokens=64)
+
+    def test_generate_many_dedupes_and_chunks(self):
+        contents = self.generator.generate_many(["Go", "Rust", "Go", "", "Zig"])
+
+        self.assertEqual(list(contents), ["Go", "Rust", "Zig"])
+        self.assertTrue(contents["Zig"]["introduction"].startswith("Zig is a systems"))
+        batches = [len(call.args[0]) for call in self.model.generate_free_texts.call_args_list]
+        self.assertEqual(batches, [2, 1])
+        self.assertEqual(self.model.generate_free_texts.call_args.kwargs, {"max_new_tokens": 64})
+
+    def test_failed_batch_maps_to_none(self):
+        self.model.generate_free_texts.side_effect = [RuntimeError("out of memory"), ["Introduction: Zig."]]
+        contents = self.generator.generate_many(["Go", "Rust", "Zig"])
+        self.assertEqual(contents["Go"], None)
+        self.assertEqual(contents["Rust"], None)
+        self.assertEqual(contents["Zig"]["introduction"], "Zig.")
+
+    def test_generate_one_topic(self):
+        self.assertEqual(self.generator.generate("Go")["qa"][0]["question"], "What is Go?")
@@ -0,0 +1,27 @@
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from roadmap import views
+from roadmap.model_registry import registry
+
+
+class WorkerConnectionTests(SimpleTestCase):
+    def setUp(self):
+        self.service = mock.Mock()
+        registry.set('roadmap_service', self.service)
+        self.addCleanup(registry.clear, 'roadmap_service')
+        patcher = mock.patch('roadmap.views.close_old_connections')
+        self.close_old_connections = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_lookups_close_the_worker_connection(self):
+        self.service.lookup.return_value = None
+        self.assertIsNone(views.lookup_roadmap("learn zig"))
+        self.close_old_connections.assert_called_once_with()
+
+    def test_connection_is_closed_when_the_service_raises(self):
+        self.service.generate.side_effect = RuntimeError("database is locked")
+        with self.assertRaises(RuntimeError):
+            views.generate_roadmap("learn zig", True)
+        self.close_old_connections.assert_called_once_with()
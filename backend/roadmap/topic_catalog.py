@@ -0,0 +1,181 @@
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import Counter
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CATALOG_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+DESCRIPTIONS_FILE = 'topic_descriptions.json'
+COURSES_FILE = 'courses.json'
+
+
+def normalize_topic(topic):
+    """Lowercase words and digits only; + and # are kept so c++ and c# stay distinct"""
+    return ' '.join(re.sub(r'[^\w+#]+', ' ', topic.lower()).split())
+
+
+def trigrams(text):
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class TrigramIndex:
+    """Fuzzy lookup of normalized keys through an inverted index of character trigrams.
+
+    Candidates are only the keys sharing a trigram with the query, so a lookup
+    costs about the number of near matches rather than the catalog size. A key
+    contained in the query as whole words (or the other way round) scores at
+    least ``containment_score``; otherwise the Dice coefficient of the trigram
+    sets is used. Keys or queries shorter than ``min_fuzzy_length`` have too
+    few trigrams for Dice to mean much ("java" shares most of its trigrams
+    with "javascript"), so they only match exactly or by containment.
+    """
+
+    def __init__(self, keys, containment_score=0.8, min_fuzzy_length=5):
+        self.containment_score = containment_score
+        self.min_fuzzy_length = min_fuzzy_length
+        self.keys = list(keys)
+        self._trigrams = [trigrams(key) for key in self.keys]
+        self._postings = {}
+        for key_id, key_trigrams in enumerate(self._trigrams):
+            for trigram in key_trigrams:
+                self._postings.setdefault(trigram, []).append(key_id)
+        self._exact = {key: key_id for key_id, key in enumerate(self.keys)}
+
+    def __len__(self):
+        return len(self.keys)
+
+    def _score(self, query, query_trigrams, key_id, shared):
+        key = self.keys[key_id]
+        dice = 2.0 * shared / (len(query_trigrams) + len(self._trigrams[key_id]))
+        if f" {key} " in f" {query} " or f" {query} " in f" {key} ":
+            # Prefer the most specific contained key: "api testing" over "api"
+            overlap = min(len(key), len(query)) / max(len(key), len(query))
+            return max(dice, self.containment_score + (1 - self.containment_score) * overlap * 0.99)
+        if min(len(key), len(query)) < self.min_fuzzy_length:
+            return 0.0
+        return dice
+
+    def best_match(self, query, threshold=0.7):
+        """Return (key, score) of the closest key scoring at least threshold, or (None, 0.0)"""
+        if query in self._exact:
+            return query, 1.0
+        query_trigrams = trigrams(query)
+        shared = Counter()
+        for trigram in query_trigrams:
+            shared.update(self._postings.get(trigram, ()))
+
+        best_key, best_score = None, 0.0
+        for key_id, count in shared.items():
+            score = self._score(query, query_trigrams, key_id, count)
+            if score > best_score:
+                best_key, best_score = self.keys[key_id], score
+        if best_score < threshold:
+            return None, 0.0
+        return best_key, best_score
+
+
+class TopicCatalog:
+    """Topic descriptions and courses loaded from JSON files, with fuzzy lookups.
+
+    The files map topic names to a description and to a list of courses.
+    Changed files are picked up without a restart: a background thread checks
+    the files' modification times every ``reload_interval`` seconds (0
+    disables it) and swaps in freshly built indexes, so lookups never touch
+    the filesystem.
+    """
+
+    def __init__(self, catalog_dir=None, threshold=None, reload_interval=None):
+        self.catalog_dir = catalog_dir or os.getenv('ROADMAP_CATALOG_DIR', DEFAULT_CATALOG_DIR)
+        self.threshold = threshold if threshold is not None else float(os.getenv('ROADMAP_CATALOG_THRESHOLD', '0.7'))
+        self.reload_interval = reload_interval if reload_interval is not None else float(os.getenv('ROADMAP_CATALOG_RELOAD_INTERVAL', '30'))
+        self._lock = threading.Lock()
+        self._watcher = None
+        self._pid = None
+        self._mtimes = None
+        self._descriptions = {}
+        self._courses = {}
+        self._description_index = TrigramIndex([])
+        self._course_index = TrigramIndex([])
+        self.reload()
+
+    def _path(self, file_name):
+        return os.path.join(self.catalog_dir, file_name)
+
+    def _file_mtimes(self):
+        mtimes = []
+        for file_name in (DESCRIPTIONS_FILE, COURSES_FILE):
+            try:
+                mtimes.append(os.stat(self._path(file_name)).st_mtime_ns)
+            except OSError:
+                mtimes.append(None)
+        return tuple(mtimes)
+
+    def _load(self, file_name):
+        try:
+            with open(self._path(file_name), encoding='utf-8') as f:
+                entries = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Could not load topic catalog file {file_name}: {str(e)}")
+            return None
+        # Later spellings of the same normalized topic win
+        return {normalize_topic(topic): value for topic, value in entries.items() if normalize_topic(topic)}
+
+    def reload(self):
+        """Rebuild the indexes from the data files; a file that fails to load keeps its old entries"""
+        mtimes = self._file_mtimes()
+        descriptions = self._load(DESCRIPTIONS_FILE)
+        courses = self._load(COURSES_FILE)
+
+        with self._lock:
+            if descriptions is not None:
+                self._descriptions = descriptions
+                self._description_index = TrigramIndex(descriptions)
+            if courses is not None:
+                self._courses = courses
+                self._course_index = TrigramIndex(courses)
+            self._mtimes = mtimes
+        logger.info(f"Topic catalog loaded: {len(self._descriptions)} descriptions, {len(self._courses)} course topics")
+
+    def _watch(self):
+        while True:
+            time.sleep(self.reload_interval)
+            try:
+                if self._file_mtimes() != self._mtimes:
+                    self.reload()
+            except Exception as e:
+                logger.warning(f"Topic catalog reload failed: {str(e)}")
+
+    def _ensure_watcher(self):
+        """Start the reload thread, restarting it after a fork"""
+        if self.reload_interval <= 0 or (self._watcher is not None and self._pid == os.getpid()):
+            return
+        with self._lock:
+            if self._watcher is not None and self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._watcher = threading.Thread(target=self._watch, name='topic-catalog-reload', daemon=True)
+            self._watcher.start()
+
+    def description_topics(self):
+        """Normalized topics that have a curated description"""
+        self._ensure_watcher()
+        return list(self._descriptions)
+
+    def description(self, topic):
+        """Curated description of the closest catalog topic, or None"""
+        self._ensure_watcher()
+        descriptions, index = self._descriptions, self._description_index
+        key, _ = index.best_match(normalize_topic(topic), self.threshold)
+        return descriptions[key] if key is not None else None
+
+    def courses(self, topic):
+        """Courses for the closest catalog topic, or None"""
+        self._ensure_watcher()
+        courses, index = self._courses, self._course_index
+        key, _ = index.best_match(normalize_topic(topic), self.threshold)
+        return list(courses[key]) if key is not None else None
@@ -0,0 +1,150 @@
+import logging
+import os
+import re
+import traceback
+
+from .inference_scheduler import BatchScheduler
+
+logger = logging.getLogger(__name__)
+
+CONTENT_PROMPT = """Create a comprehensive explanation for {topic} in the following format:
+
+Introduction:
+[Write 2-3 sentences introducing {topic}]
+
+Why Learn:
+[Explain in 2-3 points why someone should learn {topic}]
+
+Q&A:
+1. What is {topic}?
+[Answer]
+2. How can I start learning {topic}?
+[Answer]
+3. What are the prerequisites for learning {topic}?
+[Answer]"""
+
+SECTION_HEADER = re.compile(r'^\s*(introduction|why learn|q\s*&\s*a)\s*:\s*', re.IGNORECASE | re.MULTILINE)
+QUESTION_LINE = re.compile(r'^\s*\d+\s*[.)]\s*(.+?)\s*$')
+PLACEHOLDER = re.compile(r'^\[[^\]]*\]$')
+# The first line of CONTENT_PROMPT, which ends a section when the model echoes the template
+ECHOED_PROMPT = re.compile(r'^\s*create a comprehensive explanation for\b', re.IGNORECASE | re.MULTILINE)
+
+
+def fallback_topic_content(topic):
+    """Generic content used for any section the model did not produce"""
+    return {
+        "introduction": f"{topic} is a fundamental concept in modern development that plays a crucial role in building robust applications.",
+        "whyLearn": f"Learning {topic} is essential for understanding modern development practices and advancing your career in technology.",
+        "qa": [
+            {
+                "question": f"What is {topic}?",
+                "answer": f"{topic} is a fundamental concept in development."
+            },
+            {
+                "question": f"How can I start learning {topic}?",
+                "answer": "Start with basic tutorials and gradually move to more complex projects."
+            },
+            {
+                "question": f"What are the prerequisites for learning {topic}?",
+                "answer": "Basic programming knowledge and understanding of development concepts."
+            }
+        ]
+    }
+
+
+def _clean_text(lines):
+    """Join section lines, dropping unfilled template placeholders"""
+    kept = [line.strip() for line in lines if line.strip() and not PLACEHOLDER.match(line.strip())]
+    return '\n'.join(kept)
+
+
+def _parse_qa(text):
+    pairs = []
+    question = None
+    answer_lines = []
+    for line in text.splitlines():
+        match = QUESTION_LINE.match(line)
+        if match:
+            if question:
+                pairs.append({"question": question, "answer": _clean_text(answer_lines)})
+            question = match.group(1)
+            answer_lines = []
+        elif question:
+            answer_lines.append(line)
+    if question:
+        pairs.append({"question": question, "answer": _clean_text(answer_lines)})
+    return [pair for pair in pairs if pair["answer"]]
+
+
+def parse_topic_content(topic, text):
+    """Split generated text into introduction, why-learn and Q&A sections"""
+    sections = {}
+    text = text or ''
+    headers = list(SECTION_HEADER.finditer(text))
+    boundaries = sorted([header.start() for header in headers] + [echo.start() for echo in ECHOED_PROMPT.finditer(text)])
+    for header in headers:
+        end = next((boundary for boundary in boundaries if boundary > header.start()), len(text))
+        name = re.sub(r'\s+', ' ', header.group(1).lower())
+        # Keep the first occurrence; models sometimes echo the template afterwards
+        sections.setdefault(name.replace(' & ', '&'), text[header.end():end])
+
+    fallback = fallback_topic_content(topic)
+    content = {
+        "introduction": _clean_text(sections.get('introduction', '').splitlines()),
+        "whyLearn": _clean_text(sections.get('why learn', '').splitlines()),
+        "qa": _parse_qa(sections.get('q&a', ''))
+    }
+    for key, value in content.items():
+        if not value:
+            content[key] = fallback[key]
+    return content
+
+
+class TopicContentGenerator:
+    """Introduction / Why Learn / Q&A content for roadmap topics, generated in batches.
+
+    Uses the roadmap model for plain-text sampling, without the roadmap prompt,
+    tech gate, JSON schema or backup fallback. Single requests from concurrent
+    callers share batches through a scheduler; ``generate_many`` produces the
+    content for a whole list of topics (e.g. every node of a roadmap) in
+    ``batch_size`` chunks.
+    """
+
+    def __init__(self, generator, batch_size=None, max_new_tokens=None):
+        self.generator = generator
+        self.batch_size = batch_size or int(os.getenv('ROADMAP_CONTENT_BATCH_SIZE', '8'))
+        self.max_new_tokens = max_new_tokens or int(os.getenv('ROADMAP_CONTENT_MAX_NEW_TOKENS', '384'))
+        self.scheduler = BatchScheduler(
+            self._generate_batch,
+            max_batch_size=self.batch_size,
+            max_wait_ms=float(os.getenv('ROADMAP_BATCH_MAX_WAIT_MS', '25')),
+            name='topic-content'
+        )
+
+    def _generate_batch(self, topics):
+        prompts = [CONTENT_PROMPT.format(topic=topic) for topic in topics]
+        texts = self.generator.generate_free_texts(prompts, max_new_tokens=self.max_new_tokens)
+        return [parse_topic_content(topic, text) for topic, text in zip(topics, texts)]
+
+    def generate(self, topic):
+        """Content for one topic, or None if generation failed"""
+        try:
+            return self.scheduler.run(topic)
+        except Exception as e:
+            logger.error(f"Error generating topic content: {str(e)}")
+            logger.error(traceback.format_exc())
+            return None
+
+    def generate_many(self, topics):
+        """Content for every distinct topic, keyed by topic; failed batches map to None"""
+        unique_topics = list(dict.fromkeys(topic for topic in topics if topic))
+        contents = {}
+        for start in range(0, len(unique_topics), self.batch_size):
+            batch = unique_topics[start:start + self.batch_size]
+            try:
+                contents.update(zip(batch, self._generate_batch(batch)))
+            except Exception as e:
+                logger.error(f"Error generating content for {len(batch)} topics: {str(e)}")
+                logger.error(traceback.format_exc())
+                contents.update((topic, None) for topic in batch)
+        return contents
@@ -0,0 +1,130 @@
+import logging
+import re
+
+from .model_registry import get_topic_catalog
+
+logger = logging.getLogger(__name__)
+
+
+def get_backup_topic_info(topic):
+    """Provide backup information for common programming topics."""
+    # Try to find a close match in the topic catalog
+    description = get_topic_catalog().description(topic)
+    if description:
+        return description
+            
+    # If no match found, generate a more specific generic response
+    return f"{topic} is a concept in software development that helps developers build better applications. It contributes to code quality and efficiency. Understanding {topic} is valuable for writing more effective software."
+
+def clean_topic_name(topic):
+    """Clean the topic name by removing numbering and special characters."""
+    # Remove numbers and dots from the start (e.g., "1.2 ")
+    cleaned = re.sub(r'^\d+(\.\d+)*\s*', '', topic)
+    # Remove colon and any following whitespace
+    cleaned = re.sub(r':\s*', '', cleaned)
+    # Remove any extra whitespace
+    cleaned = cleaned.strip()
+    return cleaned
+
+WIKIPEDIA_API_URL = 'https://en.wikipedia.org/w/api.php'
+
+def wiki_search_params(topic):
+    """Query parameters for the Wikipedia search that finds the topic's page."""
+    # Clean the topic name
+    search_term = clean_topic_name(topic)
+    if 'programming' not in search_term.lower() and search_term.lower() not in ['html', 'css', 'php']:
+        search_term += ' programming'  # Add context for programming-related results
+
+    return {
+        'action': 'query',
+        'format': 'json',
+        'list': 'search',
+        'srsearch': search_term,
+        'srlimit': 1
+    }
+
+def wiki_page_id(search_data):
+    """Page id of the best search hit, or None if nothing matched."""
+    results = search_data.get('query', {}).get('search')
+    if not results:
+        return None
+    return results[0]['pageid']
+
+def wiki_extract_params(page_id):
+    """Query parameters for the plain-text introduction of a page."""
+    return {
+        'action': 'query',
+        'format': 'json',
+        'prop': 'extracts',
+        'exintro': True,
+        'explaintext': True,
+        'pageids': page_id
+    }
+
+def shorten_description(extract_data, page_id):
+    """Cut a page extract down to about four lines of complete sentences."""
+    # Get the extract text
+    extract = extract_data['query']['pages'][str(page_id)]['extract']
+
+    # Clean and limit the extract to 4 sentences max
+    sentences = [s.strip() + '.' for s in extract.split('.') if s.strip()]
+    short_description = ' '.join(sentences[:4])  # Take first 4 sentences
+
+    # Clean up any remaining newlines or excessive spaces
+    short_description = ' '.join(short_description.split())
+
+    # If the description is too long, try to shorten it while keeping complete sentences
+    if len(short_description.split()) > 60:  # Approximately 4 lines
+        sentences = short_description.split('.')
+        short_description = ''
+        for sentence in sentences:
+            if len((short_description + sentence).split()) <= 60:
+                short_description += sentence + '.'
+            else:
+                break
+
+    return short_description
+
+def is_useful_description(description):
+    """Whether a fetched description is long enough to show instead of the backup text."""
+    return bool(description) and len(description.split()) >= 10
+
+def get_courses(topic):
+    """Fetch relevant courses for the given topic."""
+    try:
+        # Courses come from the catalog file; in production this should be
+        # connected to real course APIs
+        courses = get_topic_catalog().courses(topic)
+        
+        # Return courses if available, otherwise return default courses
+        return courses or [
+            {
+                "title": f"Introduction to {topic}",
+                "platform": "edX",
+                "instructor": "Various Experts",
+                "link": f"https://www.edx.org/search?q={topic}",
+                "description": f"Learn {topic} from scratch"
+            },
+            {
+                "title": f"{topic} Fundamentals",
+                "platform": "Coursera",
+                "instructor": "Industry Experts",
+                "link": f"https://www.coursera.org/search?query={topic}",
+                "description": f"Master the basics of {topic}"
+            }
+        ]
+    except Exception as e:
+        logger.error(f"Error fetching courses: {str(e)}")
+        return []
+
+def roadmap_node_names(node, max_depth=None, level=0):
+    """Names of every node below the roadmap root, down to max_depth levels."""
+    names = []
+    # Local roadmaps use name/children, backup roadmaps title/subtopics
+    for child in node.get('children') or node.get('subtopics') or []:
+        name = child.get('name') or child.get('title')
+        if name:
+            names.append(name)
+        if max_depth is None or level + 1 < max_depth:
+            names.extend(roadmap_node_names(child, max_depth, level + 1))
+    return names
@@ -1,7 +1,11 @@
 from django.urls import path
-from .views import GenerateRoadmapView, GetResourcesView
+from .views import GenerateRoadmapView, GenerateRoadmapStreamView, GetBulkResourcesView, GetResourcesView, MetricsView
 
 urlpatterns = [
     path('generate/', GenerateRoadmapView.as_view(), name='generate-roadmap'),
+    path('generate/stream/', GenerateRoadmapStreamView.as_view(), name='generate-roadmap-stream'),
     path('resources/', GetResourcesView.as_view(), name='get-resources'),
+    path('resources/bulk/', GetBulkResourcesView.as_view(), name='get-bulk-resources'),
+    # Prometheus scrapes /api/metrics as-is, without a trailing slash
+    path('metrics', MetricsView.as_view(), name='metrics'),
 ]